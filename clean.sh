@@ -8,6 +8,7 @@ FUNCTIONS_DIR="src/aws_lambda_mpic"
 $(rm open-tofu/*.generated.tf 2> /dev/null) || true
 
 $(rm layer/*.zip 2> /dev/null) || true
+$(rm layer/*.generated.json 2> /dev/null) || true
 #$(rm -r layer/create_layer_virtualenv 2> /dev/null) || true
 
 $(rm "${FUNCTIONS_DIR}"/mpic_coordinator_lambda/mpic_coordinator_lambda.zip 2> /dev/null) || true
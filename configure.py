@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import argparse
+import hashlib
 import json
 import os
 from typing import Dict
@@ -26,6 +27,10 @@ def parse_args(raw_args):
                         default=f"{dirname}/open-tofu/aws-provider.tf.template")
     parser.add_argument("-d", "--deployment_id_file",
                         default=f"{dirname}/deployment.id")
+    parser.add_argument("-g", "--region_config",
+                        default=f"{dirname}/resources/aws_region_config.yaml")
+    parser.add_argument("-o", "--compiled_region_config",
+                        default=f"{dirname}/layer/aws_region_config.generated.json")
     return parser.parse_args(raw_args)
 
 
@@ -102,6 +107,130 @@ def main(raw_args=None):
         else:
             main_tf_string = main_tf_string.replace("{{absolute-max-attempts-with-key}}", "")
 
+        # Replace max number of concurrently coordinated requests of a batch request if present.
+        if "batch-max-concurrency" in config:
+            main_tf_string = main_tf_string.replace("{{batch-max-concurrency-with-key}}", f"batch_max_concurrency = \"{config['batch-max-concurrency']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{batch-max-concurrency-with-key}}", "")
+
+        # Replace max number of MPIC requests of a batch request if present.
+        if "batch-max-size" in config:
+            main_tf_string = main_tf_string.replace("{{batch-max-size-with-key}}", f"batch_max_size = \"{config['batch-max-size']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{batch-max-size-with-key}}", "")
+
+        # Leave verbose perspective details out of MPIC responses if configured.
+        if "mpic-response-details" in config:
+            main_tf_string = main_tf_string.replace("{{mpic-response-details-with-key}}", f"mpic_response_details = \"{config['mpic-response-details']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{mpic-response-details-with-key}}", "")
+
+        # Let API Gateway compress responses of at least this size for clients that accept it if configured.
+        if "api-minimum-compression-size-bytes" in config:
+            main_tf_string = main_tf_string.replace("{{api-minimum-compression-size-with-key}}", f"minimum_compression_size = {config['api-minimum-compression-size-bytes']}")
+        else:
+            main_tf_string = main_tf_string.replace("{{api-minimum-compression-size-with-key}}", "")
+
+        # Enable coalescing of concurrent calls to the same perspective into batched calls if configured.
+        if "perspective-call-batch-window-ms" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-call-batch-window-with-key}}", f"perspective_call_batch_window_ms = \"{config['perspective-call-batch-window-ms']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-call-batch-window-with-key}}", "")
+        if "perspective-call-batch-max-size" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-call-batch-max-size-with-key}}", f"perspective_call_batch_max_size = \"{config['perspective-call-batch-max-size']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-call-batch-max-size-with-key}}", "")
+
+        # Compress large perspective call payloads (requests and responses) if configured.
+        if "perspective-payload-compression" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-payload-compression-with-key}}", f"perspective_payload_compression = \"{config['perspective-payload-compression']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-payload-compression-with-key}}", "")
+        if "perspective-payload-compression-min-bytes" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-payload-compression-min-bytes-with-key}}", f"perspective_payload_compression_min_bytes = \"{config['perspective-payload-compression-min-bytes']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-payload-compression-min-bytes-with-key}}", "")
+
+        # Enable hedging of slow calls to perspectives if configured.
+        if "perspective-call-hedge-percentile" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-call-hedge-percentile-with-key}}", f"perspective_call_hedge_percentile = \"{config['perspective-call-hedge-percentile']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-call-hedge-percentile-with-key}}", "")
+        if "perspective-call-hedge-max-per-request" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-call-hedge-max-per-request-with-key}}", f"perspective_call_hedge_max_per_request = \"{config['perspective-call-hedge-max-per-request']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-call-hedge-max-per-request-with-key}}", "")
+        if "perspective-latency-window-size" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-latency-window-size-with-key}}", f"perspective_latency_window_size = \"{config['perspective-latency-window-size']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-latency-window-size-with-key}}", "")
+
+        # Periodically emit per-perspective call statistics if configured.
+        if "perspective-stats-emit-interval-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-stats-emit-interval-seconds-with-key}}", f"perspective_stats_emit_interval_seconds = \"{config['perspective-stats-emit-interval-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-stats-emit-interval-seconds-with-key}}", "")
+        if "perspective-stats-format" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-stats-format-with-key}}", f"perspective_stats_format = \"{config['perspective-stats-format']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-stats-format-with-key}}", "")
+
+        # Prefer recently fast and reliable perspectives when selecting cohorts if configured.
+        if "perspective-selection-policy" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-selection-policy-with-key}}", f"perspective_selection_policy = \"{config['perspective-selection-policy']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-selection-policy-with-key}}", "")
+        if "perspective-health-max-age-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-health-max-age-seconds-with-key}}", f"perspective_health_max_age_seconds = \"{config['perspective-health-max-age-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-health-max-age-seconds-with-key}}", "")
+
+        # Fail fast on calls to perspectives that keep failing if configured.
+        if "perspective-circuit-breaker-failure-threshold" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-circuit-breaker-failure-threshold-with-key}}", f"perspective_circuit_breaker_failure_threshold = \"{config['perspective-circuit-breaker-failure-threshold']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-circuit-breaker-failure-threshold-with-key}}", "")
+        if "perspective-circuit-breaker-open-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{perspective-circuit-breaker-open-seconds-with-key}}", f"perspective_circuit_breaker_open_seconds = \"{config['perspective-circuit-breaker-open-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{perspective-circuit-breaker-open-seconds-with-key}}", "")
+
+        # Set how the coordinator creates its Lambda clients if configured.
+        if "lambda-client-init-mode" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-init-mode-with-key}}", f"lambda_client_init_mode = \"{config['lambda-client-init-mode']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-init-mode-with-key}}", "")
+
+        # Set the connection settings of the coordinator's Lambda clients if configured.
+        if "lambda-client-max-pool-connections" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-max-pool-connections-with-key}}", f"lambda_client_max_pool_connections = \"{config['lambda-client-max-pool-connections']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-max-pool-connections-with-key}}", "")
+        if "lambda-client-connect-timeout-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-connect-timeout-seconds-with-key}}", f"lambda_client_connect_timeout_seconds = \"{config['lambda-client-connect-timeout-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-connect-timeout-seconds-with-key}}", "")
+        if "lambda-client-read-timeout-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-read-timeout-seconds-with-key}}", f"lambda_client_read_timeout_seconds = \"{config['lambda-client-read-timeout-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-read-timeout-seconds-with-key}}", "")
+        if "lambda-client-retry-mode" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-retry-mode-with-key}}", f"lambda_client_retry_mode = \"{config['lambda-client-retry-mode']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-retry-mode-with-key}}", "")
+        if "lambda-client-max-attempts" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-max-attempts-with-key}}", f"lambda_client_max_attempts = \"{config['lambda-client-max-attempts']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-max-attempts-with-key}}", "")
+        if "lambda-client-tcp-keepalive" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-tcp-keepalive-with-key}}", f"lambda_client_tcp_keepalive = \"{config['lambda-client-tcp-keepalive']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-tcp-keepalive-with-key}}", "")
+        if "lambda-client-keepalive-timeout-seconds" in config:
+            main_tf_string = main_tf_string.replace("{{lambda-client-keepalive-timeout-seconds-with-key}}", f"lambda_client_keepalive_timeout_seconds = \"{config['lambda-client-keepalive-timeout-seconds']}\"")
+        else:
+            main_tf_string = main_tf_string.replace("{{lambda-client-keepalive-timeout-seconds-with-key}}", "")
+
         # Store the secret key for the vantage points hash in an environment variable.
         hash_secret = ''.join(secrets.choice(string.ascii_letters) for _ in range(20))
         main_tf_string = main_tf_string.replace("{{hash-secret}}", f"\"{hash_secret}\"")
@@ -132,6 +261,10 @@ def main(raw_args=None):
         with open(out_file_name, 'w') as out_stream:
             out_stream.write(result_string)
 
+    # Generate aws_region_config.generated.json from aws_region_config.yaml for the coordinator to load at cold start.
+    # It is written to the layer build directory (package-layer.sh copies it into the coordinator layer), not resources.
+    write_compiled_region_config(args.region_config, args.compiled_region_config, config['perspectives'])
+
     # Generate aws-perspective-template.generated.tf based on aws-perspective-template.tf.template.
     with open(args.aws_perspective_tf_template) as stream:
         # Read the template file to a string.
@@ -159,6 +292,21 @@ def main(raw_args=None):
                 out_stream.write(aws_perspective_tf_region)
         
 
+def write_compiled_region_config(region_config_file: str, out_file_name: str, region_codes: list) -> str:
+    # JSON with only the deployed regions, so the coordinator can validate it in a single pass without PyYAML
+    with open(region_config_file, 'rb') as stream:
+        region_config_bytes = stream.read()
+    region_config = yaml.safe_load(region_config_bytes)
+    compiled_region_config = {
+        'source_sha256': hashlib.sha256(region_config_bytes).hexdigest(),
+        'aws_available_regions': [region for region in region_config['aws_available_regions'] if region['code'] in region_codes],
+    }
+    os.makedirs(os.path.dirname(out_file_name), exist_ok=True)
+    with open(out_file_name, 'w') as out_stream:
+        json.dump(compiled_region_config, out_stream, separators=(',', ':'))
+    return out_file_name
+
+
 def set_common_env_configuration(tf_string: str, config: dict) -> str:
     # set log level if present
     if "log-level" in config:
@@ -180,6 +328,34 @@ def set_common_env_configuration(tf_string: str, config: dict) -> str:
     else:
         tf_string = tf_string.replace("{{dns-resolution-lifetime-with-key}}", "")
 
+    # set DNS answer cache configuration if present (the cache is disabled unless max entries is set)
+    for cache_setting in ["max-entries", "max-negative-entries", "max-ttl-seconds"]:
+        config_key = f"dns-cache-{cache_setting}"
+        placeholder = "{{" + config_key + "-with-key}}"
+        if config_key in config:
+            tf_string = tf_string.replace(placeholder, f"{config_key.replace('-', '_')} = {config[config_key]}")
+        else:
+            tf_string = tf_string.replace(placeholder, "")
+
+    # set CAA lookup cache configuration if present (the cache is disabled unless max entries is set)
+    for cache_setting in ["max-entries", "max-bytes", "max-ttl-seconds", "negative-ttl-seconds"]:
+        config_key = f"caa-lookup-cache-{cache_setting}"
+        placeholder = "{{" + config_key + "-with-key}}"
+        if config_key in config:
+            tf_string = tf_string.replace(placeholder, f"{config_key.replace('-', '_')} = {config[config_key]}")
+        else:
+            tf_string = tf_string.replace(placeholder, "")
+
+    # set event loop configuration if present (every function uses the asyncio loop without lag probing by default)
+    if "event-loop-type" in config:
+        tf_string = tf_string.replace("{{event-loop-type-with-key}}", f"event_loop_type = \"{config['event-loop-type']}\"")
+    else:
+        tf_string = tf_string.replace("{{event-loop-type-with-key}}", "")
+    if "event-loop-lag-probe-interval-ms" in config:
+        tf_string = tf_string.replace("{{event-loop-lag-probe-interval-ms-with-key}}", f"event_loop_lag_probe_interval_ms = {config['event-loop-lag-probe-interval-ms']}")
+    else:
+        tf_string = tf_string.replace("{{event-loop-lag-probe-interval-ms-with-key}}", "")
+
     return tf_string
 
 
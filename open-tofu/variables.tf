@@ -21,3 +21,9 @@ variable "eventbridge_warmer_enabled" {
   description = "Enable EventBridge warmer to try to keep Lambda functions warm. See https://aws.amazon.com/pt/blogs/compute/operating-lambda-performance-optimization-part-1/, \"Understanding how functions warmers work\""
   default     = false
 }
+
+variable "eventbridge_warmer_concurrency" {
+  type        = number
+  description = "Number of concurrent warm-up pings sent to each perspective's check functions, i.e., how many containers the EventBridge warmer tries to keep warm per function"
+  default     = 1
+}
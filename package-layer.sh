@@ -1,17 +1,65 @@
 #!/bin/bash
-# make common python3 layer for all lambda functions
+set -e
+
+# Lambda layers are read-only, so modules that are not precompiled here get compiled on every cold start.
+# Compile for the python3.11 runtime of the functions; unchecked-hash pycs are used without checking source mtimes.
+# Layers are extracted to /opt, so source paths in tracebacks are rewritten to /opt/python.
+compile_python() {
+  python3.11 -m compileall -q -j 0 -s "$1" -p /opt/python --invalidation-mode unchecked-hash "$1"
+}
+
+# remove what is never imported at runtime: tests, docs, type stubs, stale bytecode and packaging tools
+prune_site_packages() {
+  find "$1" -depth -type d \( -name "tests" -o -name "test" -o -name "docs" -o -name "__pycache__" \) -exec rm -rf {} +
+  find "$1" -type f \( -name "*.pyi" -o -name "*.pyc" -o -name "*.pyo" \) -delete
+  (cd "$1" && rm -rf pip pip-* setuptools setuptools-* pkg_resources _distutils_hack distutils-precedence.pth wheel wheel-*)
+}
+
+# packages only the coordinator uses (AWS SDK, Powertools parser, PyYAML), left out of the checker layer
+checker_excluded_packages=(
+  aioboto3 aioboto3-* aiobotocore aiobotocore-* aiofiles aiofiles-* aioitertools aioitertools-*
+  boto3 boto3-* botocore botocore-* s3transfer s3transfer-* jmespath jmespath-* wrapt wrapt-*
+  dateutil python_dateutil-* aws_lambda_powertools aws_lambda_powertools-* yaml _yaml PyYAML-*
+)
+
+report_size() {
+  local zip_file=$1
+  local zipped_bytes
+  local unzipped_bytes
+  zipped_bytes=$(wc -c < "$zip_file")
+  unzipped_bytes=$(unzip -l "$zip_file" | tail -n 1 | awk '{print $1}')
+  printf "%-44s %8d KiB zipped %8d KiB unzipped\n" "$zip_file" $((zipped_bytes / 1024)) $((unzipped_bytes / 1024))
+}
+
+# make common python3 layer for the mpic coordinator lambda function
 mkdir -p layer/python3_layer_content/python
 cp -r layer/create_layer_virtualenv/lib layer/python3_layer_content/python/
-(cd layer/python3_layer_content && zip -r ../python3_layer_content.zip python)
+site_packages_dir=layer/python3_layer_content/python/lib/python3.11/site-packages
+prune_site_packages "$site_packages_dir"
+compile_python layer/python3_layer_content/python
+(cd layer/python3_layer_content && zip -qr ../python3_layer_content.zip python)
 
-py_exclude=("*.pyc" "*__pycache__*" "*.pyo" "*.pyd")
+# make python3 layer for the checker lambda functions, without the coordinator-only packages
+mkdir -p layer/python3_checker_layer_content
+cp -r layer/python3_layer_content/python layer/python3_checker_layer_content/
+(cd layer/python3_checker_layer_content/python/lib/python3.11/site-packages && rm -rf ${checker_excluded_packages[@]})
+(cd layer/python3_checker_layer_content && zip -qr ../python3_checker_layer_content.zip python)
 
 # make mpic_coordinator lambda layer for mpic coordinator lambda function
 mkdir -p layer/mpic_coordinator_layer_content/python
 cp -r resources layer/mpic_coordinator_layer_content/python/resources  # TODO consider a more elegant approach
+# add the region configuration compiled by configure.py; without it, the coordinator parses aws_region_config.yaml
+if [ -f layer/aws_region_config.generated.json ]; then
+  cp layer/aws_region_config.generated.json layer/mpic_coordinator_layer_content/python/resources/
+fi
 # Zip the mpic_coordinator lambda layer
-(cd layer/mpic_coordinator_layer_content && zip -r ../mpic_coordinator_layer_content.zip python -x "${py_exclude[@]}")
+(cd layer/mpic_coordinator_layer_content && zip -qr ../mpic_coordinator_layer_content.zip python -x "*__pycache__*")
+
+report_size layer/python3_layer_content.zip
+report_size layer/python3_checker_layer_content.zip
+report_size layer/mpic_coordinator_layer_content.zip
 
 # clean up, mostly for the IDE which could otherwise detect duplicate code
 rm -r layer/python3_layer_content
+rm -r layer/python3_checker_layer_content
 rm -r layer/mpic_coordinator_layer_content
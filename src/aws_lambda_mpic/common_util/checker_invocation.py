@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Callable, Literal
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from aws_lambda_mpic.common_util.event_loop_runner import EventLoopRunner
+from aws_lambda_mpic.common_util.init_phase_timer import InitPhaseTimer
+from aws_lambda_mpic.common_util.payload_compression import compress_response_if_large, decompress_payload
+from aws_lambda_mpic.common_util.payload_compression import get_requested_response_compression, is_compressed_payload
+from aws_lambda_mpic.common_util.payload_compression import is_raw_response_format_requested
+
+
+class PingRequest(BaseModel):
+    # sent by the coordinator to warm up a checker function; answered without doing any check
+    ping: Literal[True]
+    hold_ms: int = Field(default=0, ge=0, le=1000)  # keeps the container busy so concurrent pings reach others
+
+
+class CheckBatchRequest(BaseModel):
+    # several check requests sent by the coordinator in a single invocation; narrowed to a check type by subclasses
+    check_requests: list = Field(min_length=1)
+
+
+class CheckerLambdaHandler:
+    """
+    Invocation handling shared by the checker Lambda handlers: parsing the event, running single and batched checks
+    on the container's event loop, answering pings, and shaping and compressing the response.
+
+    Subclasses create their checker and set event_adapter (a TypeAdapter of their check request, their
+    CheckBatchRequest subclass and PingRequest) and response_list_adapter (of a list of their check response), and
+    implement check. They can override get_check_options, get_status_code and log_cache_statistics.
+    A loop_factory, if given, makes the event loop instead of the configured event loop type (see EventLoopRunner).
+    """
+
+    def __init__(
+        self,
+        import_seconds: float,
+        handler_logger: logging.Logger,
+        loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None,
+    ):
+        self.init_phase_timer = InitPhaseTimer(import_seconds)
+        self.log_level = os.environ["log_level"] if "log_level" in os.environ else None
+        self.event_loop_type = os.getenv("event_loop_type", "asyncio")  # "asyncio" or "uvloop"
+        self.event_loop_lag_probe_interval_ms = int(os.getenv("event_loop_lag_probe_interval_ms", 0))  # 0 disables
+
+        self.invocation_count = 0  # invocations served by this container
+
+        self.logger = handler_logger.getChild(self.__class__.__name__)
+        if self.log_level:
+            self.logger.setLevel(self.log_level)
+
+        # the loop every invocation runs on, kept for the lifetime of the container
+        self.event_loop_runner = EventLoopRunner(
+            self.event_loop_type, self.event_loop_lag_probe_interval_ms / 1000, loop_factory
+        )
+
+        self.event_adapter: TypeAdapter | None = None
+        self.response_list_adapter: TypeAdapter | None = None
+
+    async def check(self, check_request, **check_options):
+        """
+        :return: the check response to the check request
+        """
+        raise NotImplementedError
+
+    def get_check_options(self, context) -> dict:
+        """
+        :return: options of the checks of an invocation taken from its context, passed to check as keyword arguments
+        """
+        return {}
+
+    def get_status_code(self, check_response) -> int:
+        return 200
+
+    def log_cache_statistics(self):
+        pass
+
+    def handle_invocation(self, event, context):
+        """
+        Handles an invocation of the checker's Lambda function: a check request, a batch of them or a ping.
+        """
+        self.start_invocation()
+        event = self.parse_event(event)
+        if isinstance(event, PingRequest):
+            return self.process_ping(event)
+        check_options = self.get_check_options(context)
+        raw_response = is_raw_response_format_requested(context)
+        if isinstance(event, CheckBatchRequest):
+            result = self.process_batch_invocation(event, raw_response, **check_options)
+        else:
+            result = self.process_invocation(event, raw_response, **check_options)
+        response_compression = get_requested_response_compression(context) if raw_response else None
+        if response_compression is not None:
+            return compress_response_if_large(result, *response_compression, self.logger)
+        return result
+
+    def start_invocation(self):
+        """
+        Counts the invocation and logs whether it is the first one of this container (a cold start), along with the
+        initialization phase breakdown if so.
+        """
+        self.invocation_count += 1
+        invocation_fields = {"cold_start": self.invocation_count == 1, "invocation_count": self.invocation_count}
+        if self.invocation_count == 1:
+            invocation_fields["init_phases_ms"] = self.init_phase_timer.get_phase_milliseconds()
+        self.logger.info(json.dumps(invocation_fields))
+
+    def parse_event(self, event):
+        # stands in for the Powertools event_parser decorator, which adds well over 100 ms of imports to a cold start
+        if is_compressed_payload(event):  # sent by the coordinator in place of large payloads if configured
+            return self.event_adapter.validate_json(decompress_payload(event))
+        if isinstance(event, (str, bytes)):
+            return self.event_adapter.validate_json(event)
+        return self.event_adapter.validate_python(event)
+
+    def process_ping(self, ping_request: PingRequest) -> dict:
+        if ping_request.hold_ms > 0:
+            time.sleep(ping_request.hold_ms / 1000)
+        return {"pong": True, "cold_start": self.invocation_count == 1}
+
+    def process_invocation(self, check_request, raw_response: bool = False, **check_options):
+        self.logger.debug("Processing check request: %s", check_request)
+        check_response = self.event_loop_runner.run(self.check(check_request, **check_options))
+        self.log_cache_statistics()
+        self.event_loop_runner.log_lag_statistics(self.logger)
+        if raw_response:
+            return check_response.model_dump(mode="json")  # errors are reported in the check response itself
+        result = {
+            "statusCode": self.get_status_code(check_response),  # note: must be snakeCase
+            "headers": {"Content-Type": "application/json"},
+            "body": check_response.model_dump_json(),
+        }
+        return result
+
+    def process_batch_invocation(self, batch_request: CheckBatchRequest, raw_response: bool = False, **check_options):
+        self.logger.debug("Processing batch of %d check requests", len(batch_request.check_requests))
+        checks = [self.check(check_request, **check_options) for check_request in batch_request.check_requests]
+        check_responses = self.event_loop_runner.run(asyncio.gather(*checks))
+        self.log_cache_statistics()
+        self.event_loop_runner.log_lag_statistics(self.logger)
+        if raw_response:
+            return self.response_list_adapter.dump_python(check_responses, mode="json")  # in request order
+        # errors are reported per check response; the status code only reflects the processing of the batch itself
+        result = {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": self.response_list_adapter.dump_json(check_responses).decode("utf-8"),  # in request order
+        }
+        return result
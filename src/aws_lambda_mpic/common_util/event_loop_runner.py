@@ -0,0 +1,116 @@
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+from open_mpic_core import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+EVENT_LOOP_TYPES = ["asyncio", "uvloop"]
+
+
+class EventLoopLagStatistics:
+    """
+    How late the event loop ran a periodically scheduled probe callback, i.e. how long ready callbacks waited for
+    the loop, since the statistics were last reset.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.total_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def record(self, lag_seconds: float):
+        self.samples += 1
+        self.total_lag_seconds += lag_seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+
+    def get_summary(self) -> dict:
+        return {
+            "samples": self.samples,
+            "mean_ms": round(self.total_lag_seconds / self.samples * 1000, 2) if self.samples else 0.0,
+            "max_ms": round(self.max_lag_seconds * 1000, 2),
+        }
+
+
+class EventLoopRunner:
+    """
+    Runs the coroutines of a Lambda handler on one event loop, created when the handler is and kept for the lifetime
+    of the container, so that clients and locks bound to the loop are reused across invocations.
+
+    The loop is an asyncio loop, or a uvloop loop if event_loop_type is "uvloop" and uvloop is installed. A runtime
+    that manages its own loop (e.g., an async-native Lambda runtime) can instead pass a loop_factory that returns that
+    loop, which takes precedence over event_loop_type. If lag_probe_interval_seconds is positive, a probe callback is
+    scheduled at that interval while a coroutine runs, to measure the loop's scheduling lag.
+    """
+
+    def __init__(
+        self,
+        event_loop_type: str = "asyncio",
+        lag_probe_interval_seconds: float = 0,
+        loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None,
+    ):
+        self.loop = loop_factory() if loop_factory is not None else EventLoopRunner.new_event_loop(event_loop_type)
+        asyncio.set_event_loop(self.loop)  # for code that looks up the current loop rather than being passed one
+        self.lag_probe_interval_seconds = lag_probe_interval_seconds
+        self.lag_statistics = EventLoopLagStatistics()
+        self._lag_probe_handle: asyncio.TimerHandle | None = None
+
+    @staticmethod
+    def new_event_loop(event_loop_type: str) -> asyncio.AbstractEventLoop:
+        """
+        :param event_loop_type: one of EVENT_LOOP_TYPES
+        :return: a new loop of the given type, or a new asyncio loop if uvloop is asked for but not installed
+        """
+        if event_loop_type not in EVENT_LOOP_TYPES:
+            raise ValueError(f"Unsupported event loop type: {event_loop_type}. Expected one of {EVENT_LOOP_TYPES}.")
+        if event_loop_type == "uvloop":
+            try:
+                import uvloop
+            except ImportError:
+                logger.warning("uvloop is not installed; using the default asyncio event loop")
+            else:
+                return uvloop.new_event_loop()
+        return asyncio.new_event_loop()
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        if self.lag_probe_interval_seconds <= 0:
+            return self.loop.run_until_complete(awaitable)
+        self._schedule_lag_probe()
+        try:
+            return self.loop.run_until_complete(awaitable)
+        finally:
+            self._lag_probe_handle.cancel()  # the loop is idle between invocations, which is not lag
+            self._lag_probe_handle = None
+
+    def pop_lag_statistics(self) -> dict | None:
+        """
+        :return: a summary of the loop lag measured since the last call, or None if no probe has run since
+        """
+        if self.lag_statistics.samples == 0:
+            return None
+        summary = self.lag_statistics.get_summary()
+        self.lag_statistics = EventLoopLagStatistics()
+        return summary
+
+    def log_lag_statistics(self, handler_logger: logging.Logger):
+        """
+        Logs the summary of the loop lag measured since the last call (see pop_lag_statistics), if any.
+        """
+        event_loop_lag_summary = self.pop_lag_statistics()
+        if event_loop_lag_summary is not None:
+            handler_logger.info(json.dumps({"event_loop_lag": event_loop_lag_summary}))
+
+    def close(self):
+        self.loop.close()
+
+    def _schedule_lag_probe(self):
+        expected_time = self.loop.time() + self.lag_probe_interval_seconds
+        self._lag_probe_handle = self.loop.call_at(expected_time, self._probe_lag, expected_time)
+
+    def _probe_lag(self, expected_time: float):
+        self.lag_statistics.record(max(0.0, self.loop.time() - expected_time))
+        self._schedule_lag_probe()
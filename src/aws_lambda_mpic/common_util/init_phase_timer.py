@@ -0,0 +1,24 @@
+import time
+from contextlib import contextmanager
+
+
+class InitPhaseTimer:
+    """
+    Durations of the phases of a handler's initialization (the cold start), in the order they ran.
+    """
+
+    def __init__(self, import_seconds: float | None = None):
+        self.phase_seconds: dict[str, float] = {}
+        if import_seconds is not None:
+            self.phase_seconds["import"] = import_seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[phase] = self.phase_seconds.get(phase, 0) + time.perf_counter() - start_time
+
+    def get_phase_milliseconds(self) -> dict[str, float]:
+        return {phase: round(seconds * 1000, 1) for phase, seconds in self.phase_seconds.items()}
@@ -0,0 +1,133 @@
+import json
+import time
+import logging
+import zlib
+import base64
+
+PAYLOAD_COMPRESSION_TYPES = ["none", "zlib"]
+
+# compressed payloads are sent as a JSON object holding the base64 of the compressed JSON payload under this key,
+# which the Lambda runtime serializes right after the "compression" key
+COMPRESSED_PAYLOAD_KEY = "compressed_payload"
+_COMPRESSED_PAYLOAD_MARKER = json.dumps(COMPRESSED_PAYLOAD_KEY).encode("utf-8")
+
+
+class PayloadCompressionStatistics:
+    """
+    Sizes of the payloads compressed (or decompressed) since the statistics were last reset, and the time it took.
+    """
+
+    def __init__(self):
+        self.payloads = 0
+        self.uncompressed_bytes = 0
+        self.compressed_bytes = 0
+        self.total_seconds = 0.0
+
+    def record(self, uncompressed_bytes: int, compressed_bytes: int, seconds: float):
+        self.payloads += 1
+        self.uncompressed_bytes += uncompressed_bytes
+        self.compressed_bytes += compressed_bytes
+        self.total_seconds += seconds
+
+    def get_summary(self) -> dict:
+        return {
+            "payloads": self.payloads,
+            "uncompressed_bytes": self.uncompressed_bytes,
+            "compressed_bytes": self.compressed_bytes,
+            "compression_ratio": round(self.uncompressed_bytes / self.compressed_bytes, 2) if self.payloads else None,
+            "total_ms": round(self.total_seconds * 1000, 2),
+        }
+
+
+def compress_payload(payload: bytes, compression: str) -> dict:
+    """
+    :param payload: a JSON payload
+    :param compression: one of PAYLOAD_COMPRESSION_TYPES other than "none"
+    :return: the JSON object to send in place of the payload
+    """
+    if compression != "zlib":
+        raise ValueError(
+            f"Unsupported payload compression: {compression}. Expected one of {PAYLOAD_COMPRESSION_TYPES}."
+        )
+    return {
+        "compression": compression,
+        COMPRESSED_PAYLOAD_KEY: base64.b64encode(zlib.compress(payload)).decode("ascii"),
+    }
+
+
+def is_compressed_payload(payload) -> bool:
+    return isinstance(payload, dict) and COMPRESSED_PAYLOAD_KEY in payload
+
+
+def is_compressed_payload_json(payload: bytes) -> bool:
+    """
+    Tells a serialized compressed payload from a check response without parsing it. The quoted key cannot appear
+    near the start of a check response, where string values (in which quotes are escaped) are all that could hold it.
+    """
+    return _COMPRESSED_PAYLOAD_MARKER in payload[:64]
+
+
+def decompress_payload(compressed_payload: dict) -> bytes:
+    """
+    :return: the JSON payload held by a compressed payload
+    """
+    compression = compressed_payload.get("compression")
+    if compression != "zlib":
+        raise ValueError(
+            f"Unsupported payload compression: {compression}. Expected one of {PAYLOAD_COMPRESSION_TYPES}."
+        )
+    return zlib.decompress(base64.b64decode(compressed_payload[COMPRESSED_PAYLOAD_KEY]))
+
+
+def compress_payload_if_large(
+    payload: bytes, compression: str, min_bytes: int, statistics: PayloadCompressionStatistics | None = None
+) -> dict | None:
+    """
+    :return: the compressed payload, or None if the payload is smaller than min_bytes
+    """
+    if len(payload) < min_bytes:
+        return None
+    start_time = time.perf_counter()
+    compressed_payload = compress_payload(payload, compression)
+    if statistics is not None:
+        compressed_bytes = len(compressed_payload[COMPRESSED_PAYLOAD_KEY])
+        statistics.record(len(payload), compressed_bytes, time.perf_counter() - start_time)
+    return compressed_payload
+
+
+def compress_response_if_large(
+    raw_response: dict | list, compression: str, min_bytes: int, logger: logging.Logger
+) -> dict | list:
+    """
+    :return: a checker's raw response compressed, if it is at least min_bytes when serialized, otherwise as is
+    """
+    statistics = PayloadCompressionStatistics()
+    compressed_response = compress_payload_if_large(
+        json.dumps(raw_response).encode("utf-8"), compression, min_bytes, statistics
+    )
+    if compressed_response is None:
+        return raw_response
+    logger.debug(json.dumps({"response_compression": statistics.get_summary()}))
+    return compressed_response
+
+
+def get_client_context_custom(context) -> dict:
+    client_context = getattr(context, "client_context", None)
+    return getattr(client_context, "custom", None) or {}
+
+
+def is_raw_response_format_requested(context) -> bool:
+    # the coordinator asks checkers for the check response as the raw invocation result rather than in an envelope
+    return get_client_context_custom(context).get("response_format") == "raw"
+
+
+def get_requested_response_compression(context) -> tuple[str, int] | None:
+    """
+    :return: the compression the coordinator asks a checker's raw responses of at least the given size to be sent
+    with, if any
+    """
+    client_context_custom = get_client_context_custom(context)
+    compression = client_context_custom.get("response_compression", "none")
+    if compression == "none" or compression not in PAYLOAD_COMPRESSION_TYPES:  # unknown ones are left uncompressed
+        return None
+    return compression, int(client_context_custom.get("response_compression_min_bytes", 0))
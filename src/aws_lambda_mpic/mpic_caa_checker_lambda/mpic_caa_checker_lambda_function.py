@@ -1,19 +1,126 @@
+import time
+
+_import_start_time = time.perf_counter()  # start of the import phase of a cold start
+
 import os
+import json
 import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable
 
-from aws_lambda_powertools.utilities.parser import event_parser
+from dns.name import Name
+from dns.rrset import RRset
+from pydantic import Field, TypeAdapter
 
-from open_mpic_core import CaaCheckRequest
+from open_mpic_core import CaaCheckRequest, CaaCheckResponse
 from open_mpic_core import MpicCaaChecker
 from open_mpic_core import get_logger
 
+from aws_lambda_mpic.common_util.checker_invocation import CheckBatchRequest, CheckerLambdaHandler, PingRequest
+from aws_lambda_mpic.common_util.payload_compression import get_client_context_custom
+
 logger = get_logger(__name__)
 
+IMPORT_SECONDS = time.perf_counter() - _import_start_time
+
 
-class MpicCaaCheckerLambdaHandler:
-    def __init__(self):
+class CaaCheckBatchRequest(CheckBatchRequest):
+    check_requests: list[CaaCheckRequest] = Field(min_length=1)
+
+
+class CaaLookupCache:
+    """
+    In-process LRU cache of CAA tree walk results (the CAA record set found, if any, and the domain it was found at),
+    bounded by entry count and by approximate size in bytes. Entries expire after the TTL of the found record set,
+    capped at max_ttl_seconds, or after negative_ttl_seconds if no CAA record set was found.
+    """
+
+    ENTRY_OVERHEAD_BYTES = 256  # rough allowance for the entry's Python objects beyond its text content
+
+    def __init__(self, max_entries: int, max_bytes: int, max_ttl_seconds: float, negative_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl_seconds = max_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, int, tuple[RRset | None, Name]]] = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, domain: str) -> tuple[RRset | None, Name] | None:
+        entry = self._entries.get(domain)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, _, lookup_result = entry
+        if expires_at <= time.monotonic():
+            self._remove(domain)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(domain)
+        self.hits += 1
+        return lookup_result
+
+    def put(self, domain: str, lookup_result: tuple[RRset | None, Name]):
+        rrset, found_at = lookup_result
+        ttl = min(rrset.ttl, self.max_ttl_seconds) if rrset is not None else self.negative_ttl_seconds
+        entry_size = len(domain) + len(found_at.to_text()) + self.ENTRY_OVERHEAD_BYTES
+        if rrset is not None:
+            entry_size += len(rrset.to_text())
+        if ttl <= 0 or entry_size > self.max_bytes:
+            return
+        if domain in self._entries:
+            self._remove(domain)
+        self._entries[domain] = (time.monotonic() + ttl, entry_size, lookup_result)
+        self.size_bytes += entry_size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))  # least recently used
+            self.evictions += 1
+
+    def _remove(self, domain: str):
+        _, entry_size, _ = self._entries.pop(domain)
+        self.size_bytes -= entry_size
+
+
+class CachingMpicCaaChecker(MpicCaaChecker):
+    """
+    MpicCaaChecker that reuses recent CAA tree walk results from a CaaLookupCache, if one is given.
+    Issuance is still evaluated per request, as it depends on request parameters (e.g., CAA domains).
+    """
+
+    _cache_bypassed: ContextVar[bool] = ContextVar("caa_lookup_cache_bypassed", default=False)
+
+    def __init__(self, caa_lookup_cache: CaaLookupCache | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.caa_lookup_cache = caa_lookup_cache
+
+    async def check_caa(self, caa_request: CaaCheckRequest, bypass_cache: bool = False) -> CaaCheckResponse:
+        bypass_token = self._cache_bypassed.set(bypass_cache)
+        try:
+            return await super().check_caa(caa_request)
+        finally:
+            self._cache_bypassed.reset(bypass_token)
+
+    async def find_caa_records_and_domain(self, caa_request) -> tuple[RRset, Name]:
+        if self.caa_lookup_cache is None or self._cache_bypassed.get():
+            return await super().find_caa_records_and_domain(caa_request)
+        domain = caa_request.domain_or_ip_target.lower()
+        lookup_result = self.caa_lookup_cache.get(domain)
+        if lookup_result is None:
+            lookup_result = await super().find_caa_records_and_domain(caa_request)  # lookup errors are not cached
+            self.caa_lookup_cache.put(domain, lookup_result)
+        return lookup_result
+
+
+class MpicCaaCheckerLambdaHandler(CheckerLambdaHandler):
+    def __init__(self, loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None):
+        super().__init__(IMPORT_SECONDS, logger, loop_factory)
         self.default_caa_domain_list = os.environ["default_caa_domains"].split("|")
-        self.log_level = os.environ["log_level"] if "log_level" in os.environ else None
         self.dns_timeout_seconds = (
             float(os.environ["dns_timeout_seconds"]) if "dns_timeout_seconds" in os.environ else None
         )
@@ -23,25 +130,56 @@ class MpicCaaCheckerLambdaHandler:
             else None
         )
 
-        self.logger = logger.getChild(self.__class__.__name__)
-        if self.log_level:
-            self.logger.setLevel(self.log_level)
-
-        self.caa_checker = MpicCaaChecker(
-            default_caa_domain_list=self.default_caa_domain_list,
-            log_level=self.logger.level,
-            dns_timeout=self.dns_timeout_seconds,
-            dns_resolution_lifetime=self.dns_resolution_lifetime_seconds,
-        )
-
-    def process_invocation(self, caa_request: CaaCheckRequest):
-        caa_response = asyncio.get_event_loop().run_until_complete(self.caa_checker.check_caa(caa_request))
-        result = {
-            "statusCode": 200,  # note: must be snakeCase
-            "headers": {"Content-Type": "application/json"},
-            "body": caa_response.model_dump_json(),
-        }
-        return result
+        self.caa_lookup_cache_max_entries = int(os.getenv("caa_lookup_cache_max_entries", 0))  # 0 disables the cache
+        self.caa_lookup_cache_max_bytes = int(os.getenv("caa_lookup_cache_max_bytes", 1024 * 1024))
+        self.caa_lookup_cache_max_ttl_seconds = float(os.getenv("caa_lookup_cache_max_ttl_seconds", 60))
+        self.caa_lookup_cache_negative_ttl_seconds = float(os.getenv("caa_lookup_cache_negative_ttl_seconds", 30))
+
+        self.caa_lookup_cache = None
+        if self.caa_lookup_cache_max_entries > 0:
+            self.caa_lookup_cache = CaaLookupCache(
+                max_entries=self.caa_lookup_cache_max_entries,
+                max_bytes=self.caa_lookup_cache_max_bytes,
+                max_ttl_seconds=self.caa_lookup_cache_max_ttl_seconds,
+                negative_ttl_seconds=self.caa_lookup_cache_negative_ttl_seconds,
+            )
+
+        with self.init_phase_timer.measure("checker"):
+            self.caa_checker = CachingMpicCaaChecker(
+                caa_lookup_cache=self.caa_lookup_cache,
+                default_caa_domain_list=self.default_caa_domain_list,
+                log_level=self.logger.level,
+                dns_timeout=self.dns_timeout_seconds,
+                dns_resolution_lifetime=self.dns_resolution_lifetime_seconds,
+            )
+
+        with self.init_phase_timer.measure("type_adapters"):
+            self.response_list_adapter = TypeAdapter(list[CaaCheckResponse])
+            self.event_adapter = TypeAdapter(CaaCheckRequest | CaaCheckBatchRequest | PingRequest)
+
+    async def check(self, caa_request: CaaCheckRequest, bypass_cache: bool = False) -> CaaCheckResponse:
+        return await self.caa_checker.check_caa(caa_request, bypass_cache=bypass_cache)
+
+    def get_check_options(self, context) -> dict:
+        return {"bypass_cache": is_cache_bypass_requested(context)}
+
+    def log_cache_statistics(self):
+        # counts since the container started, as a structured log line that metric filters and Logs Insights can read
+        if self.caa_lookup_cache is not None:
+            cache = self.caa_lookup_cache
+            cache_statistics = {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "evictions": cache.evictions,
+                "entries": len(cache),
+                "size_bytes": cache.size_bytes,
+            }
+            self.logger.info(json.dumps({"caa_lookup_cache": cache_statistics}))
+
+
+def is_cache_bypass_requested(context) -> bool:
+    # callers that need a fresh CAA lookup (e.g., for compliance reasons) set this in the invocation's client context
+    return bool(get_client_context_custom(context).get("bypass_caa_lookup_cache", False))
 
 
 # Global instance for Lambda runtime
@@ -54,8 +192,6 @@ def get_handler() -> MpicCaaCheckerLambdaHandler:
     """
     global _handler
     if _handler is None:
-        event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(event_loop)
         _handler = MpicCaaCheckerLambdaHandler()
     return _handler
 
@@ -64,8 +200,5 @@ if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
     get_handler()
 
 
-# noinspection PyUnusedLocal
-# for now, we are not using context, but it is required by the lambda handler signature
-@event_parser(model=CaaCheckRequest)
-def lambda_handler(event: CaaCheckRequest, context):  # AWS Lambda entry point
-    return get_handler().process_invocation(event)
+def lambda_handler(event, context):  # AWS Lambda entry point
+    return get_handler().handle_invocation(event, context)
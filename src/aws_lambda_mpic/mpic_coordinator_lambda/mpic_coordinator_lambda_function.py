@@ -1,24 +1,79 @@
+import time
+
+_import_start_time = time.perf_counter()  # start of the import phase of a cold start
+
 import os
 import json
+import math
+import base64
+import hashlib
 import traceback
 
-import yaml
 import asyncio
 import aioboto3
+import botocore.exceptions
 
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from enum import StrEnum
+from functools import partial
 from importlib import resources
-from pydantic import TypeAdapter, ValidationError, BaseModel
+from typing import Any, Callable, Literal
+from pydantic import TypeAdapter, ValidationError, BaseModel, Field
 from aws_lambda_powertools.utilities.parser import event_parser, envelopes
+from aiobotocore.config import AioConfig
+from aiobotocore.httpsession import AIOHTTPSession
 
-from open_mpic_core import MpicRequest, CheckRequest, CheckResponse
+from open_mpic_core import MpicRequest, MpicResponse, CheckRequest, CheckResponse
 from open_mpic_core import MpicRequestValidationException, MpicRequestValidationMessages
 from open_mpic_core import MpicCoordinator, MpicCoordinatorConfiguration
+from open_mpic_core import CohortCreator, CohortCreationException, ErrorMessages
 from open_mpic_core import CheckType
 from open_mpic_core import RemotePerspective
 from open_mpic_core import get_logger
 
+from aws_lambda_mpic.common_util.event_loop_runner import EventLoopRunner
+from aws_lambda_mpic.common_util.init_phase_timer import InitPhaseTimer
+from aws_lambda_mpic.common_util.payload_compression import PAYLOAD_COMPRESSION_TYPES, PayloadCompressionStatistics
+from aws_lambda_mpic.common_util.payload_compression import compress_payload_if_large, decompress_payload
+from aws_lambda_mpic.common_util.payload_compression import is_compressed_payload_json
+
 logger = get_logger(__name__)
 
+IMPORT_SECONDS = time.perf_counter() - _import_start_time
+
+# region configuration compiled by configure.py and added to the coordinator layer by package-layer.sh; the coordinator
+# falls back to aws_region_config.yaml without it or if it was compiled from a different aws_region_config.yaml
+COMPILED_AWS_REGION_CONFIG_FILE_NAME = "aws_region_config.generated.json"
+
+# asks checkers to return the check response(s) as the raw invocation result rather than as a JSON string in an
+# API Gateway style envelope, so the response payload can be validated in a single pass
+RAW_RESPONSE_FORMAT_CLIENT_CONTEXT = base64.b64encode(
+    json.dumps({"custom": {"response_format": "raw"}}).encode("utf-8")
+).decode("utf-8")
+
+# request header (matched case-insensitively) with which API callers ask for fresh CAA lookups, bypassing the CAA
+# checkers' lookup caches, e.g., for compliance reasons
+CAA_LOOKUP_CACHE_BYPASS_HEADER = "X-Bypass-CAA-Lookup-Cache"
+
+# validation issue of a batch request holding more than batch_max_size MPIC requests
+BATCH_TOO_LARGE_ISSUE_TYPE = "batch-too-large"
+
+# verbose per-perspective details (raw DNS records, redirect chains, page content) left out of compact responses
+COMPACT_RESPONSE_OMITTED_DETAILS = {"records_seen", "response_history", "response_page", "cname_chain"}
+_COMPACT_PERSPECTIVES_EXCLUDE = {"__all__": {"check_response": {"details": COMPACT_RESPONSE_OMITTED_DETAILS}}}
+COMPACT_MPIC_RESPONSE_EXCLUDE = {
+    "perspectives": _COMPACT_PERSPECTIVES_EXCLUDE,
+    "previous_attempt_results": {"__all__": _COMPACT_PERSPECTIVES_EXCLUDE},
+}
+
+
+class CompiledAwsRegionConfig(BaseModel):
+    # written by configure.py from aws_region_config.yaml, with only the deployed perspectives
+    source_sha256: str  # of the YAML file it was compiled from
+    aws_available_regions: list[RemotePerspective]
+
 
 class PerspectiveEndpointInfo(BaseModel):
     arn: str
@@ -29,23 +84,736 @@ class PerspectiveEndpoints(BaseModel):
     caa_endpoint_info: PerspectiveEndpointInfo
 
 
+class MpicBatchRequest(BaseModel):
+    # validated one by one when coordinated, so an invalid request is reported in its own result
+    mpic_requests: list[Any] = Field(min_length=1)
+
+
+class MpicBatchItemError(BaseModel):
+    error: str
+    validation_issues: list | None = None
+
+
+class MpicBatchItemResult(BaseModel):
+    index: int  # position of the corresponding request in the batch
+    mpic_response: MpicResponse | None = None
+    error: MpicBatchItemError | None = None
+
+
+class MpicBatchResponse(BaseModel):
+    results: list[MpicBatchItemResult]
+
+
+class CheckBatchRequest(BaseModel):
+    # wire format for sending several check requests to a remote perspective in a single invocation
+    check_requests: list[CheckRequest]
+
+
+class WarmupRequest(BaseModel):
+    # sent on a schedule (not through the API) to keep the coordinator and the check functions warm
+    warmup: Literal[True]
+    concurrency: int = Field(default=1, ge=1, le=10)  # concurrent pings, i.e., containers kept warm per function
+    hold_ms: int = Field(default=100, ge=0, le=1000)  # how long each checker holds a ping, so pings spread out
+
+
 class LambdaExecutionException(Exception):
     pass
 
 
-class MpicCoordinatorLambdaHandler:
-    def __init__(self):
-        perspectives_json = os.environ["perspectives"]
-        perspectives = {
-            code: PerspectiveEndpoints.model_validate(endpoints)
-            for code, endpoints in json.loads(perspectives_json).items()
+class PerspectiveCircuitOpenException(Exception):
+    """
+    Raised instead of calling a perspective whose circuit breaker is open (or half-open with its probe in flight).
+    """
+
+    pass
+
+
+class PerspectiveCallCoalescer:
+    """
+    Holds outbound perspective calls for a short window and sends the calls that are bound for the same perspective
+    and check type as a single batched invocation. A group is sent as soon as the window (started by its first call)
+    elapses or the group reaches the max batch size, whichever happens first.
+    """
+
+    def __init__(
+        self,
+        call_remote_perspective_function,
+        call_remote_perspective_batch_function,
+        batch_window_seconds: float,
+        max_batch_size: int,
+        log_level: int = None,
+    ):
+        self.call_remote_perspective_function = call_remote_perspective_function
+        self.call_remote_perspective_batch_function = call_remote_perspective_batch_function
+        self.batch_window_seconds = batch_window_seconds
+        self.max_batch_size = max_batch_size
+
+        self.logger = logger.getChild(self.__class__.__name__)
+        if log_level is not None:
+            self.logger.setLevel(log_level)
+
+        self._pending_calls: dict[tuple[str, CheckType], list[tuple[CheckRequest, asyncio.Future, float]]] = {}
+        self._flush_timers: dict[tuple[str, CheckType], asyncio.TimerHandle] = {}
+        self._send_tasks = set()  # keeps references to in-flight sends so they are not garbage collected
+
+        # metrics, since the last pop_statistics call
+        self.batches_sent = 0
+        self.calls_sent = 0
+        self.max_batch_size_sent = 0
+        self.total_added_latency_seconds = 0.0
+
+    async def call_remote_perspective(
+        self, perspective: RemotePerspective, check_type: CheckType, check_request: CheckRequest
+    ) -> CheckResponse:
+        event_loop = asyncio.get_running_loop()
+        group_key = (perspective.code, check_type)
+        response_future = event_loop.create_future()
+        pending_calls = self._pending_calls.setdefault(group_key, [])
+        pending_calls.append((check_request, response_future, event_loop.time()))
+
+        if len(pending_calls) >= self.max_batch_size:
+            self.flush(perspective, check_type)
+        elif len(pending_calls) == 1:
+            self._flush_timers[group_key] = event_loop.call_later(
+                self.batch_window_seconds, self.flush, perspective, check_type
+            )
+        return await response_future
+
+    def flush(self, perspective: RemotePerspective, check_type: CheckType):
+        group_key = (perspective.code, check_type)
+        flush_timer = self._flush_timers.pop(group_key, None)
+        if flush_timer is not None:
+            flush_timer.cancel()
+        pending_calls = self._pending_calls.pop(group_key, None)
+        if pending_calls:
+            send_task = asyncio.ensure_future(self.send_pending_calls(perspective, check_type, pending_calls))
+            self._send_tasks.add(send_task)
+            send_task.add_done_callback(self._send_tasks.discard)
+
+    def pop_statistics(self) -> dict | None:
+        """
+        :return: a summary of the batches sent since the last call (sizes and the latency added by holding the calls),
+                 or None if none were sent since
+        """
+        if self.batches_sent == 0:
+            return None
+        summary = {
+            "batches_sent": self.batches_sent,
+            "calls_sent": self.calls_sent,
+            "mean_batch_size": round(self.calls_sent / self.batches_sent, 2),
+            "max_batch_size": self.max_batch_size_sent,
+            "mean_added_latency_ms": round(self.total_added_latency_seconds / self.batches_sent * 1000, 2),
         }
+        self.batches_sent = 0
+        self.calls_sent = 0
+        self.max_batch_size_sent = 0
+        self.total_added_latency_seconds = 0.0
+        return summary
+
+    async def send_pending_calls(self, perspective: RemotePerspective, check_type: CheckType, pending_calls: list):
+        added_latency_seconds = asyncio.get_running_loop().time() - pending_calls[0][2]
+        self.batches_sent += 1
+        self.calls_sent += len(pending_calls)
+        self.max_batch_size_sent = max(self.max_batch_size_sent, len(pending_calls))
+        self.total_added_latency_seconds += added_latency_seconds
+        self.logger.debug(
+            f"Sending batch of {len(pending_calls)} {check_type} check(s) to perspective {perspective.code} "
+            f"after holding for {added_latency_seconds * 1000:.1f} ms"
+        )
+
+        check_requests = [check_request for check_request, _, _ in pending_calls]
+        try:
+            if len(check_requests) == 1:  # no need for the batch wire format
+                check_responses = [
+                    await self.call_remote_perspective_function(perspective, check_type, check_requests[0])
+                ]
+            else:
+                check_responses = await self.call_remote_perspective_batch_function(
+                    perspective, check_type, check_requests
+                )
+        except Exception as e:
+            for _, response_future, _ in pending_calls:
+                if not response_future.done():  # the caller may have been cancelled in the meantime
+                    response_future.set_exception(e)
+        else:
+            for (_, response_future, _), check_response in zip(pending_calls, check_responses):
+                if not response_future.done():
+                    response_future.set_result(check_response)
+
+
+class PerspectiveCallOutcome(StrEnum):
+    SUCCESS = "success"
+    ERROR = "error"
+    TIMEOUT = "timeout"
+    CANCELLED = "cancelled"  # e.g., an original call that lost to its hedge; its latency is a lower bound
+
+
+_LATENCY_SAMPLE_OUTCOMES = {PerspectiveCallOutcome.SUCCESS, PerspectiveCallOutcome.CANCELLED}
+
+
+class PerspectiveCallStatistics:
+    """
+    Keeps the latency and outcome of the most recent calls per perspective and check type in a rolling window, which
+    outlives single invocations of the coordinator. Latency percentiles are computed over the successful and
+    cancelled calls of a window (the time a cancelled call ran for being a lower bound of its latency, so that slow
+    calls cut short by a hedge still count toward the tail) and are not reported until it holds at least MIN_SAMPLES
+    of them. Error rates are computed over the calls that completed (were not cancelled).
+    """
+
+    MIN_SAMPLES = 10
+    SUMMARY_PERCENTILES = (50, 90, 99)
+
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+        self._calls: dict[tuple[str, CheckType], deque[tuple[float, PerspectiveCallOutcome]]] = {}
+        self._last_recorded_at: dict[tuple[str, CheckType], float] = {}
+
+    def record(
+        self,
+        perspective_code: str,
+        check_type: CheckType,
+        latency_seconds: float,
+        outcome: PerspectiveCallOutcome = PerspectiveCallOutcome.SUCCESS,
+    ):
+        calls = self._calls.setdefault((perspective_code, check_type), deque(maxlen=self.window_size))
+        calls.append((latency_seconds, outcome))
+        self._last_recorded_at[(perspective_code, check_type)] = time.monotonic()
+
+    def get_call_latencies(self, perspective_code: str, check_type: CheckType) -> list[float]:
+        """
+        :return: the sorted latencies of the successful calls and the (lower bound) latencies of the cancelled calls
+        """
+        calls = self._calls.get((perspective_code, check_type), ())
+        return sorted(latency for latency, outcome in calls if outcome in _LATENCY_SAMPLE_OUTCOMES)
+
+    def get_percentile(self, perspective_code: str, check_type: CheckType, percentile: float) -> float | None:
+        latencies = self.get_call_latencies(perspective_code, check_type)
+        return PerspectiveCallStatistics.get_percentile_of_sorted(latencies, percentile)
+
+    @staticmethod
+    def count_outcomes(calls) -> dict[PerspectiveCallOutcome, int]:
+        outcome_counts = dict.fromkeys(PerspectiveCallOutcome, 0)
+        for _, outcome in calls:
+            outcome_counts[outcome] += 1
+        return outcome_counts
+
+    @staticmethod
+    def get_error_rate(outcome_counts: dict[PerspectiveCallOutcome, int]) -> float | None:
+        completed_calls = sum(outcome_counts.values()) - outcome_counts[PerspectiveCallOutcome.CANCELLED]
+        if completed_calls == 0:
+            return None
+        return 1 - outcome_counts[PerspectiveCallOutcome.SUCCESS] / completed_calls
+
+    @classmethod
+    def get_percentile_of_sorted(cls, sorted_latencies: list[float], percentile: float) -> float | None:
+        if len(sorted_latencies) < cls.MIN_SAMPLES:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * len(sorted_latencies)))  # nearest-rank method
+        return sorted_latencies[rank - 1]
+
+    def get_health_scores(self, check_type: CheckType, max_age_seconds: float) -> dict[str, float]:
+        """
+        Scores each perspective by its expected latency to a successful response for the given check type: the median
+        latency of its successful calls divided by its success rate (lower is healthier). Perspectives with fewer than
+        MIN_SAMPLES calls, or with no call recorded within max_age_seconds, are not scored.
+        """
+        health_scores = {}
+        now = time.monotonic()
+        for (perspective_code, calls_check_type), calls in self._calls.items():
+            if calls_check_type != check_type or len(calls) < self.MIN_SAMPLES:
+                continue
+            if now - self._last_recorded_at[(perspective_code, calls_check_type)] > max_age_seconds:
+                continue
+            error_rate = self.get_error_rate(self.count_outcomes(calls))
+            if error_rate == 1:
+                health_scores[perspective_code] = math.inf
+            else:
+                latencies = self.get_call_latencies(perspective_code, check_type)
+                median_latency = latencies[(len(latencies) - 1) // 2]
+                health_scores[perspective_code] = median_latency / (1 - (error_rate or 0))
+        return health_scores
+
+    def summarize(self) -> list[dict]:
+        """
+        :return: a compact summary of the current window of each perspective and check type
+        """
+        summaries = []
+        for (perspective_code, check_type), calls in self._calls.items():
+            latencies = self.get_call_latencies(perspective_code, check_type)
+            outcome_counts = self.count_outcomes(calls)
+            error_rate = self.get_error_rate(outcome_counts)
+            summary = {
+                "perspective": perspective_code,
+                "check_type": str(check_type),
+                "calls": len(calls),
+                "error_rate": round(error_rate, 4) if error_rate is not None else None,
+                "timeouts": outcome_counts[PerspectiveCallOutcome.TIMEOUT],
+                "cancelled": outcome_counts[PerspectiveCallOutcome.CANCELLED],  # slower than their hedge
+            }
+            for percentile in self.SUMMARY_PERCENTILES:
+                latency = PerspectiveCallStatistics.get_percentile_of_sorted(latencies, percentile)
+                summary[f"latency_p{percentile}_ms"] = round(latency * 1000, 1) if latency is not None else None
+            summaries.append(summary)
+        return summaries
+
+
+class CircuitBreakerState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreakerCall:
+    """
+    A call let through by a circuit breaker, handed back to it with the outcome of the call. Only outcomes of calls
+    made in the breaker's current state (generation) count, so calls that were in flight when the breaker changed
+    state cannot change it again; in the half-open state, only the outcome of the probe call counts.
+    """
+
+    def __init__(self, generation: int, is_probe: bool):
+        self.generation = generation
+        self.is_probe = is_probe
+
+
+class PerspectiveCircuitBreaker:
+    """
+    Circuit breakers for the check functions of each perspective (keyed by perspective code and check type).
+    A breaker opens after failure_threshold consecutive failed calls, after which calls fail fast for open_seconds.
+    Then it turns half-open and lets a single probe call through: the breaker closes if the probe succeeds and opens
+    again if it fails.
+    """
+
+    def __init__(self, failure_threshold: int, open_seconds: float, log_level: int = None):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+
+        self.logger = logger.getChild(self.__class__.__name__)
+        if log_level is not None:
+            self.logger.setLevel(log_level)
+
+        self._states: dict[tuple[str, CheckType], CircuitBreakerState] = {}
+        self._generations: dict[tuple[str, CheckType], int] = {}  # incremented on every state change
+        self._consecutive_failures: dict[tuple[str, CheckType], int] = {}
+        self._opened_at: dict[tuple[str, CheckType], float] = {}
+        self._probes_in_flight: set[tuple[str, CheckType]] = set()
+
+        # metrics
+        self.state_change_counts = {state: 0 for state in CircuitBreakerState}
+        self.rejected_calls = 0
+
+    def get_state(self, perspective_code: str, check_type: CheckType) -> CircuitBreakerState:
+        return self._states.get((perspective_code, check_type), CircuitBreakerState.CLOSED)
+
+    def before_call(self, perspective_code: str, check_type: CheckType) -> CircuitBreakerCall:
+        """
+        :return: the call, to pass to record_success, record_failure or record_cancellation once it is done
+        :raises PerspectiveCircuitOpenException: if the call must not be made
+        """
+        breaker_key = (perspective_code, check_type)
+        state = self.get_state(perspective_code, check_type)
+        if state == CircuitBreakerState.OPEN and time.monotonic() - self._opened_at[breaker_key] >= self.open_seconds:
+            state = self._change_state(breaker_key, CircuitBreakerState.HALF_OPEN)
+        if state == CircuitBreakerState.HALF_OPEN and breaker_key not in self._probes_in_flight:
+            self._probes_in_flight.add(breaker_key)
+            return CircuitBreakerCall(self._generations[breaker_key], is_probe=True)
+        if state != CircuitBreakerState.CLOSED:
+            self.rejected_calls += 1
+            raise PerspectiveCircuitOpenException(
+                f"Circuit breaker for {check_type} checks of perspective {perspective_code} is {state}"
+            )
+        return CircuitBreakerCall(self._generations.get(breaker_key, 0), is_probe=False)
+
+    def record_success(self, perspective_code: str, check_type: CheckType, call: CircuitBreakerCall):
+        breaker_key = (perspective_code, check_type)
+        if not self._is_current(breaker_key, call):  # e.g., a late success of a call made before the breaker opened
+            return
+        self._consecutive_failures[breaker_key] = 0
+        if call.is_probe:
+            self._probes_in_flight.discard(breaker_key)
+            self._change_state(breaker_key, CircuitBreakerState.CLOSED)
+
+    def record_failure(self, perspective_code: str, check_type: CheckType, call: CircuitBreakerCall):
+        breaker_key = (perspective_code, check_type)
+        if not self._is_current(breaker_key, call):  # e.g., a call made before a half-open breaker's probe
+            return
+        consecutive_failures = self._consecutive_failures.get(breaker_key, 0) + 1
+        self._consecutive_failures[breaker_key] = consecutive_failures
+        if call.is_probe:
+            self._probes_in_flight.discard(breaker_key)
+        if call.is_probe or consecutive_failures >= self.failure_threshold:
+            self._opened_at[breaker_key] = time.monotonic()
+            self._change_state(breaker_key, CircuitBreakerState.OPEN)
+
+    def record_cancellation(self, perspective_code: str, check_type: CheckType, call: CircuitBreakerCall):
+        breaker_key = (perspective_code, check_type)
+        if call.is_probe and self._is_current(breaker_key, call):
+            self._probes_in_flight.discard(breaker_key)  # lets another call probe the perspective
+
+    def _is_current(self, breaker_key: tuple[str, CheckType], call: CircuitBreakerCall) -> bool:
+        return call.generation == self._generations.get(breaker_key, 0)
+
+    def _change_state(self, breaker_key: tuple[str, CheckType], new_state: CircuitBreakerState) -> CircuitBreakerState:
+        perspective_code, check_type = breaker_key
+        old_state = self.get_state(perspective_code, check_type)
+        self._states[breaker_key] = new_state
+        self._generations[breaker_key] = self._generations.get(breaker_key, 0) + 1
+        self.state_change_counts[new_state] += 1
+        self.logger.warning(
+            f"Circuit breaker for {check_type} checks of perspective {perspective_code} changed from {old_state} "
+            f"to {new_state} ({self._consecutive_failures.get(breaker_key, 0)} consecutive failures)"
+        )
+        return new_state
+
+
+class LambdaClientConnectionStatistics:
+    def __init__(self):
+        self.requests_sent = 0
+        self.connections_opened = 0
+
+    def get_reuse_rate(self) -> float | None:
+        """
+        :return: the share of requests sent over an already open (pooled) connection
+        """
+        if self.requests_sent == 0:
+            return None
+        return max(0.0, 1 - self.connections_opened / self.requests_sent)
+
+
+class InstrumentedAioHttpSession(AIOHTTPSession):
+    """
+    aiobotocore HTTP session that counts the requests it sends and the connections it opens, from which the connection
+    reuse rate is derived. It also applies the socket options computed by botocore (such as TCP keepalive, set with
+    the tcp_keepalive client config) to the connections it opens, which aiobotocore itself does not do.
+    """
+
+    def __init__(self, *args, connection_statistics: LambdaClientConnectionStatistics, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection_statistics = connection_statistics
+
+    def _create_connector(self, proxy_url):
+        connector = super()._create_connector(proxy_url)
+        create_connection = connector._create_connection  # called by aiohttp only when no pooled connection is free
+
+        async def create_connection_with_socket_options(*args, **kwargs):
+            protocol = await create_connection(*args, **kwargs)
+            self.connection_statistics.connections_opened += 1
+            connection_socket = protocol.transport.get_extra_info("socket") if protocol.transport else None
+            if connection_socket is not None:
+                for level, option_name, value in self._socket_options:
+                    connection_socket.setsockopt(level, option_name, value)
+            return protocol
+
+        connector._create_connection = create_connection_with_socket_options
+        return connector
+
+    async def send(self, request):
+        self.connection_statistics.requests_sent += 1
+        return await super().send(request)
+
+
+class ManagedLambdaClient:
+    def __init__(self, client, exit_stack: AsyncExitStack, session: aioboto3.Session):
+        self.client = client
+        self.exit_stack = exit_stack  # exits the client context, closing its connections
+        self.session = session  # the session (and so the credentials) the client was created with
+        self.created_at = time.monotonic()
+        self.in_flight_calls = 0
+        self.retired = False  # invalidated; closed once its in-flight calls are done
+
+
+class LambdaClientRegistry:
+    """
+    Owns the coordinator's per-perspective Lambda clients. A client is created on first use (concurrent first uses
+    wait for a single client) and its context is held open in an AsyncExitStack until the client is invalidated or
+    the registry is closed. Invalidating a client after a connection error takes it out of the registry so the next
+    call gets a new one; invalidating it after credential expiry also replaces the session, retiring every client
+    created with the old credentials at once rather than letting each of them fail on its own. Calls hold a client
+    with use_client, and a retired client is only closed once the calls still using it are done, as closing it
+    also closes the connections they are using.
+    """
+
+    def __init__(self, create_client_config, log_level: int = None):
+        self.create_client_config = create_client_config  # LambdaClientConnectionStatistics -> AioConfig
+        self._session = aioboto3.Session()
+        self._clients: dict[str, ManagedLambdaClient] = {}
+        self._client_locks: dict[str, asyncio.Lock] = {}
+        self._retired_clients: set[ManagedLambdaClient] = set()  # retired but still in use
+        self._closed = False
+        self.client_init_seconds: dict[str, float] = {}  # time taken to create the current client of each perspective
+        self.connection_statistics: dict[str, LambdaClientConnectionStatistics] = {}  # kept across reinitializations
+        self.reinitialization_counts: dict[str, int] = {}
+        self.logger = logger.getChild(self.__class__.__name__)
+        if log_level is not None:
+            self.logger.setLevel(log_level)
+
+    async def get_client(self, perspective_code: str):
+        return (await self._get_managed_client(perspective_code)).client
+
+    @asynccontextmanager
+    async def use_client(self, perspective_code: str):
+        """
+        Holds the client of the perspective for a call, so that it is not closed while the call is using it.
+        """
+        managed_client = await self._get_managed_client(perspective_code)
+        managed_client.in_flight_calls += 1
+        try:
+            yield managed_client.client
+        finally:
+            managed_client.in_flight_calls -= 1
+            if managed_client.retired and managed_client.in_flight_calls == 0:
+                self._retired_clients.discard(managed_client)
+                await asyncio.shield(managed_client.exit_stack.aclose())  # even if the call was cancelled
+
+    async def _get_managed_client(self, perspective_code: str) -> ManagedLambdaClient:
+        managed_client = self._clients.get(perspective_code)
+        if managed_client is not None:
+            return managed_client
+        if self._closed:
+            raise RuntimeError("Lambda client registry is closed")
+        async with self._client_locks.setdefault(perspective_code, asyncio.Lock()):
+            if perspective_code not in self._clients:
+                start_time = time.perf_counter()
+                connection_statistics = self.connection_statistics.setdefault(
+                    perspective_code, LambdaClientConnectionStatistics()
+                )
+                exit_stack = AsyncExitStack()
+                client = await exit_stack.enter_async_context(
+                    self._session.client(
+                        "lambda", perspective_code, config=self.create_client_config(connection_statistics)
+                    )
+                )
+                self._clients[perspective_code] = ManagedLambdaClient(client, exit_stack, self._session)
+                self.client_init_seconds[perspective_code] = time.perf_counter() - start_time
+                self.logger.debug(
+                    f"Created Lambda client for perspective {perspective_code} ({len(self._clients)} open) "
+                    f"in {self.client_init_seconds[perspective_code] * 1000:.1f} ms"
+                )
+            return self._clients[perspective_code]
+
+    async def invalidate_client(self, perspective_code: str, client, refresh_credentials: bool = False):
+        """
+        Retires the given client of the perspective so that the next call creates a new one, closing it right away
+        if no call is using it. Does nothing if the client was already replaced (e.g., by a concurrent call that hit
+        the same error).
+        :param refresh_credentials: also replace the session, and with it every client created with the old one
+        """
+        managed_client = self._clients.get(perspective_code)
+        if managed_client is None or managed_client.client is not client:
+            return
+        if refresh_credentials and managed_client.session is self._session:
+            self.logger.warning(
+                f"Refreshing credentials of Lambda clients after credential expiry ({perspective_code})"
+            )
+            expired_session = self._session
+            self._session = aioboto3.Session()
+            expired_codes = [code for code, managed in self._clients.items() if managed.session is expired_session]
+        else:
+            self.logger.warning(f"Reinitializing Lambda client for perspective {perspective_code}")
+            expired_codes = [perspective_code]
+        idle_clients = []
+        for code in expired_codes:
+            expired_client = self._clients.pop(code)
+            expired_client.retired = True
+            if expired_client.in_flight_calls == 0:
+                idle_clients.append(expired_client)
+            else:
+                self._retired_clients.add(expired_client)  # closed by use_client once its last call is done
+            self.reinitialization_counts[code] = self.reinitialization_counts.get(code, 0) + 1
+        await asyncio.shield(asyncio.gather(*[idle_client.exit_stack.aclose() for idle_client in idle_clients]))
+
+    def get_health(self) -> list[dict]:
+        """
+        :return: the state of the client of each perspective that has had one, for health checks and metrics
+        """
+        now = time.monotonic()
+        return [
+            {
+                "perspective": perspective_code,
+                "open": perspective_code in self._clients,
+                "age_seconds": (
+                    now - self._clients[perspective_code].created_at if perspective_code in self._clients else None
+                ),
+                "reinitializations": self.reinitialization_counts.get(perspective_code, 0),
+            }
+            for perspective_code in self.connection_statistics
+        ]
+
+    async def close(self):
+        self._closed = True
+        closed_clients = [*self._clients.values(), *self._retired_clients]
+        self._clients.clear()
+        self._retired_clients.clear()
+        await asyncio.gather(*[closed_client.exit_stack.aclose() for closed_client in closed_clients])
+
+
+class PerspectiveCallHedgeBudget:
+    """
+    Caps the number of hedged (duplicate) perspective calls made while coordinating a single MPIC request.
+    """
+
+    def __init__(self, max_hedges: int):
+        self.hedges_remaining = max_hedges
+
+    def try_acquire(self) -> bool:
+        if self.hedges_remaining <= 0:
+            return False
+        self.hedges_remaining -= 1
+        return True
+
+
+class CheckRequestPayloadCache:
+    """
+    Holds the serialized check request of a single MPIC request, so that it is dumped once and the same payload is
+    sent to every perspective. The coordinator shares one check request object across the perspectives of an attempt
+    and builds an equal one for each further attempt, so the cached payload is reused if the check request is the
+    cached one or equal to it (a cheap comparison, as the check parameters are shared with the MPIC request).
+    """
+
+    def __init__(self):
+        self.check_request: CheckRequest | None = None
+        self.payload: str | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_payload(self, check_request: CheckRequest) -> str:
+        if check_request is self.check_request or (
+            self.check_request is not None and check_request == self.check_request
+        ):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.payload = check_request.model_dump_json()
+        self.check_request = check_request  # the next call of the same attempt then only compares identity
+        return self.payload
+
+
+class HealthAwareMpicCoordinator(MpicCoordinator):
+    """
+    MPIC coordinator that, within each RIR, prefers the perspectives that have recently been the fastest and most
+    reliable for the check type being coordinated, so the first cohorts are made of healthy perspectives. Cohorts are
+    still formed by the CohortCreator, so RIR diversity and the distance between perspectives are respected.
+    Perspectives with the same (bucketed) health score keep their seeded shuffle order, so the selection is
+    deterministic for a given health snapshot. Perspectives without a score rank at the median score, so they get
+    calls (and so statistics) without crowding out the perspectives known to be healthy.
+    """
+
+    HEALTH_SCORE_RESOLUTION_SECONDS = 0.05
+
+    def __init__(
+        self,
+        call_remote_perspective_function,
+        mpic_coordinator_configuration: MpicCoordinatorConfiguration,
+        get_health_scores_function,
+        log_level: int = None,
+    ):
+        """
+        :param get_health_scores_function: returns a dict of health scores (lower is healthier) by perspective code
+               for the check type of the MPIC request being coordinated
+        """
+        super().__init__(call_remote_perspective_function, mpic_coordinator_configuration, log_level)
+        self.get_health_scores_function = get_health_scores_function
+
+    def shuffle_and_group_perspectives(self, target_perspectives, cohort_size, domain_or_ip_target):
+        if cohort_size > len(target_perspectives):
+            raise CohortCreationException(ErrorMessages.COHORT_CREATION_ERROR.message.format(cohort_size))
+
+        random_seed = hashlib.sha256((self.hash_secret + domain_or_ip_target.lower()).encode("utf-8")).digest()
+        perspectives_per_rir = CohortCreator.shuffle_available_perspectives_per_rir(target_perspectives, random_seed)
+        health_scores = self.get_health_scores_function()
+        sorted_health_scores = sorted(health_scores.values())
+        unscored_health_score = sorted_health_scores[(len(sorted_health_scores) - 1) // 2] if health_scores else 0.0
+
+        def get_health_rank(perspective: RemotePerspective):
+            health_score = health_scores.get(perspective.code, unscored_health_score)
+            if math.isinf(health_score):
+                return health_score
+            return math.floor(health_score / self.HEALTH_SCORE_RESOLUTION_SECONDS)
+
+        for perspectives in perspectives_per_rir.values():
+            perspectives.sort(key=get_health_rank)  # stable sort, so ties keep their seeded shuffle order
+        self.logger.debug(f"Perspective health scores: {health_scores}")
+        return CohortCreator.create_perspective_cohorts(perspectives_per_rir, cohort_size)
+
+
+class MpicCoordinatorLambdaHandler:
+    # set per MPIC request being coordinated; shared by all perspective calls made for that request
+    _hedge_budget: ContextVar[PerspectiveCallHedgeBudget | None] = ContextVar(
+        "perspective_call_hedge_budget", default=None
+    )
+    _check_request_payload_cache: ContextVar[CheckRequestPayloadCache | None] = ContextVar(
+        "check_request_payload_cache", default=None
+    )
+    _coordinated_check_type: ContextVar[CheckType | None] = ContextVar("coordinated_check_type", default=None)
+    _caa_lookup_cache_bypassed: ContextVar[bool] = ContextVar("caa_lookup_cache_bypassed", default=False)
+
+    # a loop_factory, if given, makes the event loop instead of the configured event loop type (see EventLoopRunner)
+    def __init__(self, loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None):
+        self.init_phase_timer = InitPhaseTimer(IMPORT_SECONDS)
+        self.invocation_count = 0  # invocations served by this container
+
+        with self.init_phase_timer.measure("perspectives_config"):
+            perspectives_json = os.environ["perspectives"]
+            perspectives = {
+                code: PerspectiveEndpoints.model_validate(endpoints)
+                for code, endpoints in json.loads(perspectives_json).items()
+            }
         self._all_target_perspective_codes = list(perspectives.keys())
         self.default_perspective_count = int(os.environ["default_perspective_count"])
         self.global_max_attempts = (
             int(os.environ["absolute_max_attempts"]) if "absolute_max_attempts" in os.environ else None
         )
         self.hash_secret = os.environ["hash_secret"]
+        self.batch_max_concurrency = int(os.getenv("batch_max_concurrency", 10))
+        self.batch_max_size = int(os.getenv("batch_max_size", 100))
+        self.mpic_response_details = os.getenv("mpic_response_details", "full")  # "full" or "compact"
+        self.perspective_call_batch_window_seconds = float(os.getenv("perspective_call_batch_window_ms", 0)) / 1000
+        self.perspective_call_batch_max_size = int(os.getenv("perspective_call_batch_max_size", 10))
+        self.perspective_call_hedge_percentile = float(os.getenv("perspective_call_hedge_percentile", 0))  # 0 = off
+        self.perspective_call_hedge_max_per_request = int(os.getenv("perspective_call_hedge_max_per_request", 2))
+        self.perspective_latency_window_size = int(os.getenv("perspective_latency_window_size", 100))
+        self.perspective_stats_emit_interval_seconds = float(os.getenv("perspective_stats_emit_interval_seconds", 0))
+        self.perspective_stats_format = os.getenv("perspective_stats_format", "log")  # "log" or "emf"
+        self.perspective_selection_policy = os.getenv("perspective_selection_policy", "random")  # or "health"
+        self.perspective_health_max_age_seconds = float(os.getenv("perspective_health_max_age_seconds", 300))
+        self.perspective_circuit_breaker_failure_threshold = int(
+            os.getenv("perspective_circuit_breaker_failure_threshold", 0)  # 0 disables the circuit breakers
+        )
+        self.perspective_circuit_breaker_open_seconds = float(os.getenv("perspective_circuit_breaker_open_seconds", 30))
+        # "serial" creates the Lambda clients one after another, "concurrent" all at once, "lazy" each on first use
+        self.lambda_client_init_mode = os.getenv("lambda_client_init_mode", "serial")
+        # compression of perspective call payloads (requests and responses) of at least the given size
+        self.perspective_payload_compression = os.getenv("perspective_payload_compression", "none")  # or "zlib"
+        self.perspective_payload_compression_min_bytes = int(
+            os.getenv("perspective_payload_compression_min_bytes", 16384)
+        )
+        # Lambda client (botocore) settings; botocore defaults apply to any that are not set
+        self.lambda_client_max_pool_connections = (
+            int(os.environ["lambda_client_max_pool_connections"])
+            if "lambda_client_max_pool_connections" in os.environ
+            else None
+        )
+        self.lambda_client_connect_timeout_seconds = (
+            float(os.environ["lambda_client_connect_timeout_seconds"])
+            if "lambda_client_connect_timeout_seconds" in os.environ
+            else None
+        )
+        self.lambda_client_read_timeout_seconds = (
+            float(os.environ["lambda_client_read_timeout_seconds"])
+            if "lambda_client_read_timeout_seconds" in os.environ
+            else None
+        )
+        self.lambda_client_retry_mode = os.getenv("lambda_client_retry_mode", None)  # legacy, standard or adaptive
+        self.lambda_client_max_attempts = (
+            int(os.environ["lambda_client_max_attempts"]) if "lambda_client_max_attempts" in os.environ else None
+        )
+        self.lambda_client_tcp_keepalive = os.getenv("lambda_client_tcp_keepalive", "false").lower() == "true"
+        self.lambda_client_keepalive_timeout_seconds = (  # how long idle pooled connections are kept for reuse
+            float(os.environ["lambda_client_keepalive_timeout_seconds"])
+            if "lambda_client_keepalive_timeout_seconds" in os.environ
+            else None
+        )
+        self.event_loop_type = os.getenv("event_loop_type", "asyncio")  # "asyncio" or "uvloop"
+        self.event_loop_lag_probe_interval_ms = int(os.getenv("event_loop_lag_probe_interval_ms", 0))  # 0 disables
         self.log_level = os.getenv("log_level", None)
 
         self.logger = logger.getChild(self.__class__.__name__)
@@ -63,7 +831,10 @@ class MpicCoordinatorLambdaHandler:
             },
         }
 
-        all_possible_perspectives_by_code = MpicCoordinatorLambdaHandler.load_aws_region_config()
+        with self.init_phase_timer.measure("load_aws_region_config"):
+            all_possible_perspectives_by_code = MpicCoordinatorLambdaHandler.load_aws_region_config(
+                self._all_target_perspective_codes
+            )
         self.target_perspectives = MpicCoordinatorLambdaHandler.convert_codes_to_remote_perspectives(
             self._all_target_perspective_codes, all_possible_perspectives_by_code
         )
@@ -72,73 +843,709 @@ class MpicCoordinatorLambdaHandler:
             self.target_perspectives, self.default_perspective_count, self.global_max_attempts, self.hash_secret
         )
 
-        self.mpic_coordinator = MpicCoordinator(
-            self.call_remote_perspective, self.mpic_coordinator_configuration, self.logger.level
+        # recent latencies and outcomes of perspective calls; also drives hedging of slow calls if enabled
+        self.perspective_call_statistics = PerspectiveCallStatistics(self.perspective_latency_window_size)
+        self._perspective_stats_last_emitted = time.monotonic()
+
+        # opt-in compression of perspective call payloads; checkers are asked to compress their responses as well
+        if self.perspective_payload_compression not in PAYLOAD_COMPRESSION_TYPES:
+            raise ValueError(
+                f"Unsupported perspective payload compression: {self.perspective_payload_compression}. "
+                f"Expected one of {PAYLOAD_COMPRESSION_TYPES}."
+            )
+        self.perspective_invoke_client_context = MpicCoordinatorLambdaHandler.create_invoke_client_context(
+            self.perspective_payload_compression, self.perspective_payload_compression_min_bytes
+        )
+        self.caa_lookup_cache_bypass_invoke_client_context = MpicCoordinatorLambdaHandler.create_invoke_client_context(
+            self.perspective_payload_compression,
+            self.perspective_payload_compression_min_bytes,
+            bypass_caa_lookup_cache=True,
         )
+        self.request_compression_statistics = PayloadCompressionStatistics()
+        self.response_compression_statistics = PayloadCompressionStatistics()
+
+        # opt-in leaving out of verbose perspective details from responses, which can otherwise reach hundreds of KB
+        self.mpic_response_exclude = COMPACT_MPIC_RESPONSE_EXCLUDE if self.mpic_response_details == "compact" else None
+
+        with self.init_phase_timer.measure("coordinator"):
+            if self.perspective_selection_policy == "health":
+                self.mpic_coordinator = HealthAwareMpicCoordinator(
+                    self.call_remote_perspective,
+                    self.mpic_coordinator_configuration,
+                    self.get_perspective_health_scores,
+                    self.logger.level,
+                )
+            else:
+                self.mpic_coordinator = MpicCoordinator(
+                    self.call_remote_perspective, self.mpic_coordinator_configuration, self.logger.level
+                )
 
         # for correct deserialization of responses based on discriminator field (check type)
-        self.mpic_request_adapter = TypeAdapter(MpicRequest)
-        self.check_response_adapter = TypeAdapter(CheckResponse)
+        with self.init_phase_timer.measure("type_adapters"):
+            self.mpic_request_adapter = TypeAdapter(MpicRequest)
+            self.check_response_adapter = TypeAdapter(CheckResponse)
+            self.check_response_list_adapter = TypeAdapter(list[CheckResponse])
 
-        self._clients = {}
-        asyncio.get_event_loop().run_until_complete(self.initialize_clients())
+        # opt-in coalescing of concurrent calls to the same perspective (e.g., from batch requests) into single invokes
+        self.perspective_call_coalescer = None
+        if self.perspective_call_batch_window_seconds > 0:
+            self.perspective_call_coalescer = PerspectiveCallCoalescer(
+                self.call_remote_perspective_unbatched,
+                self.call_remote_perspective_batch,
+                self.perspective_call_batch_window_seconds,
+                self.perspective_call_batch_max_size,
+                self.logger.level,
+            )
+
+        # opt-in fast failing of calls to perspectives that keep failing
+        self.perspective_circuit_breaker = None
+        if self.perspective_circuit_breaker_failure_threshold > 0:
+            self.perspective_circuit_breaker = PerspectiveCircuitBreaker(
+                self.perspective_circuit_breaker_failure_threshold,
+                self.perspective_circuit_breaker_open_seconds,
+                self.logger.level,
+            )
+
+        self.lambda_client_registry = LambdaClientRegistry(self.create_lambda_client_config, self.logger.level)
+        # the loop the clients are bound to, reused by every invocation
+        self.event_loop_runner = EventLoopRunner(
+            self.event_loop_type, self.event_loop_lag_probe_interval_ms / 1000, loop_factory
+        )
+        with self.init_phase_timer.measure("client_init"):
+            self.event_loop_runner.run(self.initialize_clients())
 
     async def initialize_clients(self):
-        session = aioboto3.Session()
-        for perspective_code in self._all_target_perspective_codes:
-            self._clients[perspective_code] = await session.client("lambda", perspective_code).__aenter__()
+        if self.lambda_client_init_mode == "lazy":
+            return
+        start_time = time.perf_counter()
+        if self.lambda_client_init_mode == "concurrent":
+            await asyncio.gather(
+                *[self.get_client(perspective_code) for perspective_code in self._all_target_perspective_codes]
+            )
+        else:
+            for perspective_code in self._all_target_perspective_codes:
+                await self.get_client(perspective_code)
+        self.logger.debug(
+            f"Created {len(self._all_target_perspective_codes)} Lambda clients ({self.lambda_client_init_mode}) "
+            f"in {(time.perf_counter() - start_time) * 1000:.1f} ms"
+        )
+
+    async def get_client(self, perspective_code: str):
+        """
+        Returns the Lambda client for the perspective, creating it on first use.
+        """
+        return await self.lambda_client_registry.get_client(perspective_code)
+
+    def shutdown(self):
+        """
+        Closes the Lambda clients and their connections, then the event loop. The handler cannot be used afterward.
+        The Lambda runtime discards containers without notice, so this is for processes that end on their own (such
+        as the local benchmarks).
+        """
+        self.event_loop_runner.run(self.lambda_client_registry.close())
+        self.event_loop_runner.close()
+
+    def create_lambda_client_config(self, connection_statistics: LambdaClientConnectionStatistics) -> AioConfig:
+        config_options = {"tcp_keepalive": self.lambda_client_tcp_keepalive}
+        if self.lambda_client_max_pool_connections is not None:
+            config_options["max_pool_connections"] = self.lambda_client_max_pool_connections
+        if self.lambda_client_connect_timeout_seconds is not None:
+            config_options["connect_timeout"] = self.lambda_client_connect_timeout_seconds
+        if self.lambda_client_read_timeout_seconds is not None:
+            config_options["read_timeout"] = self.lambda_client_read_timeout_seconds
+        retries = {}
+        if self.lambda_client_retry_mode is not None:
+            retries["mode"] = self.lambda_client_retry_mode
+        if self.lambda_client_max_attempts is not None:
+            retries["total_max_attempts"] = self.lambda_client_max_attempts
+        if retries:
+            config_options["retries"] = retries
+        connector_args = None
+        if self.lambda_client_keepalive_timeout_seconds is not None:
+            connector_args = {"keepalive_timeout": self.lambda_client_keepalive_timeout_seconds}
+        return AioConfig(
+            connector_args=connector_args,
+            http_session_cls=partial(InstrumentedAioHttpSession, connection_statistics=connection_statistics),
+            **config_options,
+        )
 
     @staticmethod
-    def load_aws_region_config() -> dict[str, RemotePerspective]:
+    def load_aws_region_config(perspective_codes: list[str] | None = None) -> dict[str, RemotePerspective]:
         """
-        Reads in the available perspectives from a configuration yaml and returns them as a dict (map).
+        Reads in the available perspectives from the compiled region configuration if present, compiled from the
+        current configuration yaml and holding all the given perspective codes (validated from JSON in a single pass),
+        else from the configuration yaml, and returns them as a dict (map).
+        :param perspective_codes: the deployed perspectives, which the compiled region configuration must hold
         :return: dict of available perspectives with region code as key
         """
-        with resources.files("resources").joinpath("aws_region_config.yaml").open("r") as file:
-            aws_region_config_yaml = yaml.safe_load(file)
-            aws_region_type_adapter = TypeAdapter(list[RemotePerspective])
-            aws_regions_list = aws_region_type_adapter.validate_python(aws_region_config_yaml["aws_available_regions"])
-            aws_regions_dict = {region.code: region for region in aws_regions_list}
-            return aws_regions_dict
+        region_config_bytes = resources.files("resources").joinpath("aws_region_config.yaml").read_bytes()
+        compiled_config_file = resources.files("resources").joinpath(COMPILED_AWS_REGION_CONFIG_FILE_NAME)
+        if compiled_config_file.is_file():
+            compiled_config = CompiledAwsRegionConfig.model_validate_json(compiled_config_file.read_bytes())
+            compiled_perspectives_by_code = {region.code: region for region in compiled_config.aws_available_regions}
+            missing_perspective_codes = [
+                code for code in perspective_codes or [] if code not in compiled_perspectives_by_code
+            ]
+            if compiled_config.source_sha256 != hashlib.sha256(region_config_bytes).hexdigest():
+                logger.warning(
+                    f"{COMPILED_AWS_REGION_CONFIG_FILE_NAME} was not compiled from the current aws_region_config.yaml; "
+                    f"parsing aws_region_config.yaml instead. Rerun configure.py and package-layer.sh to recompile it."
+                )
+            elif missing_perspective_codes:
+                # e.g., the perspectives were redeployed without recompiling the region configuration
+                logger.warning(
+                    f"{COMPILED_AWS_REGION_CONFIG_FILE_NAME} lacks perspectives {missing_perspective_codes}; "
+                    f"parsing aws_region_config.yaml instead. Rerun configure.py and package-layer.sh to recompile it."
+                )
+            else:
+                return compiled_perspectives_by_code
+
+        import yaml  # only needed without a current compiled region configuration, so kept out of the cold start
+
+        aws_region_config_yaml = yaml.safe_load(region_config_bytes)
+        aws_region_type_adapter = TypeAdapter(list[RemotePerspective])
+        aws_regions_list = aws_region_type_adapter.validate_python(aws_region_config_yaml["aws_available_regions"])
+        return {region.code: region for region in aws_regions_list}
 
     @staticmethod
     def convert_codes_to_remote_perspectives(
         perspective_codes: list[str], all_possible_perspectives_by_code: dict[str, RemotePerspective]
     ) -> list[RemotePerspective]:
-        remote_perspectives = []
+        missing_perspective_codes = [
+            code for code in perspective_codes if code not in all_possible_perspectives_by_code
+        ]
+        if missing_perspective_codes:
+            raise ValueError(f"Perspectives {missing_perspective_codes} are not in aws_region_config.yaml.")
+        return [all_possible_perspectives_by_code[perspective_code] for perspective_code in perspective_codes]
 
-        for perspective_code in perspective_codes:
-            if perspective_code not in all_possible_perspectives_by_code.keys():
-                continue  # TODO throw an error? check this case in the validator?
-            else:
-                fully_defined_perspective = all_possible_perspectives_by_code[perspective_code]
-                remote_perspectives.append(fully_defined_perspective)
+    @staticmethod
+    def create_invoke_client_context(
+        payload_compression: str, payload_compression_min_bytes: int, bypass_caa_lookup_cache: bool = False
+    ) -> str:
+        if payload_compression == "none" and not bypass_caa_lookup_cache:
+            return RAW_RESPONSE_FORMAT_CLIENT_CONTEXT
+        client_context_custom = {"response_format": "raw"}
+        if payload_compression != "none":
+            client_context_custom["response_compression"] = payload_compression
+            client_context_custom["response_compression_min_bytes"] = payload_compression_min_bytes
+        if bypass_caa_lookup_cache:
+            client_context_custom["bypass_caa_lookup_cache"] = True  # read by the CAA checkers
+        return base64.b64encode(json.dumps({"custom": client_context_custom}).encode("utf-8")).decode("utf-8")
+
+    async def invoke_remote_perspective(
+        self, perspective: RemotePerspective, check_type: CheckType, payload: str
+    ) -> bytes:
+        """
+        Invokes the check function of the given type in the given perspective and returns the response payload
+        (decompressed, if the checker compressed it).
+        """
+        function_endpoint_info = self.remotes_per_perspective_per_check_type[check_type][perspective.code]
+        if self.perspective_payload_compression != "none":
+            payload = self.compress_request_payload_if_large(payload)
+        client_context = (
+            self.caa_lookup_cache_bypass_invoke_client_context
+            if self.is_caa_lookup_cache_bypassed(check_type)
+            else self.perspective_invoke_client_context
+        )
+        try:
+            response, response_payload = await self.invoke_function(
+                perspective.code, function_endpoint_info.arn, payload, client_context
+            )
+        except Exception as e:
+            if not is_credential_expiry_exception(e):
+                raise  # botocore has already retried connection errors as configured
+            # retry once with fresh credentials
+            response, response_payload = await self.invoke_function(
+                perspective.code, function_endpoint_info.arn, payload, client_context
+            )
+        if "FunctionError" in response:
+            raise LambdaExecutionException(f"Lambda execution error: {response_payload.decode('utf-8')}")
+        if self.perspective_payload_compression != "none" and is_compressed_payload_json(response_payload):
+            response_payload = self.decompress_response_payload(response_payload)
+        return response_payload
+
+    async def invoke_function(
+        self, perspective_code: str, function_arn: str, payload: str, client_context: str
+    ) -> tuple[dict, bytes]:
+        """
+        Invokes the function with the perspective's Lambda client and reads the response payload, while holding the
+        client. Invalidates the client after a connection error or credential expiry.
+        :return: the invoke response and its payload
+        """
+        async with self.lambda_client_registry.use_client(perspective_code) as client:
+            try:
+                response = await client.invoke(  # AWS Lambda-specific structure
+                    FunctionName=function_arn,
+                    InvocationType="RequestResponse",
+                    ClientContext=client_context,
+                    Payload=payload,  # AWS Lambda functions expect a JSON string for payload
+                )
+            except Exception as e:
+                credentials_expired = is_credential_expiry_exception(e)
+                if credentials_expired or is_connection_exception(e):
+                    await self.lambda_client_registry.invalidate_client(perspective_code, client, credentials_expired)
+                raise
+            return response, await response["Payload"].read()
+
+    def compress_request_payload_if_large(self, payload: str) -> str:
+        if len(payload) < self.perspective_payload_compression_min_bytes:  # skips encoding small payloads
+            return payload
+        compressed_payload = compress_payload_if_large(
+            payload.encode("utf-8"),
+            self.perspective_payload_compression,
+            self.perspective_payload_compression_min_bytes,
+            self.request_compression_statistics,
+        )
+        return json.dumps(compressed_payload) if compressed_payload is not None else payload
 
-        return remote_perspectives
+    def decompress_response_payload(self, response_payload: bytes) -> bytes:
+        start_time = time.perf_counter()
+        decompressed_payload = decompress_payload(json.loads(response_payload))
+        self.response_compression_statistics.record(
+            len(decompressed_payload), len(response_payload), time.perf_counter() - start_time
+        )
+        return decompressed_payload
+
+    @staticmethod
+    def parse_remote_perspective_response(response_payload: bytes, response_adapter: TypeAdapter):
+        """
+        Validates a perspective response payload in either wire format: the raw check response(s) or, from checkers
+        that predate the raw format, an envelope holding the check response(s) as a JSON string under 'body'.
+        """
+        try:
+            return response_adapter.validate_json(response_payload)
+        except ValidationError:
+            response_envelope = json.loads(response_payload)
+            if not isinstance(response_envelope, dict) or "body" not in response_envelope:
+                raise
+            return response_adapter.validate_json(response_envelope["body"])
 
     # This function MUST validate its response and return a proper open_mpic_core object type.
     async def call_remote_perspective(
         self, perspective: RemotePerspective, check_type: CheckType, check_request: CheckRequest
     ) -> CheckResponse:
-        client = self._clients[perspective.code]
-        function_endpoint_info = self.remotes_per_perspective_per_check_type[check_type][perspective.code]
-        response = await client.invoke(  # AWS Lambda-specific structure
-            FunctionName=function_endpoint_info.arn,
-            InvocationType="RequestResponse",
-            Payload=check_request.model_dump_json(),  # AWS Lambda functions expect a JSON string for payload
+        if self.perspective_call_hedge_percentile > 0:
+            return await self.call_remote_perspective_hedged(perspective, check_type, check_request)
+        return await self.send_remote_perspective_call(perspective, check_type, check_request)
+
+    async def call_remote_perspective_hedged(
+        self, perspective: RemotePerspective, check_type: CheckType, check_request: CheckRequest
+    ) -> CheckResponse:
+        """
+        Calls the remote perspective and, if it has not answered by the configured percentile of its recent latencies
+        (and the hedge budget of the MPIC request allows it), fires a duplicate call. The first successful response
+        wins and the other call is cancelled.
+        """
+        hedge_delay_seconds = self.perspective_call_statistics.get_percentile(
+            perspective.code, check_type, self.perspective_call_hedge_percentile
         )
-        response_payload = await response["Payload"].read()
-        if "FunctionError" in response:
-            raise LambdaExecutionException(f"Lambda execution error: {response_payload.decode('utf-8')}")
-        response_payload = json.loads(response_payload)
-        return self.check_response_adapter.validate_json(response_payload["body"])
+        calls = [asyncio.ensure_future(self.send_remote_perspective_call(perspective, check_type, check_request))]
+        try:
+            if hedge_delay_seconds is not None:
+                await asyncio.wait(calls, timeout=hedge_delay_seconds)
+                hedge_budget = self._hedge_budget.get()
+                if not calls[0].done() and hedge_budget is not None and hedge_budget.try_acquire():
+                    self.logger.debug(
+                        f"Hedging {check_type} call to perspective {perspective.code} "
+                        f"after {hedge_delay_seconds * 1000:.1f} ms"
+                    )
+                    calls.append(
+                        asyncio.ensure_future(
+                            self.send_remote_perspective_call(perspective, check_type, check_request, is_hedge=True)
+                        )
+                    )
+            pending_calls = set(calls)
+            while pending_calls:
+                done_calls, pending_calls = await asyncio.wait(pending_calls, return_when=asyncio.FIRST_COMPLETED)
+                for call in calls:
+                    if call in done_calls and call.exception() is None:
+                        return call.result()
+            return calls[0].result()  # every call failed; raises the error of the original call
+        finally:
+            for call in calls:
+                if not call.done():
+                    call.cancel()
 
-    def process_invocation(self, mpic_request: MpicRequest) -> dict:
-        mpic_response = asyncio.get_event_loop().run_until_complete(self.mpic_coordinator.coordinate_mpic(mpic_request))
+    async def send_remote_perspective_call(
+        self,
+        perspective: RemotePerspective,
+        check_type: CheckType,
+        check_request: CheckRequest,
+        is_hedge: bool = False,
+    ) -> CheckResponse:
+        """
+        Calls the remote perspective and records the latency and outcome of the call.
+        :param is_hedge: the call duplicates a slow one; if cancelled (the original call answered first), it is not
+               recorded, as the time it ran for says nothing about the latency of the perspective
+        """
+        circuit_breaker = self.perspective_circuit_breaker
+        if circuit_breaker is not None:
+            breaker_call = circuit_breaker.before_call(perspective.code, check_type)  # fails fast if open
+        start_time = time.perf_counter()
+        try:
+            # a call that bypasses the CAA lookup caches is not coalesced, as its batch would be sent without asking so
+            if self.perspective_call_coalescer is not None and not self.is_caa_lookup_cache_bypassed(check_type):
+                check_response = await self.perspective_call_coalescer.call_remote_perspective(
+                    perspective, check_type, check_request
+                )
+            else:
+                check_response = await self.call_remote_perspective_unbatched(perspective, check_type, check_request)
+        except asyncio.CancelledError:
+            if not is_hedge:  # e.g., an original call that lost to its hedge, which ran for at least this long
+                self.perspective_call_statistics.record(
+                    perspective.code, check_type, time.perf_counter() - start_time, PerspectiveCallOutcome.CANCELLED
+                )
+            if circuit_breaker is not None:
+                circuit_breaker.record_cancellation(perspective.code, check_type, breaker_call)
+            raise
+        except Exception as e:
+            outcome = PerspectiveCallOutcome.TIMEOUT if is_timeout_exception(e) else PerspectiveCallOutcome.ERROR
+            self.perspective_call_statistics.record(
+                perspective.code, check_type, time.perf_counter() - start_time, outcome
+            )
+            if circuit_breaker is not None:
+                circuit_breaker.record_failure(perspective.code, check_type, breaker_call)
+            raise
+        self.perspective_call_statistics.record(perspective.code, check_type, time.perf_counter() - start_time)
+        if circuit_breaker is not None:
+            circuit_breaker.record_success(perspective.code, check_type, breaker_call)
+        return check_response
+
+    async def call_remote_perspective_unbatched(
+        self, perspective: RemotePerspective, check_type: CheckType, check_request: CheckRequest
+    ) -> CheckResponse:
+        payload_cache = self._check_request_payload_cache.get()
+        payload = payload_cache.get_payload(check_request) if payload_cache else check_request.model_dump_json()
+        response_payload = await self.invoke_remote_perspective(perspective, check_type, payload)
+        return self.parse_remote_perspective_response(response_payload, self.check_response_adapter)
+
+    async def call_remote_perspective_batch(
+        self, perspective: RemotePerspective, check_type: CheckType, check_requests: list[CheckRequest]
+    ) -> list[CheckResponse]:
+        """
+        Sends several check requests of the same type to a remote perspective in a single invocation.
+        :return: the check responses, in the same order as the check requests
+        """
+        payload = CheckBatchRequest(check_requests=check_requests).model_dump_json()
+        response_payload = await self.invoke_remote_perspective(perspective, check_type, payload)
+        check_responses = self.parse_remote_perspective_response(response_payload, self.check_response_list_adapter)
+        if len(check_responses) != len(check_requests):
+            raise LambdaExecutionException(
+                f"Perspective {perspective.code} returned {len(check_responses)} responses "
+                f"for a batch of {len(check_requests)} check requests"
+            )
+        return check_responses
+
+    async def coordinate_mpic(self, mpic_request: MpicRequest, bypass_caa_lookup_cache: bool = False) -> MpicResponse:
+        self._hedge_budget.set(PerspectiveCallHedgeBudget(self.perspective_call_hedge_max_per_request))
+        self._check_request_payload_cache.set(CheckRequestPayloadCache())
+        self._coordinated_check_type.set(mpic_request.check_type)
+        self._caa_lookup_cache_bypassed.set(bypass_caa_lookup_cache)
+        return await self.mpic_coordinator.coordinate_mpic(mpic_request)
+
+    def is_caa_lookup_cache_bypassed(self, check_type: CheckType) -> bool:
+        """
+        :return: whether the CAA checkers are to be asked for a fresh lookup in the perspective call being made
+        """
+        return check_type == CheckType.CAA and self._caa_lookup_cache_bypassed.get()
+
+    def get_perspective_health_scores(self) -> dict[str, float]:
+        """
+        :return: the health scores of the perspectives for the check type of the MPIC request being coordinated
+        """
+        return self.perspective_call_statistics.get_health_scores(
+            self._coordinated_check_type.get(), self.perspective_health_max_age_seconds
+        )
+
+    def emit_perspective_call_statistics_if_due(self):
+        """
+        Emits a summary of the perspective call statistics, as a structured log line or in CloudWatch Embedded Metric
+        Format, if the configured interval has elapsed since the last emission.
+        """
+        if self.perspective_stats_emit_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._perspective_stats_last_emitted < self.perspective_stats_emit_interval_seconds:
+            return
+        self._perspective_stats_last_emitted = now
+        summaries = self.perspective_call_statistics.summarize()
+        connection_summaries = [
+            {
+                "perspective": perspective_code,
+                "requests_sent": connection_statistics.requests_sent,
+                "connections_opened": connection_statistics.connections_opened,
+                "connection_reuse_rate": connection_statistics.get_reuse_rate(),
+                "client_reinitializations": self.lambda_client_registry.reinitialization_counts.get(
+                    perspective_code, 0
+                ),
+            }
+            for perspective_code, connection_statistics in self.lambda_client_registry.connection_statistics.items()
+            if connection_statistics.requests_sent > 0
+        ]
+        client_health_summaries = self.lambda_client_registry.get_health()
+        event_loop_lag_summary = self.event_loop_runner.pop_lag_statistics()
+        payload_compression_summaries = self.pop_payload_compression_statistics()
+        call_batching_summary = (
+            self.perspective_call_coalescer.pop_statistics() if self.perspective_call_coalescer is not None else None
+        )
+        if self.perspective_stats_format == "emf":  # EMF is read from stdout
+            call_metric_units = {"calls": "Count", "error_rate": "None", "timeouts": "Count", "cancelled": "Count"}
+            call_metric_units.update(
+                {f"latency_p{p}_ms": "Milliseconds" for p in PerspectiveCallStatistics.SUMMARY_PERCENTILES}
+            )
+            connection_metric_units = {
+                "requests_sent": "Count",
+                "connections_opened": "Count",
+                "connection_reuse_rate": "None",
+            }
+            for summary in summaries:
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    summary, ["perspective", "check_type"], call_metric_units
+                )
+                print(json.dumps(emf_document))
+            for summary in connection_summaries:
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    summary, ["perspective"], connection_metric_units
+                )
+                print(json.dumps(emf_document))
+            for summary in client_health_summaries:
+                client_health_metrics = {
+                    "perspective": summary["perspective"],
+                    "client_open": int(summary["open"]),
+                    "client_age_seconds": summary["age_seconds"],
+                }
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    client_health_metrics, ["perspective"], {"client_open": "Count", "client_age_seconds": "Seconds"}
+                )
+                print(json.dumps(emf_document))
+            if event_loop_lag_summary is not None:
+                lag_metrics = {f"event_loop_lag_{name}": event_loop_lag_summary[name] for name in ["mean_ms", "max_ms"]}
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    lag_metrics, [], {name: "Milliseconds" for name in lag_metrics}
+                )
+                print(json.dumps(emf_document))
+            for direction, summary in payload_compression_summaries.items():
+                compression_metrics = {
+                    f"{direction}_compressed_payloads": summary["payloads"],
+                    f"{direction}_compression_ratio": summary["compression_ratio"],
+                    f"{direction}_compression_ms": summary["total_ms"],
+                }
+                compression_metric_units = dict(zip(compression_metrics, ["Count", "None", "Milliseconds"]))
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    compression_metrics, [], compression_metric_units
+                )
+                print(json.dumps(emf_document))
+            if call_batching_summary is not None:
+                call_batching_metrics = {f"call_{name}": value for name, value in call_batching_summary.items()}
+                call_batching_metric_units = dict(
+                    zip(call_batching_metrics, ["Count", "Count", "None", "None", "Milliseconds"])
+                )
+                emf_document = MpicCoordinatorLambdaHandler.create_emf_document(
+                    call_batching_metrics, [], call_batching_metric_units
+                )
+                print(json.dumps(emf_document))
+        else:
+            statistics = {
+                "perspective_call_statistics": summaries,
+                "lambda_client_connections": connection_summaries,
+                "lambda_client_health": client_health_summaries,
+            }
+            if event_loop_lag_summary is not None:
+                statistics["event_loop_lag"] = event_loop_lag_summary
+            if payload_compression_summaries:
+                statistics["payload_compression"] = payload_compression_summaries
+            if call_batching_summary is not None:
+                statistics["perspective_call_batching"] = call_batching_summary
+            self.logger.info(json.dumps(statistics))
+
+    def pop_payload_compression_statistics(self) -> dict[str, dict]:
+        """
+        :return: summaries of the request payloads compressed and response payloads decompressed since the last call,
+                 by direction ("request" or "response"), leaving out directions without any payloads
+        """
+        summaries = {}
+        if self.request_compression_statistics.payloads > 0:
+            summaries["request"] = self.request_compression_statistics.get_summary()
+            self.request_compression_statistics = PayloadCompressionStatistics()
+        if self.response_compression_statistics.payloads > 0:
+            summaries["response"] = self.response_compression_statistics.get_summary()
+            self.response_compression_statistics = PayloadCompressionStatistics()
+        return summaries
+
+    @staticmethod
+    def create_emf_document(summary: dict, dimension_names: list[str], metric_units: dict[str, str]) -> dict:
+        metric_values = {name: summary[name] for name in metric_units if summary[name] is not None}
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": "OpenMPIC/PerspectiveCalls",
+                        "Dimensions": [dimension_names],
+                        "Metrics": [{"Name": name, "Unit": metric_units[name]} for name in metric_values],
+                    }
+                ],
+            },
+            **{name: summary[name] for name in dimension_names},
+            **metric_values,
+        }
+
+    def start_invocation(self):
+        """
+        Counts the invocation and logs whether it is the first one of this container (a cold start), along with the
+        initialization phase breakdown if so.
+        """
+        self.invocation_count += 1
+        invocation_fields = {"cold_start": self.invocation_count == 1, "invocation_count": self.invocation_count}
+        if self.invocation_count == 1:
+            invocation_fields["init_phases_ms"] = self.init_phase_timer.get_phase_milliseconds()
+        self.logger.info(json.dumps(invocation_fields))
+
+    async def warm_up_perspectives(self, warmup_request: WarmupRequest) -> list[dict]:
+        """
+        Pings the check functions of every perspective, concurrency times each at once, without running any checks.
+        :return: the outcome of the pings per perspective and check type, with the round trip latencies of pings
+                 that hit a cold container and of those that hit a warm one
+        """
+        ping_payload = json.dumps({"ping": True, "hold_ms": warmup_request.hold_ms})
+
+        async def ping_remote_perspective(perspective: RemotePerspective, check_type: CheckType) -> dict:
+            start_time = time.perf_counter()
+            try:
+                response_payload = await self.invoke_remote_perspective(perspective, check_type, ping_payload)
+            except Exception as e:
+                self.logger.warning(f"Warm-up ping of {check_type} function in {perspective.code} failed: {str(e)}")
+                return {"error": True}
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            return {
+                "error": False,
+                "cold_start": json.loads(response_payload).get("cold_start"),
+                "latency_ms": latency_ms,
+            }
+
+        ping_targets = [
+            (perspective, check_type)
+            for check_type in self.remotes_per_perspective_per_check_type
+            for perspective in self.target_perspectives
+        ]
+        pings = [
+            ping_remote_perspective(perspective, check_type)
+            for perspective, check_type in ping_targets
+            for _ in range(warmup_request.concurrency)
+        ]
+        ping_results = await asyncio.gather(*pings)
+
+        warmup_results = []
+        for target_index, (perspective, check_type) in enumerate(ping_targets):
+            target_ping_results = ping_results[
+                target_index * warmup_request.concurrency : (target_index + 1) * warmup_request.concurrency
+            ]
+            cold_latencies = [r["latency_ms"] for r in target_ping_results if not r["error"] and r["cold_start"]]
+            warm_latencies = [r["latency_ms"] for r in target_ping_results if not r["error"] and not r["cold_start"]]
+            warmup_results.append(
+                {
+                    "perspective": perspective.code,
+                    "check_type": check_type,
+                    "pings": len(target_ping_results),
+                    "errors": sum(1 for r in target_ping_results if r["error"]),
+                    "cold_starts": len(cold_latencies),
+                    "cold_latency_ms": round(max(cold_latencies), 1) if cold_latencies else None,
+                    "warm_latency_ms": round(max(warm_latencies), 1) if warm_latencies else None,
+                }
+            )
+        return warmup_results
+
+    def process_warmup_invocation(self, warmup_request: WarmupRequest) -> dict:
+        start_time = time.perf_counter()
+        warmup_results = self.event_loop_runner.run(self.warm_up_perspectives(warmup_request))
+        warmup_summary = {
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 1),
+            "results": warmup_results,
+            "lambda_clients": self.lambda_client_registry.get_health(),  # as left by the pings
+        }
+        self.logger.info(json.dumps({"warmup": warmup_summary}))
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": mpic_response.model_dump_json(),
+            "body": json.dumps(warmup_summary),
+        }
+
+    def process_invocation(self, mpic_request: MpicRequest, bypass_caa_lookup_cache: bool = False) -> dict:
+        mpic_response = self.event_loop_runner.run(self.coordinate_mpic(mpic_request, bypass_caa_lookup_cache))
+        self.emit_perspective_call_statistics_if_due()
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": mpic_response.model_dump_json(exclude=self.mpic_response_exclude),
+        }
+
+    async def coordinate_mpic_batch(
+        self, mpic_requests: list, bypass_caa_lookup_cache: bool = False
+    ) -> list[MpicBatchItemResult]:
+        """
+        Validates and coordinates all MPIC requests of a batch concurrently, at most batch_max_concurrency at a time.
+        A failure of one request (including a malformed one) is reported in its own result and does not fail the rest
+        of the batch.
+        """
+        semaphore = asyncio.Semaphore(self.batch_max_concurrency)
+
+        async def coordinate_batch_item(index: int, mpic_request) -> MpicBatchItemResult:
+            async with semaphore:
+                try:
+                    mpic_request = self.mpic_request_adapter.validate_python(mpic_request)
+                    mpic_response = await self.coordinate_mpic(mpic_request, bypass_caa_lookup_cache)
+                    return MpicBatchItemResult(index=index, mpic_response=mpic_response)
+                except ValidationError as validation_error:
+                    error = MpicBatchItemError(
+                        error=MpicRequestValidationMessages.REQUEST_VALIDATION_FAILED.key,
+                        validation_issues=json.loads(validation_error.json()),
+                    )
+                except MpicRequestValidationException as e:
+                    error = MpicBatchItemError(
+                        error=MpicRequestValidationMessages.REQUEST_VALIDATION_FAILED.key,
+                        validation_issues=json.loads(e.__notes__[0]),
+                    )
+                except Exception as e:
+                    self.logger.error(f"Batch item {index} failed: {str(e)}")
+                    error = MpicBatchItemError(error=str(e))
+                return MpicBatchItemResult(index=index, error=error)
+
+        batch_tasks = [coordinate_batch_item(index, mpic_request) for index, mpic_request in enumerate(mpic_requests)]
+        return list(await asyncio.gather(*batch_tasks))
+
+    def process_batch_invocation(
+        self, mpic_batch_request: MpicBatchRequest, bypass_caa_lookup_cache: bool = False
+    ) -> dict:
+        batch_size = len(mpic_batch_request.mpic_requests)
+        if batch_size > self.batch_max_size:
+            batch_too_large_issue = {
+                "issue_type": BATCH_TOO_LARGE_ISSUE_TYPE,
+                "message": f"Batch of {batch_size} requests exceeds the maximum batch size of {self.batch_max_size}.",
+            }
+            return {
+                "statusCode": 400,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps(
+                    {
+                        "error": MpicRequestValidationMessages.REQUEST_VALIDATION_FAILED.key,
+                        "validation_issues": [batch_too_large_issue],
+                    }
+                ),
+            }
+        batch_results = self.event_loop_runner.run(
+            self.coordinate_mpic_batch(mpic_batch_request.mpic_requests, bypass_caa_lookup_cache)
+        )
+        self.emit_perspective_call_statistics_if_due()
+        return {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": MpicBatchResponse(results=batch_results).model_dump_json(
+                exclude=(
+                    {"results": {"__all__": {"mpic_response": self.mpic_response_exclude}}}
+                    if self.mpic_response_exclude is not None
+                    else None
+                )
+            ),
         }
 
 
@@ -149,12 +1556,10 @@ _handler = None
 def get_handler() -> MpicCoordinatorLambdaHandler:
     """
     Singleton pattern to avoid recreating the handler on every Lambda invocation.
-    Performs lazy initialization using event loop.
+    The handler creates the event loop that it runs every invocation on.
     """
     global _handler
     if _handler is None:
-        event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(event_loop)
         _handler = MpicCoordinatorLambdaHandler()
     return _handler
 
@@ -194,9 +1599,86 @@ def handle_lambda_exceptions(func):
     return wrapper
 
 
+BATCH_REQUEST_PATH_SUFFIX = "/batch"
+
+
+def is_timeout_exception(exception: Exception) -> bool:
+    if isinstance(exception, LambdaExecutionException):
+        return "Task timed out" in str(exception)  # the remote function ran out of time
+    return isinstance(
+        exception, (asyncio.TimeoutError, botocore.exceptions.ReadTimeoutError, botocore.exceptions.ConnectTimeoutError)
+    )
+
+
+CREDENTIAL_EXPIRY_ERROR_CODES = {"ExpiredToken", "ExpiredTokenException", "RequestExpired", "InvalidClientTokenId"}
+
+
+def is_credential_expiry_exception(exception: Exception) -> bool:
+    if isinstance(exception, botocore.exceptions.ClientError):
+        return exception.response.get("Error", {}).get("Code") in CREDENTIAL_EXPIRY_ERROR_CODES
+    return False
+
+
+def is_connection_exception(exception: Exception) -> bool:
+    # the endpoint could not be reached or a pooled connection was dropped; a new client starts with a fresh pool
+    return isinstance(
+        exception, (botocore.exceptions.EndpointConnectionError, botocore.exceptions.ConnectionClosedError)
+    )
+
+
+def is_warmup_event(event) -> bool:
+    # warm-up events are sent directly (e.g., by a schedule), never through API Gateway
+    return isinstance(event, dict) and event.get("warmup") is True
+
+
+def is_caa_lookup_cache_bypass_requested(event) -> bool:
+    # the raw event is a dict when invoked by API Gateway, but may already be a parsed model (e.g., in tests)
+    headers = event.get("headers") if isinstance(event, dict) else getattr(event, "headers", None)
+    for header_name, header_value in (headers or {}).items():
+        if header_name.lower() == CAA_LOOKUP_CACHE_BYPASS_HEADER.lower():
+            return str(header_value).strip().lower() == "true"
+    return False
+
+
+def is_batch_request_event(event) -> bool:
+    # the raw event is a dict when invoked by API Gateway, but may already be a parsed model (e.g., in tests)
+    path = event.get("path") if isinstance(event, dict) else getattr(event, "path", None)
+    return path is not None and path.rstrip("/").endswith(BATCH_REQUEST_PATH_SUFFIX)
+
+
 # noinspection PyUnusedLocal
 # for now, we are not using context, but it is required by the lambda handler signature
 @handle_lambda_exceptions
 @event_parser(model=MpicRequest, envelope=envelopes.ApiGatewayEnvelope)  # AWS Lambda Powertools decorator
-def lambda_handler(event: MpicRequest, context):  # AWS Lambda entry point
-    return get_handler().process_invocation(event)
+def mpic_lambda_handler(event: MpicRequest, context, bypass_caa_lookup_cache: bool = False):
+    handler = get_handler()
+    handler.start_invocation()
+    return handler.process_invocation(event, bypass_caa_lookup_cache)
+
+
+# noinspection PyUnusedLocal
+@handle_lambda_exceptions
+@event_parser(model=MpicBatchRequest, envelope=envelopes.ApiGatewayEnvelope)
+def mpic_batch_lambda_handler(event: MpicBatchRequest, context, bypass_caa_lookup_cache: bool = False):
+    handler = get_handler()
+    handler.start_invocation()
+    return handler.process_batch_invocation(event, bypass_caa_lookup_cache)
+
+
+# noinspection PyUnusedLocal
+@handle_lambda_exceptions
+@event_parser(model=WarmupRequest)
+def warmup_lambda_handler(event: WarmupRequest, context):
+    handler = get_handler()
+    handler.start_invocation()
+    return handler.process_warmup_invocation(event)
+
+
+def lambda_handler(event, context):  # AWS Lambda entry point
+    if is_warmup_event(event):
+        return warmup_lambda_handler(event, context)
+    # passed on by the event parser along with the request parsed out of the API Gateway event
+    bypass_caa_lookup_cache = is_caa_lookup_cache_bypass_requested(event)
+    if is_batch_request_event(event):
+        return mpic_batch_lambda_handler(event, context, bypass_caa_lookup_cache=bypass_caa_lookup_cache)
+    return mpic_lambda_handler(event, context, bypass_caa_lookup_cache=bypass_caa_lookup_cache)
@@ -1,17 +1,69 @@
+import time
+
+_import_start_time = time.perf_counter()  # start of the import phase of a cold start
+
 import os
 import asyncio
+from typing import Callable
 
-from aws_lambda_powertools.utilities.parser import event_parser
+import dns.resolver
+from pydantic import Field, TypeAdapter
 
-from open_mpic_core import DcvCheckRequest, MpicDcvChecker
+from open_mpic_core import DcvCheckRequest, DcvCheckResponse, MpicDcvChecker
 from open_mpic_core import get_logger
 
+from aws_lambda_mpic.common_util.checker_invocation import CheckBatchRequest, CheckerLambdaHandler, PingRequest
+
 logger = get_logger(__name__)
 
+IMPORT_SECONDS = time.perf_counter() - _import_start_time
+
+
+class DcvCheckBatchRequest(CheckBatchRequest):
+    check_requests: list[DcvCheckRequest] = Field(min_length=1)
+
+
+class SplitDnsAnswerCache(dns.resolver.CacheBase):
+    """
+    DNS answer cache for dnspython resolvers that keeps positive answers and negative answers (NXDOMAIN and NODATA)
+    in separate LRU caches, each bounded by its own entry count, so a burst of lookups for absent names cannot evict
+    positive answers (and vice versa). Answers expire on their TTL (negative answers on the SOA minimum TTL), capped
+    at max_ttl_seconds if given.
+    """
+
+    def __init__(self, max_positive_entries: int, max_negative_entries: int, max_ttl_seconds: float | None = None):
+        super().__init__()
+        self.positive_answers = dns.resolver.LRUCache(max_positive_entries)
+        self.negative_answers = dns.resolver.LRUCache(max_negative_entries)
+        self.max_ttl_seconds = max_ttl_seconds
+
+    def get(self, key: dns.resolver.CacheKey) -> dns.resolver.Answer | None:
+        answer = self.positive_answers.get(key)
+        if answer is None:
+            answer = self.negative_answers.get(key)
+        with self.lock:
+            if answer is None:
+                self.statistics.misses += 1
+            else:
+                self.statistics.hits += 1
+        return answer
+
+    def put(self, key: dns.resolver.CacheKey, value: dns.resolver.Answer) -> None:
+        if self.max_ttl_seconds is not None:
+            value.expiration = min(value.expiration, time.time() + self.max_ttl_seconds)
+        if value.rrset is None:  # NXDOMAIN (cached by dnspython under the ANY type) or NODATA
+            self.negative_answers.put(key, value)
+        else:
+            self.positive_answers.put(key, value)
+
+    def flush(self, key: dns.resolver.CacheKey | None = None) -> None:
+        self.positive_answers.flush(key)
+        self.negative_answers.flush(key)
+
 
-class MpicDcvCheckerLambdaHandler:
-    def __init__(self):
-        self.log_level = os.environ["log_level"] if "log_level" in os.environ else None
+class MpicDcvCheckerLambdaHandler(CheckerLambdaHandler):
+    def __init__(self, loop_factory: Callable[[], asyncio.AbstractEventLoop] | None = None):
+        super().__init__(IMPORT_SECONDS, logger, loop_factory)
         self.http_client_timeout_seconds = (
             float(os.environ["http_client_timeout_seconds"])
             if "http_client_timeout_seconds" in os.environ and float(os.environ["http_client_timeout_seconds"])
@@ -26,34 +78,47 @@ class MpicDcvCheckerLambdaHandler:
             else None
         )
 
-        self.logger = logger.getChild(self.__class__.__name__)
-        if self.log_level:
-            self.logger.setLevel(self.log_level)
-
-        self.dcv_checker = MpicDcvChecker(
-            log_level=self.logger.level,
-            http_client_timeout=self.http_client_timeout_seconds,
-            dns_timeout=self.dns_timeout_seconds,
-            dns_resolution_lifetime=self.dns_resolution_lifetime_seconds,
+        self.dns_cache_max_entries = int(os.getenv("dns_cache_max_entries", 0))  # 0 disables the cache
+        self.dns_cache_max_negative_entries = int(os.getenv("dns_cache_max_negative_entries", 1000))
+        self.dns_cache_max_ttl_seconds = (
+            float(os.environ["dns_cache_max_ttl_seconds"]) if "dns_cache_max_ttl_seconds" in os.environ else None
         )
 
-    def process_invocation(self, dcv_request: DcvCheckRequest):
-        self.logger.debug("(debug log) Processing DCV check request: %s", dcv_request)
-        print("(print) Processing DCV check request: %s", dcv_request)
-
-        dcv_response = asyncio.get_event_loop().run_until_complete(self.dcv_checker.check_dcv(dcv_request))
-        status_code = 200
+        with self.init_phase_timer.measure("checker"):
+            self.dcv_checker = MpicDcvChecker(
+                log_level=self.logger.level,
+                http_client_timeout=self.http_client_timeout_seconds,
+                dns_timeout=self.dns_timeout_seconds,
+                dns_resolution_lifetime=self.dns_resolution_lifetime_seconds,
+            )
+
+        self.dns_answer_cache = None
+        if self.dns_cache_max_entries > 0:
+            self.dns_answer_cache = SplitDnsAnswerCache(
+                self.dns_cache_max_entries, self.dns_cache_max_negative_entries, self.dns_cache_max_ttl_seconds
+            )
+            self.dcv_checker.resolver.cache = self.dns_answer_cache
+
+        with self.init_phase_timer.measure("type_adapters"):
+            self.response_list_adapter = TypeAdapter(list[DcvCheckResponse])
+            self.event_adapter = TypeAdapter(DcvCheckRequest | DcvCheckBatchRequest | PingRequest)
+
+    async def check(self, dcv_request: DcvCheckRequest) -> DcvCheckResponse:
+        return await self.dcv_checker.check_dcv(dcv_request)
+
+    def get_status_code(self, dcv_response: DcvCheckResponse) -> int:
         if dcv_response.errors is not None and len(dcv_response.errors) > 0:
-            if dcv_response.errors[0].error_type == "404":
-                status_code = 404
-            else:
-                status_code = 500
-        result = {
-            "statusCode": status_code,
-            "headers": {"Content-Type": "application/json"},
-            "body": dcv_response.model_dump_json(),
-        }
-        return result
+            return 404 if dcv_response.errors[0].error_type == "404" else 500
+        return 200
+
+    def log_cache_statistics(self):
+        if self.dns_answer_cache is not None:
+            statistics = self.dns_answer_cache.get_statistics_snapshot()
+            self.logger.debug(
+                f"DNS answer cache: {statistics.hits} hits, {statistics.misses} misses, "
+                f"{len(self.dns_answer_cache.positive_answers.data)} positive and "
+                f"{len(self.dns_answer_cache.negative_answers.data)} negative answers cached"
+            )
 
 
 # Global instance for Lambda runtime
@@ -66,8 +131,6 @@ def get_handler() -> MpicDcvCheckerLambdaHandler:
     """
     global _handler
     if _handler is None:
-        event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(event_loop)
         _handler = MpicDcvCheckerLambdaHandler()
     return _handler
 
@@ -76,8 +139,5 @@ if os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None:
     get_handler()
 
 
-# noinspection PyUnusedLocal
-# for now, we are not using context, but it is required by the lambda handler signature
-@event_parser(model=DcvCheckRequest)
-def lambda_handler(event: DcvCheckRequest, context):  # AWS Lambda entry point
-    return get_handler().process_invocation(event)
+def lambda_handler(event, context):  # AWS Lambda entry point
+    return get_handler().handle_invocation(event, context)
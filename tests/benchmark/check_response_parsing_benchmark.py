@@ -0,0 +1,53 @@
+"""
+Microbenchmark of the coordinator's per-response parse cost for the perspective response wire formats.
+
+Run from the root directory of the project with `hatch run benchmark-parsing` (or `python <this file>` in an
+environment with the project installed).
+"""
+
+import json
+import timeit
+
+from pydantic import TypeAdapter
+
+from open_mpic_core import CheckResponse, DcvCheckResponse, DcvDnsCheckResponseDetails, DcvValidationMethod
+from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import MpicCoordinatorLambdaHandler
+
+ITERATIONS = 20_000
+
+
+def create_check_response() -> DcvCheckResponse:
+    return DcvCheckResponse(
+        check_passed=True,
+        details=DcvDnsCheckResponseDetails(
+            validation_method=DcvValidationMethod.ACME_DNS_01,
+            found_at="_acme-challenge.example.com",
+            records_seen=["challenge-value-" + "x" * 43],
+            response_code=0,
+            ad_flag=False,
+        ),
+    )
+
+
+def main():
+    check_response_adapter = TypeAdapter(CheckResponse)
+    check_response = create_check_response()
+    raw_payload = check_response.model_dump_json().encode("utf-8")
+    envelope_payload = json.dumps({"statusCode": 200, "body": check_response.model_dump_json()}).encode("utf-8")
+    parse = MpicCoordinatorLambdaHandler.parse_remote_perspective_response
+
+    cases = {
+        "envelope, json.loads + validate_json (before)": lambda: check_response_adapter.validate_json(
+            json.loads(envelope_payload)["body"]
+        ),
+        "raw, single pass validate_json (after)": lambda: parse(raw_payload, check_response_adapter),
+        "envelope, fallback from raw (older checkers)": lambda: parse(envelope_payload, check_response_adapter),
+    }
+    print(f"{len(raw_payload)} byte raw payload, {len(envelope_payload)} byte envelope payload")
+    for case_name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=ITERATIONS, repeat=5))
+        print(f"{case_name:<48} {seconds / ITERATIONS * 1_000_000:8.2f} us per response")
+
+
+if __name__ == "__main__":
+    main()
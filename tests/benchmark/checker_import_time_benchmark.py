@@ -0,0 +1,73 @@
+"""
+Import time the CAA and DCV checker modules add on top of open_mpic_core, which imports its whole surface from its
+package __init__ and so is the unavoidable floor. Each module is imported in a fresh interpreter with -X importtime,
+and the best of a few runs is kept. Exits with an error if a checker module adds more than the budget, as the
+Powertools parser alone used to add ~150 ms.
+
+Run from the root directory of the project with `hatch run benchmark-checker-import-time`.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+CHECKER_MODULES = [
+    "aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function",
+    "aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function",
+]
+BASELINE_MODULE = "open_mpic_core"
+IMPORT_BUDGET_OVERHEAD_MS = 100
+
+
+def measure_import_ms(module: str) -> float:
+    """
+    :return: the cumulative import time of the module in milliseconds, in a fresh interpreter
+    """
+    environment = dict(os.environ, PYTHONPATH=os.path.abspath("src"))
+    import_log = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    for line in import_log.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, imported_module = line.removeprefix("import time:").split("|")
+        if imported_module.strip() == module:
+            return int(cumulative_us) / 1000
+    raise RuntimeError(f"{module} is missing from the import time log")
+
+
+def measure_best_import_ms(module: str, runs: int) -> float:
+    return min(measure_import_ms(module) for _ in range(runs))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="imports per module, of which the best is kept")
+    parser.add_argument(
+        "--budget-ms", type=float, default=IMPORT_BUDGET_OVERHEAD_MS, help="import time a checker module may add"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    baseline_ms = measure_best_import_ms(BASELINE_MODULE, args.runs)
+    print(f"{BASELINE_MODULE:<76} {baseline_ms:8.1f} ms")
+    over_budget = []
+    for checker_module in CHECKER_MODULES:
+        checker_ms = measure_best_import_ms(checker_module, args.runs)
+        overhead_ms = checker_ms - baseline_ms
+        print(f"{checker_module:<76} {checker_ms:8.1f} ms ({overhead_ms:+.1f} ms)")
+        if overhead_ms >= args.budget_ms:
+            over_budget.append(f"{checker_module} adds {overhead_ms:.0f} ms of imports")
+    if over_budget:
+        sys.exit(f"error: over the {args.budget_ms:.0f} ms budget: " + "; ".join(over_budget))
+
+
+if __name__ == "__main__":
+    main()
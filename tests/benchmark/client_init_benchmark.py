@@ -0,0 +1,63 @@
+"""
+Startup benchmark of the coordinator's Lambda client creation, per client init mode and number of perspectives.
+Creating clients is local work (no AWS calls are made), so this needs no deployment or real AWS credentials.
+
+Run from the root directory of the project with `hatch run benchmark-client-init`.
+"""
+
+import os
+import json
+import time
+
+import yaml
+
+REGION_COUNTS = [6, 10, 20]
+CLIENT_INIT_MODES = ["serial", "concurrent", "lazy"]
+REPETITIONS = 3
+
+
+def load_region_codes() -> list[str]:
+    with open("resources/aws_region_config.yaml") as file:
+        return [region["code"] for region in yaml.safe_load(file)["aws_available_regions"]]
+
+
+def set_coordinator_environment(region_codes: list[str], client_init_mode: str):
+    perspectives = {
+        code: {
+            "dcv_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:dcv"},
+            "caa_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:caa"},
+        }
+        for code in region_codes
+    }
+    os.environ["perspectives"] = json.dumps(perspectives)
+    os.environ["default_perspective_count"] = "3"
+    os.environ["hash_secret"] = "benchmark"
+    os.environ["lambda_client_init_mode"] = client_init_mode
+
+
+def main():
+    # avoid credential lookups against instance metadata endpoints when creating clients
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import MpicCoordinatorLambdaHandler
+
+    region_codes = load_region_codes()
+    print(f"{'regions':>8} " + " ".join(f"{mode:>12}" for mode in CLIENT_INIT_MODES) + "   (ms, best of 3)")
+    for region_count in REGION_COUNTS:
+        init_times = []
+        for client_init_mode in CLIENT_INIT_MODES:
+            set_coordinator_environment(region_codes[:region_count], client_init_mode)
+            best_seconds = None
+            for _ in range(REPETITIONS):
+                start_time = time.perf_counter()
+                handler = MpicCoordinatorLambdaHandler()
+                elapsed_seconds = time.perf_counter() - start_time
+                handler.shutdown()
+                best_seconds = elapsed_seconds if best_seconds is None else min(best_seconds, elapsed_seconds)
+            init_times.append(best_seconds)
+        print(f"{region_count:>8} " + " ".join(f"{seconds * 1000:>12.1f}" for seconds in init_times))
+
+
+if __name__ == "__main__":
+    main()
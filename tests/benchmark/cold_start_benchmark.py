@@ -0,0 +1,83 @@
+"""
+Init time breakdown of the coordinator, CAA checker and DCV checker handlers, as recorded by their init phase timers.
+Each handler is imported and created in a fresh interpreter, as in a Lambda cold start. Creating the coordinator's
+Lambda clients is local work (no AWS calls are made), so this needs no deployment or real AWS credentials.
+
+Run from the root directory of the project with `hatch run benchmark-cold-start`.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import yaml
+
+REPETITIONS = 5
+
+HANDLER_MODULES = {
+    "coordinator": "aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function",
+    "caa_checker": "aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function",
+    "dcv_checker": "aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function",
+}
+
+# imports the handler module and creates its handler, then prints the init phase breakdown
+COLD_START_SCRIPT = """
+import json, importlib
+handler_module = importlib.import_module({module!r})
+print(json.dumps(handler_module.get_handler().init_phase_timer.phase_seconds))
+"""
+
+
+def create_environment() -> dict[str, str]:
+    with open("resources/aws_region_config.yaml") as file:
+        region_codes = [region["code"] for region in yaml.safe_load(file)["aws_available_regions"]][:6]
+    perspectives = {
+        code: {
+            "dcv_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:dcv"},
+            "caa_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:caa"},
+        }
+        for code in region_codes
+    }
+    environment = dict(os.environ)
+    environment.update(
+        {
+            "PYTHONPATH": os.pathsep.join(["src", "."]),
+            "AWS_REGION": "us-east-1",
+            # avoid credential lookups against instance metadata endpoints when creating clients
+            "AWS_ACCESS_KEY_ID": environment.get("AWS_ACCESS_KEY_ID", "benchmark"),
+            "AWS_SECRET_ACCESS_KEY": environment.get("AWS_SECRET_ACCESS_KEY", "benchmark"),
+            "perspectives": json.dumps(perspectives),
+            "default_perspective_count": "3",
+            "hash_secret": "benchmark",
+            "default_caa_domains": "example.com",
+        }
+    )
+    return environment
+
+
+def measure_cold_start(module: str, environment: dict[str, str]) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT.format(module=module)],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    environment = create_environment()
+    for handler_name, module in HANDLER_MODULES.items():
+        runs = [measure_cold_start(module, environment) for _ in range(REPETITIONS)]
+        print(f"{handler_name} (ms, median of {REPETITIONS} cold starts)")
+        for phase in runs[0]:
+            phase_milliseconds = sorted(run[phase] * 1000 for run in runs)[REPETITIONS // 2]
+            print(f"  {phase:<24} {phase_milliseconds:8.1f}")
+        total_milliseconds = sorted(sum(run.values()) * 1000 for run in runs)[REPETITIONS // 2]
+        print(f"  {'total':<24} {total_milliseconds:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Local end-to-end run of the coordinator -> checker path without AWS or network access, for profiling. The coordinator
+handler calls the CAA and DCV checkers through its real aioboto3 Lambda clients, which are pointed (with
+AWS_ENDPOINT_URL_LAMBDA) at a local endpoint serving the Lambda Invoke API. The endpoint passes each invocation to the
+checker module's lambda_handler. The checkers in turn query a local authoritative DNS stub (as the default resolver)
+and fetch HTTP challenges through a local proxy that answers them (as HTTP_PROXY).
+
+Each check function runs in a single "container" thread, so calls to the same check function are handled one at a time,
+as by one warm Lambda container. Latencies therefore include queueing at the checkers; use `hatch run benchmark-load`
+to measure the coordinator's throughput.
+
+Run from the root directory of the project with `hatch run benchmark-end-to-end` (add `-- --help` for the options):
+- `-- --profile testreports/end_to_end.prof` profiles the coordinator and the checker invocations with cProfile, writes
+  the combined statistics (for snakeviz, pstats, etc.) and prints the top functions by cumulative time.
+- For sampling profilers, run e.g. `py-spy record -o end_to_end.svg -- python tests/benchmark/end_to_end_benchmark.py`
+  with PYTHONPATH=src:. set.
+- `-- --serve` starts only the checker side (invoke endpoint, DNS stub and challenge proxy) and prints its endpoint,
+  which another process can then drive with `-- --checkers-endpoint <endpoint>`, so that each side can be profiled
+  as its own process.
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import cProfile
+import contextlib
+import argparse
+import importlib
+import pstats
+import statistics
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.rrset
+import dns.asyncresolver
+import yaml
+from aiohttp import web
+
+from open_mpic_core import DcvValidationMethod, MpicCoordinator
+from open_mpic_core_test.test_util.valid_mpic_request_creator import ValidMpicRequestCreator
+
+CHECKER_MODULES = {
+    "caa": "aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function",
+    "dcv": "aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function",
+}
+COORDINATOR_MODULE = "aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function"
+
+ZONE_ORIGIN = dns.name.from_text("example.com")
+DNS_TTL = 300
+CHALLENGE_VALUE = "test"  # the challenge value (and DNS name prefix) of the requests of ValidMpicRequestCreator
+
+REQUEST_KINDS = ["caa", "dcv-dns-change", "dcv-website-change"]
+
+
+def find_answer(qname: dns.name.Name, rdtype: int) -> list[str] | None:
+    """
+    The records of the stub's zone: a CAA record set at the apex (found by the CAA tree walk of every target) and the
+    DNS change challenge TXT record under every target.
+    """
+    if rdtype == dns.rdatatype.CAA and qname == ZONE_ORIGIN:
+        return ['0 issue "ca1.com"']
+    if rdtype == dns.rdatatype.TXT and qname.labels[0].decode("ascii") == CHALLENGE_VALUE:
+        return [f'"{CHALLENGE_VALUE}"']
+    return None
+
+
+class DnsStubRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        query_wire, udp_socket = self.request
+        query = dns.message.from_wire(query_wire)
+        response = dns.message.make_response(query)
+        response.flags |= dns.flags.AA
+        question = query.question[0]
+        answer = find_answer(question.name, question.rdtype)
+        if answer is not None:
+            response.answer.append(
+                dns.rrset.from_text_list(question.name, DNS_TTL, dns.rdataclass.IN, question.rdtype, answer)
+            )
+        elif not question.name.is_subdomain(ZONE_ORIGIN):
+            response.set_rcode(dns.rcode.NXDOMAIN)
+        # otherwise NOERROR without answers (NODATA), as for the names in the zone without the record type
+        udp_socket.sendto(response.to_wire(), self.client_address)
+
+
+class ChallengeProxyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers every HTTP challenge request sent through it as a proxy (the request target is the absolute URL).
+    """
+
+    def do_GET(self):
+        if urlsplit(self.path).path.startswith("/.well-known/"):
+            body = CHALLENGE_VALUE.encode("utf-8")
+            self.send_response(200)
+        else:
+            body = b"not found"
+            self.send_response(404)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalLambdaInvokeServer:
+    """
+    Serves the Lambda Invoke API (POST /2015-03-31/functions/{function_name}/invocations) for the check functions.
+    Each invocation is passed to the lambda_handler of the check function's module in that function's container
+    thread, optionally under the container's cProfile profiler.
+    """
+
+    def __init__(self, profile: bool):
+        self.containers = {check_type: ThreadPoolExecutor(1, f"{check_type}-checker") for check_type in CHECKER_MODULES}
+        self.profilers = {check_type: cProfile.Profile() for check_type in CHECKER_MODULES} if profile else {}
+        self.invocation_counts = {check_type: 0 for check_type in CHECKER_MODULES}
+        self.endpoint_url = None
+        self._loop = asyncio.new_event_loop()
+
+    def invoke_function(self, check_type: str, event: dict, client_context: dict) -> tuple[bytes, bool]:
+        """
+        Runs in the container thread of the check function.
+        :return: the response payload, and whether the function failed
+        """
+        checker_module = importlib.import_module(CHECKER_MODULES[check_type])
+        context = SimpleNamespace(client_context=SimpleNamespace(custom=client_context.get("custom")))
+        profiler = self.profilers.get(check_type)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return json.dumps(checker_module.lambda_handler(event, context)).encode("utf-8"), False
+        except Exception as e:
+            return json.dumps({"errorMessage": str(e), "errorType": e.__class__.__name__}).encode("utf-8"), True
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self.invocation_counts[check_type] += 1
+
+    async def handle_invoke(self, request: web.Request) -> web.Response:
+        function_name = request.match_info["function_name"]
+        check_type = "caa" if "caa_checker" in function_name else "dcv"
+        encoded_client_context = request.headers.get("X-Amz-Client-Context")
+        client_context = json.loads(base64.b64decode(encoded_client_context)) if encoded_client_context else {}
+        event = json.loads(await request.read())
+        payload, failed = await asyncio.get_running_loop().run_in_executor(
+            self.containers[check_type], self.invoke_function, check_type, event, client_context
+        )
+        headers = {"X-Amz-Executed-Version": "$LATEST"}
+        if failed:
+            headers["X-Amz-Function-Error"] = "Unhandled"
+        return web.Response(body=payload, headers=headers, content_type="application/json")
+
+    def start(self):
+        listening_socket = socket.create_server(("127.0.0.1", 0))
+        self.endpoint_url = f"http://127.0.0.1:{listening_socket.getsockname()[1]}"
+        app = web.Application()
+        app.router.add_post("/2015-03-31/functions/{function_name}/invocations", self.handle_invoke)
+
+        async def serve():
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.SockSite(runner, listening_socket).start()
+
+        self._loop.run_until_complete(serve())
+        threading.Thread(target=self._loop.run_forever, name="lambda-invoke-endpoint", daemon=True).start()
+
+
+def start_checker_side(profile: bool) -> LocalLambdaInvokeServer:
+    """
+    Starts the DNS stub and challenge proxy, points the checkers at them, and starts the Lambda invoke endpoint.
+    """
+    dns_stub = socketserver.ThreadingUDPServer(("127.0.0.1", 0), DnsStubRequestHandler)
+    challenge_proxy = ThreadingHTTPServer(("127.0.0.1", 0), ChallengeProxyRequestHandler)
+    for server in [dns_stub, challenge_proxy]:
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # both checkers resolve with the default resolver, and fetch HTTP challenges with trust_env (so through HTTP_PROXY)
+    resolver = dns.asyncresolver.Resolver(configure=False)
+    resolver.nameservers = ["127.0.0.1"]
+    resolver.port = dns_stub.server_address[1]
+    dns.asyncresolver.default_resolver = resolver
+    os.environ["HTTP_PROXY"] = f"http://127.0.0.1:{challenge_proxy.server_address[1]}"
+    os.environ["NO_PROXY"] = "127.0.0.1,localhost"  # the invoke endpoint is called directly
+    os.environ["default_caa_domains"] = "ca1.com|ca2.org"
+    os.environ.setdefault("dns_timeout_seconds", "2")
+
+    invoke_server = LocalLambdaInvokeServer(profile)
+    invoke_server.start()
+    return invoke_server
+
+
+def set_coordinator_environment(region_codes: list[str], checkers_endpoint: str):
+    perspectives = {
+        code: {
+            "dcv_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:mpic_dcv_checker_{code}"},
+            "caa_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:mpic_caa_checker_{code}"},
+        }
+        for code in region_codes
+    }
+    os.environ["perspectives"] = json.dumps(perspectives)
+    os.environ["default_perspective_count"] = "3"
+    os.environ["hash_secret"] = "benchmark"
+    os.environ["AWS_ENDPOINT_URL_LAMBDA"] = checkers_endpoint
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+
+
+def load_region_codes() -> list[str]:
+    with open("resources/aws_region_config.yaml") as file:
+        return [region["code"] for region in yaml.safe_load(file)["aws_available_regions"]]
+
+
+def create_mpic_request(request_kind: str, index: int, perspective_count: int):
+    if request_kind == "caa":
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+    elif request_kind == "dcv-dns-change":
+        mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request(DcvValidationMethod.DNS_CHANGE)
+    else:
+        mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request(DcvValidationMethod.WEBSITE_CHANGE)
+    mpic_request.domain_or_ip_target = f"end-to-end-{index}.example.com"
+    mpic_request.orchestration_parameters.perspective_count = perspective_count
+    mpic_request.orchestration_parameters.quorum_count = MpicCoordinator.determine_required_quorum_count(
+        None, perspective_count
+    )
+    return mpic_request
+
+
+def check_cohorts_can_be_formed(handler, mpic_requests: list, args):
+    """
+    Exits with an error if the coordinator cannot form a cohort of the perspective count for every request. Cohorts
+    have to span at least two RIRs and leave out regions too close to each other, which the first --regions regions
+    (in the order of the region config) may not allow.
+    """
+    mpic_coordinator = handler.mpic_coordinator
+    for mpic_request in mpic_requests:
+        cohorts = mpic_coordinator.shuffle_and_group_perspectives(
+            mpic_coordinator.target_perspectives, args.perspective_count, mpic_request.domain_or_ip_target
+        )
+        if len(cohorts) == 0:
+            sys.exit(
+                f"error: no cohort of {args.perspective_count} perspectives can be formed from the first {args.regions} "
+                f"regions of resources/aws_region_config.yaml (cohorts span at least two RIRs and leave out regions "
+                f"too close to each other); raise --regions or lower --perspective-count"
+            )
+
+
+def print_profile(profilers: list[cProfile.Profile], output_path: str, top: int):
+    stats = pstats.Stats(profilers[0])
+    for profiler in profilers[1:]:
+        stats.add(profiler)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    stats.dump_stats(output_path)
+    stats.sort_stats("cumulative").print_stats(top)
+    print(f"profile written to {output_path}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local end-to-end run of the MPIC coordinator and checkers.")
+    parser.add_argument("--regions", type=int, default=10, help="number of deployed perspectives (default 10)")
+    parser.add_argument(
+        "--requests", type=int, default=60, help="number of MPIC requests, in turn of each kind (default 60)"
+    )
+    parser.add_argument(
+        "--perspective-count", type=int, default=6, help="perspectives per request, at most --regions (default 6)"
+    )
+    parser.add_argument("--profile", default=None, help="where to write the combined cProfile statistics")
+    parser.add_argument("--top", type=int, default=30, help="number of profiled functions printed (default 30)")
+    parser.add_argument("--serve", action="store_true", help="only start the checker side and wait")
+    parser.add_argument("--checkers-endpoint", default=None, help="endpoint of a checker side started with --serve")
+    args = parser.parse_args()
+    available_region_count = len(load_region_codes())
+    if not 2 <= args.regions <= available_region_count:
+        parser.error(f"--regions must be between 2 and {available_region_count} (the regions of the region config)")
+    if args.perspective_count < 2:
+        parser.error("--perspective-count must be at least 2")
+    if args.perspective_count > args.regions:
+        print(f"perspective count clamped to the {args.regions} regions")
+        args.perspective_count = args.regions
+    return args
+
+
+def main():
+    args = parse_arguments()
+    invoke_server = None
+    checkers_endpoint = args.checkers_endpoint
+    if checkers_endpoint is None:
+        invoke_server = start_checker_side(args.profile is not None)
+        checkers_endpoint = invoke_server.endpoint_url
+    if args.serve:
+        print(f"checkers endpoint: {checkers_endpoint} (stop with Ctrl+C)", flush=True)
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                while True:
+                    time.sleep(5)
+        except KeyboardInterrupt:
+            if args.profile is not None:
+                print_profile(list(invoke_server.profilers.values()), args.profile, args.top)
+            return
+
+    set_coordinator_environment(load_region_codes()[: args.regions], checkers_endpoint)
+    coordinator_module = importlib.import_module(COORDINATOR_MODULE)
+    coordinator_profiler = cProfile.Profile() if args.profile is not None else None
+    handler = coordinator_module.MpicCoordinatorLambdaHandler()
+    request_kinds = [REQUEST_KINDS[index % len(REQUEST_KINDS)] for index in range(args.requests)]
+    mpic_requests = [
+        create_mpic_request(request_kind, index, args.perspective_count)
+        for index, request_kind in enumerate(request_kinds)
+    ]
+    check_cohorts_can_be_formed(handler, mpic_requests, args)
+
+    latencies = {request_kind: [] for request_kind in REQUEST_KINDS}
+    valid_counts = {request_kind: 0 for request_kind in REQUEST_KINDS}
+    # the DCV checker prints every request it processes
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for request_kind, mpic_request in zip(request_kinds, mpic_requests):
+            if coordinator_profiler is not None:
+                coordinator_profiler.enable()
+            start_time = time.perf_counter()
+            result = handler.process_invocation(mpic_request)
+            latencies[request_kind].append(time.perf_counter() - start_time)
+            if coordinator_profiler is not None:
+                coordinator_profiler.disable()
+            valid_counts[request_kind] += 1 if json.loads(result["body"])["is_valid"] else 0
+
+    print(f"{'request kind':<22} {'requests':>8} {'valid':>8} {'p50 ms':>10} {'p95 ms':>10}")
+    for request_kind, request_latencies in latencies.items():
+        if len(request_latencies) < 2:
+            continue
+        percentiles = statistics.quantiles(request_latencies, n=100, method="inclusive")
+        print(
+            f"{request_kind:<22} {len(request_latencies):>8} {valid_counts[request_kind]:>8} "
+            f"{percentiles[49] * 1000:>10.1f} {percentiles[94] * 1000:>10.1f}"
+        )
+    if invoke_server is not None:
+        print(f"checker invocations: {invoke_server.invocation_counts}")
+    handler.shutdown()
+
+    if coordinator_profiler is not None:
+        checker_profilers = list(invoke_server.profilers.values()) if invoke_server is not None else []
+        print_profile([coordinator_profiler, *checker_profilers], args.profile, args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
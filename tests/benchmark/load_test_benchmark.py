@@ -0,0 +1,335 @@
+"""
+Local load test of the coordinator: MpicCoordinatorLambdaHandler coordinates MPIC requests against in-process fake
+perspective Lambda clients, which model per-region latency distributions, cold starts and error rates. No deployment
+or real AWS credentials are needed. Reports throughput, latency percentiles and memory per request, and writes them
+as JSON (with the commit they were measured at) so that runs can be compared between commits.
+
+Run from the root directory of the project with `hatch run benchmark-load` (add `-- --help` for the options), e.g.,
+`hatch run benchmark-load -- --regions 20 --concurrency 50 --compare testreports/load_test_baseline.json`.
+With `--latency-scale 0`, the fakes answer immediately and the results show the coordinator's own overhead.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from contextlib import AsyncExitStack
+
+import yaml
+
+from open_mpic_core import CaaCheckResponse, CaaCheckResponseDetails, DcvCheckResponse
+from open_mpic_core import DcvCheckResponseDetailsBuilder, DcvValidationMethod, MpicCoordinator
+from open_mpic_core_test.test_util.valid_mpic_request_creator import ValidMpicRequestCreator
+from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import MpicCoordinatorLambdaHandler
+from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import ManagedLambdaClient
+
+# rough median round trip latency of a call from the coordinator to a perspective's check function, by region prefix
+REGION_PREFIX_MEDIAN_LATENCY_MS = {"us": 40, "ca": 50, "sa": 150, "eu": 100, "il": 160, "me": 180, "af": 230, "ap": 190}
+DEFAULT_MEDIAN_LATENCY_MS = 150
+LATENCY_SIGMA = 0.35  # of the lognormal latency distribution; 0.35 puts p99 at about 2.3x the median
+COLD_START_MS = 900
+
+
+class RegionProfile:
+    def __init__(self, median_latency_ms: float, cold_start_rate: float, error_rate: float):
+        self.median_latency_ms = median_latency_ms
+        self.cold_start_rate = cold_start_rate  # share of calls (after the first one, always cold) hitting a cold start
+        self.error_rate = error_rate  # share of calls failing with a Lambda function error
+
+
+class FakePayload:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+    async def read(self):
+        return self.payload
+
+
+class FakePerspectiveLambdaClient:
+    """
+    Stands in for the Lambda client of one perspective: answers every check request with a passing check response
+    after a latency drawn from the perspective's profile, or fails with a function error at the profile's error rate.
+    """
+
+    def __init__(self, profile: RegionProfile, latency_scale: float, rng: random.Random):
+        self.profile = profile
+        self.latency_scale = latency_scale
+        self.rng = rng
+        self.invocations = 0
+        self.cold_starts = 0
+        self.errors = 0
+
+    # noinspection PyPep8Naming,PyUnusedLocal
+    async def invoke(self, FunctionName, InvocationType, Payload, ClientContext=None):
+        self.invocations += 1
+        latency_ms = self.rng.lognormvariate(math.log(self.profile.median_latency_ms), LATENCY_SIGMA)
+        if self.invocations == 1 or self.rng.random() < self.profile.cold_start_rate:
+            self.cold_starts += 1
+            latency_ms += COLD_START_MS
+        await asyncio.sleep(latency_ms * self.latency_scale / 1000)
+        if self.rng.random() < self.profile.error_rate:
+            self.errors += 1
+            return {"FunctionError": "Unhandled", "Payload": FakePayload(b'{"errorMessage": "simulated failure"}')}
+        check_request = json.loads(Payload)
+        if "check_requests" in check_request:  # a batched call
+            check_responses = [create_check_response(request) for request in check_request["check_requests"]]
+            return {"Payload": FakePayload(("[" + ",".join(check_responses) + "]").encode("utf-8"))}
+        return {"Payload": FakePayload(create_check_response(check_request).encode("utf-8"))}
+
+
+_check_responses: dict[str, str] = {}  # by check type and validation method, so the fakes add little CPU time
+
+
+def create_check_response(check_request: dict) -> str:
+    if "caa_check_parameters" in check_request:
+        response_key = "caa"
+        if response_key not in _check_responses:
+            check_response = CaaCheckResponse(
+                check_passed=True, details=CaaCheckResponseDetails(caa_record_present=False)
+            )
+            _check_responses[response_key] = check_response.model_dump_json()
+    else:
+        response_key = check_request["dcv_check_parameters"]["validation_method"]
+        if response_key not in _check_responses:
+            details = DcvCheckResponseDetailsBuilder.build_response_details(DcvValidationMethod(response_key))
+            _check_responses[response_key] = DcvCheckResponse(check_passed=True, details=details).model_dump_json()
+    return _check_responses[response_key]
+
+
+def load_region_codes() -> list[str]:
+    with open("resources/aws_region_config.yaml") as file:
+        return [region["code"] for region in yaml.safe_load(file)["aws_available_regions"]]
+
+
+def set_coordinator_environment(region_codes: list[str]):
+    perspectives = {
+        code: {
+            "dcv_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:dcv"},
+            "caa_endpoint_info": {"arn": f"arn:aws:lambda:{code}:123456789012:function:caa"},
+        }
+        for code in region_codes
+    }
+    os.environ["perspectives"] = json.dumps(perspectives)
+    os.environ["default_perspective_count"] = "3"
+    os.environ["hash_secret"] = "benchmark"
+    os.environ["lambda_client_init_mode"] = "lazy"  # the fakes are installed instead
+    # avoid credential lookups against instance metadata endpoints
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+
+def install_fake_clients(
+    handler, region_codes: list[str], args, rng: random.Random
+) -> list[FakePerspectiveLambdaClient]:
+    fake_clients = []
+    registry = handler.lambda_client_registry
+    for code in region_codes:
+        median_latency_ms = REGION_PREFIX_MEDIAN_LATENCY_MS.get(code.split("-")[0], DEFAULT_MEDIAN_LATENCY_MS)
+        profile = RegionProfile(median_latency_ms, args.cold_start_rate, args.error_rate)
+        fake_client = FakePerspectiveLambdaClient(profile, args.latency_scale, rng)
+        registry._clients[code] = ManagedLambdaClient(fake_client, AsyncExitStack(), registry._session)
+        fake_clients.append(fake_client)
+    return fake_clients
+
+
+def create_mpic_requests(args, rng: random.Random) -> list:
+    mpic_requests = []
+    for index in range(args.requests):
+        if rng.random() < args.caa_share:
+            mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        else:
+            mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request()
+        mpic_request.domain_or_ip_target = f"load-test-{index}.example.com"  # spreads requests over cohorts
+        mpic_request.orchestration_parameters.perspective_count = args.perspective_count
+        mpic_request.orchestration_parameters.quorum_count = MpicCoordinator.determine_required_quorum_count(
+            None, args.perspective_count
+        )
+        mpic_request.orchestration_parameters.max_attempts = args.max_attempts
+        mpic_requests.append(mpic_request)
+    return mpic_requests
+
+
+async def run_requests(handler, mpic_requests: list, concurrency: int) -> tuple[list[float], int]:
+    """
+    Coordinates the requests (and serializes the responses, as process_invocation does) with the given number of
+    requests in flight at a time.
+    :return: the latency of each request in seconds, and the number of valid MPIC responses
+    """
+    latencies = []
+    valid_count = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, valid_count
+        while next_index < len(mpic_requests):
+            mpic_request = mpic_requests[next_index]
+            next_index += 1
+            start_time = time.perf_counter()
+            mpic_response = await handler.coordinate_mpic(mpic_request)
+            mpic_response.model_dump_json(exclude=handler.mpic_response_exclude)
+            latencies.append(time.perf_counter() - start_time)
+            valid_count += 1 if mpic_response.is_valid else 0
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, valid_count
+
+
+def measure_memory(handler, mpic_requests: list, concurrency: int) -> dict:
+    """
+    Runs the requests again under tracemalloc (which slows them down, so this is kept out of the timed run).
+    """
+    tracemalloc.start()
+    baseline_bytes, _ = tracemalloc.get_traced_memory()
+    handler.event_loop_runner.run(run_requests(handler, mpic_requests, concurrency))
+    current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "peak_bytes_per_request_in_flight": round((peak_bytes - baseline_bytes) / min(concurrency, len(mpic_requests))),
+        "retained_bytes_per_request": round((current_bytes - baseline_bytes) / len(mpic_requests)),
+    }
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def summarize_latencies(latencies: list[float]) -> dict:
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": round(percentiles[49] * 1000, 2),
+        "p95": round(percentiles[94] * 1000, 2),
+        "p99": round(percentiles[98] * 1000, 2),
+        "mean": round(statistics.fmean(latencies) * 1000, 2),
+        "max": round(max(latencies) * 1000, 2),
+    }
+
+
+def print_results(results: dict, baseline: dict | None):
+    def with_change(name: str, value: float, baseline_value: float | None) -> str:
+        if baseline_value:
+            return f"{name:<34} {value:>12.2f} ({(value - baseline_value) / baseline_value * 100:+.1f}%)"
+        return f"{name:<34} {value:>12.2f}"
+
+    baseline_results = baseline["results"] if baseline is not None else {}
+    print(with_change("throughput (requests/s)", results["throughput_rps"], baseline_results.get("throughput_rps")))
+    for percentile, latency_ms in results["latency_ms"].items():
+        baseline_latency_ms = baseline_results.get("latency_ms", {}).get(percentile)
+        print(with_change(f"latency {percentile} (ms)", latency_ms, baseline_latency_ms))
+    for name, value in results["memory"].items():
+        print(with_change(f"{name}", value, baseline_results.get("memory", {}).get(name)))
+    print(f"{'valid responses':<34} {results['valid_rate'] * 100:>11.1f}%")
+    perspective_calls = results["perspective_calls"]
+    print(
+        f"{'perspective calls':<34} {perspective_calls['invocations']:>12} "
+        f"({perspective_calls['cold_starts']} cold starts, {perspective_calls['errors']} errors)"
+    )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local load test of the MPIC coordinator with fake perspectives.")
+    parser.add_argument("--regions", type=int, default=20, help="number of deployed perspectives (default 20)")
+    parser.add_argument("--requests", type=int, default=1000, help="number of MPIC requests (default 1000)")
+    parser.add_argument("--concurrency", type=int, default=20, help="MPIC requests in flight at a time (default 20)")
+    parser.add_argument("--caa-share", type=float, default=0.5, help="share of CAA requests, the rest DCV (0.5)")
+    parser.add_argument("--perspective-count", type=int, default=6, help="perspectives per request (default 6)")
+    parser.add_argument("--max-attempts", type=int, default=None, help="max attempts per request (default 1)")
+    parser.add_argument("--cold-start-rate", type=float, default=0.01, help="share of cold perspective calls (0.01)")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of failing perspective calls (0.01)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="factor applied to all latencies (1.0)")
+    parser.add_argument("--memory-requests", type=int, default=200, help="requests of the memory run (default 200)")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the request mix and fake perspectives (1)")
+    parser.add_argument("--output", default="testreports/load_test_results.json", help="where to write the results")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+    available_region_count = len(load_region_codes())
+    if not 1 <= args.regions <= available_region_count:
+        parser.error(f"--regions must be between 1 and {available_region_count} (the regions of the region config)")
+    if not 2 <= args.perspective_count <= args.regions:
+        parser.error(f"--perspective-count ({args.perspective_count}) must be between 2 and --regions ({args.regions})")
+    return args
+
+
+def check_cohorts_can_be_formed(handler, mpic_requests: list, args):
+    """
+    Exits with an error if the coordinator cannot form a cohort of --perspective-count perspectives for every request.
+    Cohorts have to span at least two RIRs and leave out regions too close to each other, which the first --regions
+    regions (in the order of the region config) may not allow.
+    """
+    mpic_coordinator = handler.mpic_coordinator
+    for mpic_request in mpic_requests:
+        cohorts = mpic_coordinator.shuffle_and_group_perspectives(
+            mpic_coordinator.target_perspectives, args.perspective_count, mpic_request.domain_or_ip_target
+        )
+        if len(cohorts) == 0:
+            sys.exit(
+                f"error: no cohort of {args.perspective_count} perspectives can be formed from the first {args.regions} "
+                f"regions of resources/aws_region_config.yaml (cohorts span at least two RIRs and leave out regions "
+                f"too close to each other); raise --regions or lower --perspective-count"
+            )
+
+
+def main():
+    args = parse_arguments()
+    logging.disable(logging.WARNING)  # simulated perspective errors would otherwise be logged as warnings
+    if args.max_attempts is not None:
+        os.environ.setdefault("absolute_max_attempts", str(args.max_attempts))
+    region_codes = load_region_codes()[: args.regions]
+    set_coordinator_environment(region_codes)
+
+    rng = random.Random(args.seed)
+    handler = MpicCoordinatorLambdaHandler()
+    fake_clients = install_fake_clients(handler, region_codes, args, rng)
+    mpic_requests = create_mpic_requests(args, rng)
+    check_cohorts_can_be_formed(handler, mpic_requests, args)
+
+    start_time = time.perf_counter()
+    latencies, valid_count = handler.event_loop_runner.run(run_requests(handler, mpic_requests, args.concurrency))
+    duration_seconds = time.perf_counter() - start_time
+    perspective_calls = {
+        "invocations": sum(fake_client.invocations for fake_client in fake_clients),
+        "cold_starts": sum(fake_client.cold_starts for fake_client in fake_clients),
+        "errors": sum(fake_client.errors for fake_client in fake_clients),
+    }
+    memory = measure_memory(handler, mpic_requests[: args.memory_requests], args.concurrency)
+
+    results = {
+        "commit": get_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "configuration": vars(args),
+        "results": {
+            "requests": len(latencies),
+            "duration_seconds": round(duration_seconds, 3),
+            "throughput_rps": round(len(latencies) / duration_seconds, 2),
+            "latency_ms": summarize_latencies(latencies),
+            "valid_rate": round(valid_count / len(latencies), 4),
+            "perspective_calls": perspective_calls,
+            "memory": memory,
+        },
+    }
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(results["results"], baseline)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {args.output}")
+    handler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
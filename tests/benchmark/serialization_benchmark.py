@@ -0,0 +1,267 @@
+"""
+Microbenchmark suite of the pydantic serialization on the path of every perspective call, for CAA and each DCV
+validation method, with check responses holding details of realistic sizes:
+- coordinator: dumping the check request to the invocation payload (check_request.model_dump_json())
+- checker: validating the invocation event (after the Lambda runtime's json.loads) against the checker's event types
+- checker: dumping the check response as the raw invocation result (followed by the Lambda runtime's json.dumps)
+- coordinator: validating the response payload (parse_remote_perspective_response)
+Reports ops/sec and time per operation, and the peak memory allocated by one operation (traced with tracemalloc), as
+well as the total per perspective call and per MPIC request (the response of which the coordinator also dumps).
+Also compares serializing the check request for every call of a large, retried MPIC request with the coordinator's
+per-request payload cache, and reports the ratio and time cost of compressing (zlib, as with
+perspective-payload-compression) raw responses of one check and of batches of checks.
+
+Run from the root directory of the project with `hatch run benchmark-serialization` (`-- --help` for the options).
+"""
+
+import json
+import base64
+import timeit
+import argparse
+import tracemalloc
+
+from pydantic import TypeAdapter
+
+from open_mpic_core import CheckResponse, CaaCheckResponse, CaaCheckResponseDetails, DcvCheckResponse
+from open_mpic_core import DcvCheckResponseDetailsBuilder, DcvValidationMethod, DnsRecordType, RedirectResponse
+from open_mpic_core import DcvHttpCheckResponseDetails, DcvDnsCheckResponseDetails, DcvTlsAlpnCheckResponseDetails
+from open_mpic_core import MpicCaaResponse, MpicDcvResponse, PerspectiveResponse, MpicEffectiveOrchestrationParameters
+from open_mpic_core_test.test_util.valid_check_creator import ValidCheckCreator
+from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import MpicCoordinatorLambdaHandler
+from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import CheckRequestPayloadCache
+from aws_lambda_mpic.common_util.payload_compression import compress_payload, decompress_payload
+from aws_lambda_mpic.mpic_caa_checker_lambda import mpic_caa_checker_lambda_function as caa_checker_module
+from aws_lambda_mpic.mpic_dcv_checker_lambda import mpic_dcv_checker_lambda_function as dcv_checker_module
+
+PERSPECTIVE_COUNT = 6  # perspectives called per MPIC request (a common perspective_count)
+REPEAT = 5
+
+# fan-out of a large MPIC request that exhausts its attempts, for the payload cache comparison
+FAN_OUT_PERSPECTIVE_COUNT = 20
+FAN_OUT_ATTEMPT_COUNT = 3
+
+# check responses per (batched) raw response, for the compression comparison
+COMPRESSION_BATCH_SIZES = [1, 10, 100]
+
+STAGES = ["request dump", "event validate", "response dump", "response parse"]
+
+# DNS-ACCOUNT-01 is not implemented by open-mpic-core yet, so it has no check requests to measure
+DCV_VALIDATION_METHODS = [method for method in DcvValidationMethod if method != DcvValidationMethod.DNS_ACCOUNT_01]
+
+
+def create_check_request(check_kind: str):
+    if check_kind == "caa":
+        return ValidCheckCreator.create_valid_caa_check_request()
+    validation_method = DcvValidationMethod(check_kind)
+    record_type = DnsRecordType.A if validation_method == DcvValidationMethod.IP_ADDRESS else None
+    return ValidCheckCreator.create_valid_dcv_check_request(validation_method, record_type)
+
+
+def create_check_response(check_kind: str):
+    """
+    A passing check response with details of the sizes seen for real domains.
+    """
+    if check_kind == "caa":
+        records_seen = ['0 issue "ca1.com"', '0 issue "ca2.org; validationmethods=dns-01"', '0 iodef "mailto:x@y.z"']
+        details = CaaCheckResponseDetails(caa_record_present=True, found_at="example.com", records_seen=records_seen)
+        return CaaCheckResponse(check_passed=True, check_completed=True, details=details, timestamp_ns=1)
+    details = DcvCheckResponseDetailsBuilder.build_response_details(DcvValidationMethod(check_kind))
+    if isinstance(details, DcvHttpCheckResponseDetails):
+        details.response_history = [RedirectResponse(status_code=301, url="https://www.example.com/.well-known/x")]
+        details.response_url = "https://www.example.com/.well-known/pki-validation/token-value-0123456789"
+        details.response_status_code = 200
+        details.response_page = base64.b64encode(b"challenge-value-" + b"x" * 84).decode("ascii")
+    elif isinstance(details, DcvDnsCheckResponseDetails):
+        details.records_seen = ["challenge-value-" + "x" * 43, "v=spf1 include:_spf.example.com ~all"]
+        details.response_code = 0
+        details.ad_flag = False
+        details.found_at = "_validation.example.com"
+        details.cname_chain = ["_validation.example.com.cdn.example.net"]
+    elif isinstance(details, DcvTlsAlpnCheckResponseDetails):
+        details.common_name = "www.example.com"
+    return DcvCheckResponse(check_passed=True, check_completed=True, details=details, timestamp_ns=1)
+
+
+def create_mpic_response(check_kind: str, check_response):
+    perspectives = [
+        PerspectiveResponse(perspective_code=f"perspective-{index}", check_response=check_response)
+        for index in range(PERSPECTIVE_COUNT)
+    ]
+    orchestration_parameters = MpicEffectiveOrchestrationParameters(
+        perspective_count=PERSPECTIVE_COUNT, quorum_count=PERSPECTIVE_COUNT - 2, attempt_count=1
+    )
+    mpic_response_class = MpicCaaResponse if check_kind == "caa" else MpicDcvResponse
+    return mpic_response_class(
+        domain_or_ip_target="www.example.com",
+        actual_orchestration_parameters=orchestration_parameters,
+        is_valid=True,
+        perspectives=perspectives,
+    )
+
+
+def create_stage_operations(check_kind: str) -> tuple[dict, dict]:
+    """
+    :return: the operation of each stage, and the sizes of the payloads involved
+    """
+    check_request = create_check_request(check_kind)
+    check_response = create_check_response(check_kind)
+    request_payload = check_request.model_dump_json()
+    response_payload = json.dumps(check_response.model_dump(mode="json")).encode("utf-8")
+    if check_kind == "caa":
+        event_adapter = TypeAdapter(
+            caa_checker_module.CaaCheckRequest
+            | caa_checker_module.CaaCheckBatchRequest
+            | caa_checker_module.PingRequest
+        )
+    else:
+        event_adapter = TypeAdapter(
+            dcv_checker_module.DcvCheckRequest
+            | dcv_checker_module.DcvCheckBatchRequest
+            | dcv_checker_module.PingRequest
+        )
+    check_response_adapter = TypeAdapter(CheckResponse)
+    parse = MpicCoordinatorLambdaHandler.parse_remote_perspective_response
+    operations = {
+        "request dump": check_request.model_dump_json,
+        "event validate": lambda: event_adapter.validate_python(json.loads(request_payload)),
+        "response dump": lambda: json.dumps(check_response.model_dump(mode="json")),
+        "response parse": lambda: parse(response_payload, check_response_adapter),
+    }
+    mpic_response = create_mpic_response(check_kind, check_response)
+    operations["mpic response dump"] = mpic_response.model_dump_json
+    sizes = {
+        "request": len(request_payload),
+        "response": len(response_payload),
+        "mpic response": len(mpic_response.model_dump_json()),
+    }
+    return operations, sizes
+
+
+def create_fan_out_operations(check_kind: str) -> dict:
+    """
+    Serializing the check request for every perspective call of an MPIC request, across its attempts: without the
+    payload cache, and with it (the coordinator builds a new but equal check request for each attempt).
+    """
+    check_requests = [create_check_request(check_kind) for _ in range(FAN_OUT_ATTEMPT_COUNT)]
+
+    def dump_per_call():
+        for check_request in check_requests:
+            for _ in range(FAN_OUT_PERSPECTIVE_COUNT):
+                check_request.model_dump_json()
+
+    def dump_through_payload_cache():
+        payload_cache = CheckRequestPayloadCache()
+        for check_request in check_requests:
+            for _ in range(FAN_OUT_PERSPECTIVE_COUNT):
+                payload_cache.get_payload(check_request)
+
+    return {"uncached": dump_per_call, "payload cache": dump_through_payload_cache}
+
+
+def create_compression_operations(check_kind: str, batch_size: int) -> tuple[dict, int, int]:
+    """
+    :return: the compression and decompression of a raw response holding batch_size check responses, and the sizes
+             of the response before and after compression
+    The check responses of a batch are copies of one response, so the ratios measured for batches are upper bounds.
+    """
+    check_response = create_check_response(check_kind)
+    raw_response = (
+        [check_response.model_dump(mode="json")] * batch_size
+        if batch_size > 1
+        else check_response.model_dump(mode="json")
+    )
+    response_payload = json.dumps(raw_response).encode("utf-8")
+    compressed_payload = compress_payload(response_payload, "zlib")
+    operations = {
+        "compress": lambda: compress_payload(response_payload, "zlib"),
+        "decompress": lambda: decompress_payload(compressed_payload),
+    }
+    return operations, len(response_payload), len(json.dumps(compressed_payload))
+
+
+def measure_seconds_per_operation(operation, number: int) -> float:
+    return min(timeit.repeat(operation, number=number, repeat=REPEAT)) / number
+
+
+def measure_peak_allocated_bytes(operation) -> int:
+    """
+    The peak memory traced while one operation runs, beyond what was allocated before it.
+    """
+    operation()  # warms up caches (e.g., pydantic's) so that only the steady state is measured
+    tracemalloc.start()
+    try:
+        baseline_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        operation()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_bytes - baseline_bytes
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the serialization on the perspective call path.")
+    parser.add_argument("--number", type=int, default=2_000, help="operations per timing (default 2000)")
+    parser.add_argument("--checks", nargs="*", default=None, help="check kinds to run: caa and/or DCV methods")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    check_kinds = args.checks or ["caa", *[method.value for method in DCV_VALIDATION_METHODS]]
+    print(f"{'check':<24} {'stage':<20} {'ops/s':>10} {'us/op':>8} {'peak alloc B':>13}")
+    for check_kind in check_kinds:
+        operations, sizes = create_stage_operations(check_kind)
+        microseconds = {}
+        for stage, operation in operations.items():
+            seconds = measure_seconds_per_operation(operation, args.number)
+            microseconds[stage] = seconds * 1_000_000
+            peak_bytes = measure_peak_allocated_bytes(operation)
+            print(f"{check_kind:<24} {stage:<20} {1 / seconds:>10.0f} {microseconds[stage]:>8.2f} {peak_bytes:>13}")
+        per_call_microseconds = sum(microseconds[stage] for stage in STAGES)
+        per_request_microseconds = per_call_microseconds * PERSPECTIVE_COUNT + microseconds["mpic response dump"]
+        print(
+            f"{check_kind:<24} {'per perspective call':<20} {per_call_microseconds:>19.2f} us "
+            f"({sizes['request']} B request, {sizes['response']} B response)"
+        )
+        print(
+            f"{check_kind:<24} {'per MPIC request':<20} {per_request_microseconds:>19.2f} us "
+            f"({PERSPECTIVE_COUNT} perspectives, {sizes['mpic response']} B MPIC response)"
+        )
+
+    print(
+        f"\nCheck request serialization per MPIC request of {FAN_OUT_PERSPECTIVE_COUNT} perspectives "
+        f"x {FAN_OUT_ATTEMPT_COUNT} attempts"
+    )
+    print(f"{'check':<24} {'uncached us':>12} {'cached us':>10} {'saved':>7}")
+    for check_kind in check_kinds:
+        fan_out_microseconds = {
+            name: measure_seconds_per_operation(operation, max(1, args.number // 20)) * 1_000_000
+            for name, operation in create_fan_out_operations(check_kind).items()
+        }
+        uncached_microseconds, cached_microseconds = (
+            fan_out_microseconds["uncached"],
+            fan_out_microseconds["payload cache"],
+        )
+        saved_percent = (1 - cached_microseconds / uncached_microseconds) * 100
+        print(f"{check_kind:<24} {uncached_microseconds:>12.2f} {cached_microseconds:>10.2f} {saved_percent:>6.1f}%")
+
+    print("\nRaw response compression (zlib) by number of check responses held")
+    print(
+        f"{'check':<24} {'checks':>6} {'bytes':>8} {'compressed':>10} {'ratio':>6} {'compress us':>12} {'decompress us':>14}"
+    )
+    for check_kind in check_kinds:
+        for batch_size in COMPRESSION_BATCH_SIZES:
+            operations, payload_bytes, compressed_bytes = create_compression_operations(check_kind, batch_size)
+            compress_microseconds, decompress_microseconds = [
+                measure_seconds_per_operation(operation, max(1, args.number // (10 * batch_size))) * 1_000_000
+                for operation in operations.values()
+            ]
+            print(
+                f"{check_kind:<24} {batch_size:>6} {payload_bytes:>8} {compressed_bytes:>10} "
+                f"{payload_bytes / compressed_bytes:>6.1f} {compress_microseconds:>12.2f} {decompress_microseconds:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
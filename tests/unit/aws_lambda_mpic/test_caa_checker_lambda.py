@@ -1,13 +1,24 @@
+import json
 import time
+import asyncio
 
 import dns
 import pytest
 
+from types import SimpleNamespace
+
+from pydantic import ValidationError
+
 from open_mpic_core import CaaCheckResponse, CaaCheckResponseDetails
 from open_mpic_core_test.test_util.mock_dns_object_creator import MockDnsObjectCreator
 from open_mpic_core_test.test_util.valid_check_creator import ValidCheckCreator
 import aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function as mpic_caa_checker_lambda_function
-from aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function import MpicCaaCheckerLambdaHandler
+from aws_lambda_mpic.common_util.payload_compression import compress_payload, decompress_payload, is_compressed_payload
+from aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function import (
+    MpicCaaCheckerLambdaHandler,
+    CaaCheckBatchRequest,
+    CaaLookupCache,
+)
 
 
 # noinspection PyMethodMayBeStatic
@@ -40,6 +51,92 @@ class TestCaaCheckerLambda:
         result = mpic_caa_checker_lambda_function.lambda_handler(caa_check_request, None)
         assert result == mock_return_value
 
+    def lambda_handler__should_do_caa_check_for_each_request_of_batch_and_return_responses_in_order(
+        self, set_env_variables, mocker
+    ):
+        async def echo_domain_in_response(caa_request):
+            caa_response = TestCaaCheckerLambda.create_caa_check_response()
+            caa_response.details.found_at = caa_request.domain_or_ip_target
+            return caa_response
+
+        mocker.patch("open_mpic_core.MpicCaaChecker.check_caa", side_effect=echo_domain_in_response)
+        domains = ["a.example.com", "b.example.com", "c.example.com"]
+        caa_check_requests = []
+        for domain in domains:
+            caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+            caa_check_request.domain_or_ip_target = domain
+            caa_check_requests.append(caa_check_request)
+        batch_request = CaaCheckBatchRequest(check_requests=caa_check_requests)
+        result = mpic_caa_checker_lambda_function.lambda_handler(batch_request.model_dump(), None)
+        assert result["statusCode"] == 200
+        assert [response["details"]["found_at"] for response in json.loads(result["body"])] == domains
+
+    def lambda_handler__should_return_raw_check_response_given_raw_response_format_requested(
+        self, set_env_variables, mocker
+    ):
+        mock_caa_result = TestCaaCheckerLambda.create_caa_check_response()
+        mocker.patch("open_mpic_core.MpicCaaChecker.check_caa", return_value=mock_caa_result)
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        context = SimpleNamespace(client_context=SimpleNamespace(custom={"response_format": "raw"}))
+        result = mpic_caa_checker_lambda_function.lambda_handler(caa_check_request, context)
+        assert result == mock_caa_result.model_dump(mode="json")
+
+    # fmt: off
+    @pytest.mark.parametrize("compression_min_bytes, expect_compressed_response", [
+        (0, True),
+        (1_000_000, False),  # responses smaller than the threshold are left uncompressed
+    ])
+    # fmt: on
+    def lambda_handler__should_accept_compressed_event_and_compress_raw_response_given_compression_requested(
+        self, compression_min_bytes, expect_compressed_response, set_env_variables, mocker
+    ):
+        mock_caa_result = TestCaaCheckerLambda.create_caa_check_response()
+        mock_check_caa = mocker.patch("open_mpic_core.MpicCaaChecker.check_caa", return_value=mock_caa_result)
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        event = compress_payload(caa_check_request.model_dump_json().encode("utf-8"), "zlib")
+        client_context_custom = {
+            "response_format": "raw",
+            "response_compression": "zlib",
+            "response_compression_min_bytes": compression_min_bytes,
+        }
+        context = SimpleNamespace(client_context=SimpleNamespace(custom=client_context_custom))
+        result = mpic_caa_checker_lambda_function.lambda_handler(event, context)
+        assert mock_check_caa.call_args.args[0] == caa_check_request
+        assert is_compressed_payload(result) is expect_compressed_response
+        if expect_compressed_response:
+            result = json.loads(decompress_payload(result))
+        assert result == mock_caa_result.model_dump(mode="json")
+
+    def lambda_handler__should_answer_ping_without_doing_check_and_report_cold_start_only_once(
+        self, set_env_variables, mocker
+    ):
+        mock_check = mocker.patch("open_mpic_core.MpicCaaChecker.check_caa")
+        mocker.patch.object(mpic_caa_checker_lambda_function, "_handler", MpicCaaCheckerLambdaHandler())
+        first_result = mpic_caa_checker_lambda_function.lambda_handler({"ping": True}, None)
+        second_result = mpic_caa_checker_lambda_function.lambda_handler({"ping": True, "hold_ms": 1}, None)
+        assert first_result == {"pong": True, "cold_start": True}
+        assert second_result == {"pong": True, "cold_start": False}
+        mock_check.assert_not_called()
+
+    def start_invocation__should_log_init_phase_breakdown_on_cold_start_only(self, set_env_variables, mocker):
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler()
+        mock_log_info = mocker.patch.object(caa_checker_lambda_handler.logger, "info")
+        caa_checker_lambda_handler.start_invocation()
+        caa_checker_lambda_handler.start_invocation()
+        cold_start_fields, warm_start_fields = [json.loads(call.args[0]) for call in mock_log_info.call_args_list]
+        assert cold_start_fields["cold_start"] is True
+        assert list(cold_start_fields["init_phases_ms"].keys()) == ["import", "checker", "type_adapters"]
+        assert warm_start_fields == {"cold_start": False, "invocation_count": 2}
+
+    def lambda_handler__should_parse_json_string_event_and_reject_invalid_event(self, set_env_variables, mocker):
+        mock_caa_result = TestCaaCheckerLambda.create_caa_check_response()
+        mocker.patch("open_mpic_core.MpicCaaChecker.check_caa", return_value=mock_caa_result)
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        result = mpic_caa_checker_lambda_function.lambda_handler(caa_check_request.model_dump_json(), None)
+        assert result["body"] == mock_caa_result.model_dump_json()
+        with pytest.raises(ValidationError):
+            mpic_caa_checker_lambda_function.lambda_handler({"check_requests": []}, None)
+
     def lambda_handler__should_set_log_level_of_caa_checker(self, set_env_variables, setup_logging, mocker):
         caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
 
@@ -60,6 +157,119 @@ class TestCaaCheckerLambda:
         assert configured_caa_checker.resolver.timeout == 12.0
         assert configured_caa_checker.resolver.lifetime == 13.0
 
+    def constructor__should_run_invocations_on_loop_from_given_loop_factory(self, set_env_variables, mocker):
+        event_loop = asyncio.new_event_loop()
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler(loop_factory=lambda: event_loop)
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=TestCaaCheckerLambda.create_caa_lookup_result(caa_check_request.domain_or_ip_target),
+        )
+        result = caa_checker_lambda_handler.process_invocation(caa_check_request)
+        assert caa_checker_lambda_handler.event_loop_runner.loop is event_loop
+        assert result["statusCode"] == 200
+
+    def process_invocation__should_reuse_cached_caa_lookup_given_lookup_cache_enabled(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("caa_lookup_cache_max_entries", "10")
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        mock_find = mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=TestCaaCheckerLambda.create_caa_lookup_result(caa_check_request.domain_or_ip_target),
+        )
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler()
+        first_result = caa_checker_lambda_handler.process_invocation(caa_check_request)
+        second_result = caa_checker_lambda_handler.process_invocation(caa_check_request)
+        assert mock_find.call_count == 1
+        assert json.loads(first_result["body"])["details"] == json.loads(second_result["body"])["details"]
+        assert caa_checker_lambda_handler.caa_lookup_cache.hits == 1
+
+    def process_invocation__should_log_caa_lookup_cache_statistics_at_info_level(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("caa_lookup_cache_max_entries", "10")
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=TestCaaCheckerLambda.create_caa_lookup_result(caa_check_request.domain_or_ip_target),
+        )
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler()
+        mock_log_info = mocker.patch.object(caa_checker_lambda_handler.logger, "info")
+        caa_checker_lambda_handler.process_invocation(caa_check_request)
+        caa_checker_lambda_handler.process_invocation(caa_check_request)
+        cache_statistics = json.loads(mock_log_info.call_args.args[0])["caa_lookup_cache"]
+        assert cache_statistics["hits"] == 1
+        assert cache_statistics["misses"] == 1
+        assert cache_statistics["entries"] == 1
+
+    def process_invocation__should_do_fresh_caa_lookup_given_cache_bypass_requested(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("caa_lookup_cache_max_entries", "10")
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        mock_find = mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=TestCaaCheckerLambda.create_caa_lookup_result(caa_check_request.domain_or_ip_target),
+        )
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler()
+        caa_checker_lambda_handler.process_invocation(caa_check_request)
+        caa_checker_lambda_handler.process_invocation(caa_check_request, bypass_cache=True)
+        assert mock_find.call_count == 2
+
+    def process_invocation__should_not_cache_caa_lookups_given_lookup_cache_not_configured(
+        self, set_env_variables, mocker
+    ):
+        caa_check_request = ValidCheckCreator.create_valid_caa_check_request()
+        mock_find = mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=TestCaaCheckerLambda.create_caa_lookup_result(caa_check_request.domain_or_ip_target),
+        )
+        caa_checker_lambda_handler = MpicCaaCheckerLambdaHandler()
+        caa_checker_lambda_handler.process_invocation(caa_check_request)
+        caa_checker_lambda_handler.process_invocation(caa_check_request)
+        assert caa_checker_lambda_handler.caa_lookup_cache is None
+        assert mock_find.call_count == 2
+
+    def caa_lookup_cache__should_expire_entries_after_record_ttl_capped_at_max_ttl(self, mocker):
+        mock_monotonic = mocker.patch("time.monotonic", return_value=1000.0)
+        caa_lookup_cache = CaaLookupCache(max_entries=10, max_bytes=100_000, max_ttl_seconds=60, negative_ttl_seconds=5)
+        caa_lookup_cache.put("capped.com", TestCaaCheckerLambda.create_caa_lookup_result("capped.com", ttl=300))
+        caa_lookup_cache.put("short.com", TestCaaCheckerLambda.create_caa_lookup_result("short.com", ttl=10))
+        caa_lookup_cache.put("none.com", (None, dns.name.root))
+        mock_monotonic.return_value = 1007.0
+        assert caa_lookup_cache.get("none.com") is None  # negative TTL elapsed
+        assert caa_lookup_cache.get("short.com") is not None
+        mock_monotonic.return_value = 1011.0
+        assert caa_lookup_cache.get("short.com") is None
+        assert caa_lookup_cache.get("capped.com") is not None
+        mock_monotonic.return_value = 1061.0
+        assert caa_lookup_cache.get("capped.com") is None
+        assert caa_lookup_cache.size_bytes == 0
+
+    def caa_lookup_cache__should_evict_least_recently_used_entries_given_max_entries_or_bytes_exceeded(self):
+        caa_lookup_cache = CaaLookupCache(max_entries=2, max_bytes=100_000, max_ttl_seconds=60, negative_ttl_seconds=5)
+        for domain in ["a.com", "b.com"]:
+            caa_lookup_cache.put(domain, TestCaaCheckerLambda.create_caa_lookup_result(domain))
+        caa_lookup_cache.get("a.com")  # makes b.com the least recently used entry
+        caa_lookup_cache.put("c.com", TestCaaCheckerLambda.create_caa_lookup_result("c.com"))
+        assert caa_lookup_cache.get("b.com") is None
+        assert caa_lookup_cache.get("a.com") is not None
+        assert caa_lookup_cache.evictions == 1
+
+        entry_size = caa_lookup_cache.size_bytes // 2
+        caa_lookup_cache.max_bytes = entry_size  # room for one entry only
+        caa_lookup_cache.put("d.com", TestCaaCheckerLambda.create_caa_lookup_result("d.com"))
+        assert len(caa_lookup_cache) == 1
+        assert caa_lookup_cache.get("d.com") is not None
+
+    @staticmethod
+    def create_caa_lookup_result(domain, ttl=300):
+        records = [MockDnsObjectCreator.create_caa_record(0, "issue", "ca1.com")]
+        mock_rrset = MockDnsObjectCreator.create_rrset(dns.rdatatype.CAA, *records)
+        mock_rrset.ttl = ttl
+        return mock_rrset, dns.name.from_text(domain)
+
     @staticmethod
     def create_caa_check_response():
         return CaaCheckResponse(
@@ -0,0 +1,64 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+CHECKER_MODULES = [
+    "aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function",
+    "aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function",
+]
+# open_mpic_core imports its whole surface from its package __init__, so importing it is the unavoidable floor
+BASELINE_MODULE = "open_mpic_core"
+# import time a checker module may add on top of open_mpic_core; twice the 100 ms budget checked more precisely by
+# tests/benchmark/checker_import_time_benchmark.py, so that a loaded CI machine does not fail the suite
+IMPORT_BUDGET_OVERHEAD_MS = 200
+RUNS = 3
+
+
+# noinspection PyMethodMayBeStatic
+class TestCheckerImportTime:
+    @staticmethod
+    def measure_import(module: str) -> tuple[float, set[str]]:
+        """
+        Imports the module in a fresh interpreter with -X importtime.
+        :return: the cumulative import time of the module in milliseconds, and the names of all imported modules
+        """
+        src_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "src")
+        environment = dict(os.environ, PYTHONPATH=os.path.abspath(src_dir))
+        import_log = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        cumulative_ms = None
+        imported_modules = set()
+        for line in import_log.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative_us, imported_module = line.removeprefix("import time:").split("|")
+            imported_modules.add(imported_module.strip())
+            if imported_module.strip() == module:
+                cumulative_ms = int(cumulative_us) / 1000
+        return cumulative_ms, imported_modules
+
+    # fmt: off
+    @pytest.mark.parametrize("checker_module", CHECKER_MODULES)
+    # fmt: on
+    def checker_module__should_not_import_powertools_parser(self, checker_module):
+        _, imported_modules = TestCheckerImportTime.measure_import(checker_module)
+        assert not any(module.startswith("aws_lambda_powertools") for module in imported_modules)
+
+    # fmt: off
+    @pytest.mark.parametrize("checker_module", CHECKER_MODULES)
+    # fmt: on
+    def checker_module__should_import_within_budget_over_open_mpic_core(self, checker_module):
+        # baseline and checker imports alternate, so that a burst of load on the machine skews both alike
+        baseline_import_ms, checker_import_ms = [], []
+        for _ in range(RUNS):
+            baseline_import_ms.append(TestCheckerImportTime.measure_import(BASELINE_MODULE)[0])
+            checker_import_ms.append(TestCheckerImportTime.measure_import(checker_module)[0])
+        overhead_ms = min(checker_import_ms) - min(baseline_import_ms)
+        assert overhead_ms < IMPORT_BUDGET_OVERHEAD_MS, f"{checker_module} adds {overhead_ms:.0f} ms of imports"
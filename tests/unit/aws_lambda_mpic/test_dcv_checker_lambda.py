@@ -1,16 +1,28 @@
+import json
 import time
+import dns.asyncresolver
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
 import pytest
 
+from types import SimpleNamespace
+
 from open_mpic_core import MpicValidationError
 from open_mpic_core import DcvHttpCheckResponseDetails
 from open_mpic_core import DcvValidationMethod
 from open_mpic_core import DcvCheckResponse
 
 import aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function as mpic_dcv_checker_lambda_function
+from aws_lambda_mpic.common_util.payload_compression import compress_payload, decompress_payload, is_compressed_payload
 
 from open_mpic_core_test.test_util.valid_check_creator import ValidCheckCreator
 
-from aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function import MpicDcvCheckerLambdaHandler
+from aws_lambda_mpic.mpic_dcv_checker_lambda.mpic_dcv_checker_lambda_function import (
+    MpicDcvCheckerLambdaHandler,
+    DcvCheckBatchRequest,
+    SplitDnsAnswerCache,
+)
 from unit.aws_lambda_mpic.conftest import setup_logging
 
 
@@ -31,6 +43,12 @@ class TestDcvCheckerLambda:
                 class_scoped_monkeypatch.setenv(k, v)
             yield class_scoped_monkeypatch  # restore the environment afterward
 
+    @staticmethod
+    @pytest.fixture
+    def reset_default_resolver_cache():
+        yield
+        dns.asyncresolver.get_default_resolver().cache = None  # the default resolver is shared across the process
+
     # noinspection PyMethodMayBeStatic
     def lambda_handler__should_do_dcv_check_using_configured_dcv_checker(self, set_env_variables, mocker):
         mock_dcv_response = TestDcvCheckerLambda.create_dcv_check_response()
@@ -66,6 +84,83 @@ class TestDcvCheckerLambda:
         result = mpic_dcv_checker_lambda_function.lambda_handler(dcv_check_request, None)
         assert result == mock_return_value
 
+    def lambda_handler__should_do_dcv_check_for_each_request_of_batch_and_return_responses_in_order(
+        self, set_env_variables, mocker
+    ):
+        mock_dcv_response = TestDcvCheckerLambda.create_dcv_check_response()
+        mock_error_response = TestDcvCheckerLambda.create_dcv_check_response()
+        mock_error_response.check_passed = False
+        mock_error_response.errors = [MpicValidationError(error_type="404", error_message="Not Found")]
+        mocker.patch("open_mpic_core.MpicDcvChecker.check_dcv", side_effect=[mock_dcv_response, mock_error_response])
+        batch_request = DcvCheckBatchRequest(
+            check_requests=[
+                ValidCheckCreator.create_valid_http_check_request(),
+                ValidCheckCreator.create_valid_http_check_request(),
+            ]
+        )
+        result = mpic_dcv_checker_lambda_function.lambda_handler(batch_request.model_dump(), None)
+        assert result["statusCode"] == 200  # per-check errors do not affect status code of batch
+        assert [response["check_passed"] for response in json.loads(result["body"])] == [True, False]
+
+    def lambda_handler__should_return_raw_check_response_given_raw_response_format_requested(
+        self, set_env_variables, mocker
+    ):
+        mock_dcv_response = TestDcvCheckerLambda.create_dcv_check_response()
+        mock_dcv_response.check_passed = False
+        mock_dcv_response.errors = [MpicValidationError(error_type="404", error_message="Not Found")]
+        mocker.patch("open_mpic_core.MpicDcvChecker.check_dcv", return_value=mock_dcv_response)
+        dcv_check_request = ValidCheckCreator.create_valid_http_check_request()
+        context = SimpleNamespace(client_context=SimpleNamespace(custom={"response_format": "raw"}))
+        result = mpic_dcv_checker_lambda_function.lambda_handler(dcv_check_request, context)
+        assert result == mock_dcv_response.model_dump(mode="json")
+
+    # fmt: off
+    @pytest.mark.parametrize("compression_min_bytes, expect_compressed_response", [
+        (0, True),
+        (1_000_000, False),  # responses smaller than the threshold are left uncompressed
+    ])
+    # fmt: on
+    def lambda_handler__should_accept_compressed_event_and_compress_raw_response_given_compression_requested(
+        self, compression_min_bytes, expect_compressed_response, set_env_variables, mocker
+    ):
+        mock_dcv_response = TestDcvCheckerLambda.create_dcv_check_response()
+        mock_check_dcv = mocker.patch("open_mpic_core.MpicDcvChecker.check_dcv", return_value=mock_dcv_response)
+        dcv_check_request = ValidCheckCreator.create_valid_http_check_request()
+        event = compress_payload(dcv_check_request.model_dump_json().encode("utf-8"), "zlib")
+        client_context_custom = {
+            "response_format": "raw",
+            "response_compression": "zlib",
+            "response_compression_min_bytes": compression_min_bytes,
+        }
+        context = SimpleNamespace(client_context=SimpleNamespace(custom=client_context_custom))
+        result = mpic_dcv_checker_lambda_function.lambda_handler(event, context)
+        assert mock_check_dcv.call_args.args[0] == dcv_check_request
+        assert is_compressed_payload(result) is expect_compressed_response
+        if expect_compressed_response:
+            result = json.loads(decompress_payload(result))
+        assert result == mock_dcv_response.model_dump(mode="json")
+
+    def lambda_handler__should_answer_ping_without_doing_check_and_report_cold_start_only_once(
+        self, set_env_variables, mocker
+    ):
+        mock_check = mocker.patch("open_mpic_core.MpicDcvChecker.check_dcv")
+        mocker.patch.object(mpic_dcv_checker_lambda_function, "_handler", MpicDcvCheckerLambdaHandler())
+        first_result = mpic_dcv_checker_lambda_function.lambda_handler({"ping": True}, None)
+        second_result = mpic_dcv_checker_lambda_function.lambda_handler({"ping": True, "hold_ms": 1}, None)
+        assert first_result == {"pong": True, "cold_start": True}
+        assert second_result == {"pong": True, "cold_start": False}
+        mock_check.assert_not_called()
+
+    def start_invocation__should_log_init_phase_breakdown_on_cold_start_only(self, set_env_variables, mocker):
+        dcv_checker_lambda_handler = MpicDcvCheckerLambdaHandler()
+        mock_log_info = mocker.patch.object(dcv_checker_lambda_handler.logger, "info")
+        dcv_checker_lambda_handler.start_invocation()
+        dcv_checker_lambda_handler.start_invocation()
+        cold_start_fields, warm_start_fields = [json.loads(call.args[0]) for call in mock_log_info.call_args_list]
+        assert cold_start_fields["cold_start"] is True
+        assert list(cold_start_fields["init_phases_ms"].keys()) == ["import", "checker", "type_adapters"]
+        assert warm_start_fields == {"cold_start": False, "invocation_count": 2}
+
     def lambda_handler__should_set_log_level_of_dcv_checker(self, set_env_variables, mocker, setup_logging):
         dcv_check_request = ValidCheckCreator.create_valid_http_check_request()
         mocker.patch(
@@ -85,6 +180,59 @@ class TestDcvCheckerLambda:
         async with configured_dcv_checker.get_async_http_client() as http_client:
             assert http_client.timeout.total == 11.0
 
+    def lambda_handler__should_set_dns_answer_cache_of_dcv_checker_resolver_given_cache_configured(
+        self, set_env_variables, reset_default_resolver_cache, monkeypatch
+    ):
+        monkeypatch.setenv("dns_cache_max_entries", "100")
+        monkeypatch.setenv("dns_cache_max_negative_entries", "20")
+        handler = MpicDcvCheckerLambdaHandler()
+        assert isinstance(handler.dcv_checker.resolver.cache, SplitDnsAnswerCache)
+        assert handler.dns_answer_cache.positive_answers.max_size == 100
+        assert handler.dns_answer_cache.negative_answers.max_size == 20
+
+    def lambda_handler__should_not_set_dns_answer_cache_given_cache_not_configured(
+        self, set_env_variables, reset_default_resolver_cache
+    ):
+        handler = MpicDcvCheckerLambdaHandler()
+        assert handler.dns_answer_cache is None
+        assert handler.dcv_checker.resolver.cache is None
+
+    def split_dns_answer_cache__should_return_cached_positive_and_negative_answers(self):
+        cache = SplitDnsAnswerCache(max_positive_entries=10, max_negative_entries=10)
+        positive_key, positive_answer = TestDcvCheckerLambda.create_cache_entry("example.com", has_rrset=True)
+        negative_key, negative_answer = TestDcvCheckerLambda.create_cache_entry("absent.example.com", has_rrset=False)
+        cache.put(positive_key, positive_answer)
+        cache.put(negative_key, negative_answer)
+        assert cache.get(positive_key) is positive_answer
+        assert cache.get(negative_key) is negative_answer
+        assert cache.get((dns.name.from_text("other.example.com"), dns.rdatatype.TXT, dns.rdataclass.IN)) is None
+        assert len(cache.positive_answers.data) == 1
+        assert len(cache.negative_answers.data) == 1
+        statistics = cache.get_statistics_snapshot()
+        assert (statistics.hits, statistics.misses) == (2, 1)
+
+    def split_dns_answer_cache__should_not_evict_positive_answers_given_many_negative_answers(self):
+        cache = SplitDnsAnswerCache(max_positive_entries=10, max_negative_entries=2)
+        positive_key, positive_answer = TestDcvCheckerLambda.create_cache_entry("example.com", has_rrset=True)
+        cache.put(positive_key, positive_answer)
+        for i in range(5):
+            cache.put(*TestDcvCheckerLambda.create_cache_entry(f"absent-{i}.example.com", has_rrset=False))
+        assert cache.get(positive_key) is positive_answer
+        assert len(cache.negative_answers.data) == 2
+
+    def split_dns_answer_cache__should_cap_answer_expiration_at_max_ttl(self):
+        cache = SplitDnsAnswerCache(max_positive_entries=10, max_negative_entries=10, max_ttl_seconds=5)
+        key, answer = TestDcvCheckerLambda.create_cache_entry("example.com", has_rrset=True, ttl=3600)
+        cache.put(key, answer)
+        assert answer.expiration <= time.time() + 5
+
+    @staticmethod
+    def create_cache_entry(domain, has_rrset, ttl=300):
+        key = (dns.name.from_text(domain), dns.rdatatype.TXT, dns.rdataclass.IN)
+        # the cache only looks at the rrset (to tell negative answers apart) and the expiration of an answer
+        answer = SimpleNamespace(rrset=object() if has_rrset else None, expiration=time.time() + ttl)
+        return key, answer
+
     @staticmethod
     def create_dcv_check_response():
         return DcvCheckResponse(
@@ -0,0 +1,76 @@
+import sys
+import json
+import time
+import asyncio
+
+import pytest
+
+from aws_lambda_mpic.common_util.event_loop_runner import EventLoopRunner
+
+
+# noinspection PyMethodMayBeStatic
+class TestEventLoopRunner:
+    def run__should_run_every_coroutine_on_the_same_loop(self):
+        async def get_running_loop():
+            return asyncio.get_running_loop()
+
+        runner = EventLoopRunner()
+        assert runner.run(get_running_loop()) is runner.loop
+        assert runner.run(get_running_loop()) is runner.loop
+        assert asyncio.get_event_loop() is runner.loop
+        runner.close()
+
+    def constructor__should_use_uvloop_given_uvloop_event_loop_type(self, mocker):
+        event_loop = asyncio.new_event_loop()
+        mock_uvloop = mocker.Mock(new_event_loop=mocker.Mock(return_value=event_loop))
+        mocker.patch.dict(sys.modules, {"uvloop": mock_uvloop})
+        runner = EventLoopRunner("uvloop")
+        assert runner.loop is event_loop
+        runner.close()
+
+    def constructor__should_use_given_loop_factory_over_event_loop_type(self):
+        event_loop = asyncio.new_event_loop()
+        runner = EventLoopRunner("uvloop", loop_factory=lambda: event_loop)
+        assert runner.loop is event_loop
+        assert runner.run(asyncio.sleep(0, result="done")) == "done"
+        runner.close()
+
+    def run__should_measure_loop_lag_given_lag_probe_interval(self):
+        async def block_loop():
+            await asyncio.sleep(0.005)
+            time.sleep(0.05)  # blocks the loop past the next probe
+            await asyncio.sleep(0.02)
+
+        runner = EventLoopRunner(lag_probe_interval_seconds=0.01)
+        runner.run(block_loop())
+        lag_statistics = runner.pop_lag_statistics()
+        assert lag_statistics["samples"] >= 2
+        assert lag_statistics["max_ms"] >= 30
+        assert runner.pop_lag_statistics() is None  # reset once popped
+        runner.close()
+
+    def run__should_not_measure_loop_lag_given_no_lag_probe_interval(self):
+        runner = EventLoopRunner()
+        runner.run(asyncio.sleep(0.02))
+        assert runner.pop_lag_statistics() is None
+        runner.close()
+
+    def log_lag_statistics__should_log_loop_lag_once_per_measurement(self, mocker):
+        runner = EventLoopRunner(lag_probe_interval_seconds=0.01)
+        runner.run(asyncio.sleep(0.03))
+        mock_logger = mocker.Mock()
+        runner.log_lag_statistics(mock_logger)
+        runner.log_lag_statistics(mock_logger)
+        mock_logger.info.assert_called_once()
+        assert "event_loop_lag" in json.loads(mock_logger.info.call_args.args[0])
+        runner.close()
+
+    def new_event_loop__should_return_asyncio_loop_given_uvloop_not_installed(self, mocker):
+        mocker.patch.dict(sys.modules, {"uvloop": None})  # makes importing uvloop fail
+        event_loop = EventLoopRunner.new_event_loop("uvloop")
+        assert isinstance(event_loop, asyncio.BaseEventLoop)
+        event_loop.close()
+
+    def new_event_loop__should_raise_value_error_given_unsupported_event_loop_type(self):
+        with pytest.raises(ValueError):
+            EventLoopRunner.new_event_loop("trio")
@@ -1,10 +1,19 @@
 import asyncio
 import io
 import json
+import math
+import base64
+import hashlib
+import time
+import threading
 from datetime import datetime
+from types import SimpleNamespace
 from importlib import resources
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, ANY
 
+import aioboto3
+import botocore.exceptions
+import dns
 import pytest
 import yaml
 from aws_lambda_powertools.utilities.parser.models import (
@@ -13,7 +22,7 @@ from aws_lambda_powertools.utilities.parser.models import (
     APIGatewayEventIdentity,
 )
 from open_mpic_core.common_domain.enum.regional_internet_registry import RegionalInternetRegistry
-from pydantic import TypeAdapter, BaseModel
+from pydantic import TypeAdapter, BaseModel, ValidationError
 
 from open_mpic_core import RemotePerspective
 from open_mpic_core import DcvCheckRequest, DcvCheckResponse, CaaCheckResponse, PerspectiveResponse
@@ -23,16 +32,35 @@ from open_mpic_core import DcvValidationMethod
 from open_mpic_core import MpicEffectiveOrchestrationParameters
 from open_mpic_core import MpicCaaResponse
 from botocore.response import StreamingBody
+from open_mpic_core_test.test_util.mock_dns_object_creator import MockDnsObjectCreator
+import aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function as mpic_caa_checker_lambda_function
+from aws_lambda_mpic.mpic_caa_checker_lambda.mpic_caa_checker_lambda_function import MpicCaaCheckerLambdaHandler
 import aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function as mpic_coordinator_lambda_function
 from aws_lambda_mpic.mpic_coordinator_lambda.mpic_coordinator_lambda_function import (
     MpicCoordinatorLambdaHandler,
     LambdaExecutionException,
+    MpicBatchRequest,
+    BATCH_TOO_LARGE_ISSUE_TYPE,
     PerspectiveEndpoints,
     PerspectiveEndpointInfo,
+    RAW_RESPONSE_FORMAT_CLIENT_CONTEXT,
+    COMPILED_AWS_REGION_CONFIG_FILE_NAME,
+    CompiledAwsRegionConfig,
+    PerspectiveCallStatistics,
+    InstrumentedAioHttpSession,
+    LambdaClientConnectionStatistics,
+    PerspectiveCallHedgeBudget,
+    CheckRequestPayloadCache,
+    PerspectiveCallOutcome,
+    HealthAwareMpicCoordinator,
+    PerspectiveCircuitBreaker,
+    PerspectiveCircuitOpenException,
+    CircuitBreakerState,
 )
 
 from open_mpic_core_test.test_util.valid_mpic_request_creator import ValidMpicRequestCreator
 from open_mpic_core_test.test_util.valid_check_creator import ValidCheckCreator
+from aws_lambda_mpic.common_util.payload_compression import compress_payload, decompress_payload
 
 
 # noinspection PyMethodMayBeStatic
@@ -102,9 +130,80 @@ class TestMpicCoordinatorLambda:
         mock_client.invoke.assert_called_once_with(
             FunctionName=function_endpoint_info.arn,
             InvocationType="RequestResponse",
+            ClientContext=RAW_RESPONSE_FORMAT_CLIENT_CONTEXT,
             Payload=dcv_check_request.model_dump_json(),
         )
 
+    def call_remote_perspective__should_request_and_accept_raw_check_response_format(self, set_env_variables, mocker):
+        async def respond_with_raw_check_response(*args, **kwargs):
+            client_context = json.loads(base64.b64decode(kwargs["ClientContext"]))
+            assert client_context["custom"]["response_format"] == "raw"
+            check_request = DcvCheckRequest.model_validate_json(kwargs["Payload"])
+            check_response = DcvCheckResponse(
+                check_passed=True,
+                details=DcvDnsCheckResponseDetails(
+                    validation_method=DcvValidationMethod.ACME_DNS_01, found_at=check_request.domain_or_ip_target
+                ),
+            )
+            return TestMpicCoordinatorLambda.create_aioboto3_response(check_response.model_dump_json().encode("utf-8"))
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_with_raw_check_response
+        )
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+        check_response = asyncio.get_event_loop().run_until_complete(
+            lambda_handler.call_remote_perspective(
+                RemotePerspective(code="us-west-1", rir="arin"), CheckType.DCV, dcv_check_request
+            )
+        )
+        assert check_response.check_passed is True
+        assert check_response.details.found_at == dcv_check_request.domain_or_ip_target
+
+    def call_remote_perspective__should_compress_request_and_decompress_response_given_payload_compression(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_payload_compression", "zlib")
+        monkeypatch.setenv("perspective_payload_compression_min_bytes", "1")
+
+        async def respond_with_compressed_check_response(*args, **kwargs):
+            client_context = json.loads(base64.b64decode(kwargs["ClientContext"]))
+            assert client_context["custom"]["response_compression"] == "zlib"
+            assert client_context["custom"]["response_compression_min_bytes"] == 1
+            check_request = DcvCheckRequest.model_validate_json(decompress_payload(json.loads(kwargs["Payload"])))
+            check_response = DcvCheckResponse(
+                check_passed=True,
+                details=DcvDnsCheckResponseDetails(
+                    validation_method=DcvValidationMethod.ACME_DNS_01, found_at=check_request.domain_or_ip_target
+                ),
+            )
+            compressed_response = compress_payload(check_response.model_dump_json().encode("utf-8"), "zlib")
+            return TestMpicCoordinatorLambda.create_aioboto3_response(json.dumps(compressed_response).encode("utf-8"))
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_with_compressed_check_response
+        )
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+        check_response = asyncio.get_event_loop().run_until_complete(
+            lambda_handler.call_remote_perspective(
+                RemotePerspective(code="us-west-1", rir="arin"), CheckType.DCV, dcv_check_request
+            )
+        )
+        assert check_response.details.found_at == dcv_check_request.domain_or_ip_target
+        compression_summaries = lambda_handler.pop_payload_compression_statistics()
+        assert compression_summaries["request"]["payloads"] == 1
+        assert compression_summaries["request"]["uncompressed_bytes"] == len(dcv_check_request.model_dump_json())
+        assert compression_summaries["response"]["payloads"] == 1
+        assert lambda_handler.pop_payload_compression_statistics() == {}  # reset once popped
+
+    def parse_remote_perspective_response__should_raise_validation_error_given_payload_in_neither_format(
+        self, set_env_variables, mocker
+    ):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        with pytest.raises(ValidationError):
+            lambda_handler.parse_remote_perspective_response(
+                b'{"unexpected": "payload"}', lambda_handler.check_response_adapter
+            )
+
     def call_remote_perspective__should_make_aws_lambda_call_and_handle_lambda_execution_exceptions(
         self, set_env_variables, mocker
     ):
@@ -123,6 +222,823 @@ class TestMpicCoordinatorLambda:
             )
         assert exc_info.value.args[0] == 'Lambda execution error: {"errorMessage": "some message"}'
 
+    def call_remote_perspective_batch__should_send_all_check_requests_in_one_call_and_return_responses_in_order(
+        self, set_env_variables, mocker
+    ):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check_batch
+        )
+        dcv_check_requests = []
+        for domain in ["a.example.com", "b.example.com"]:
+            dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+            dcv_check_request.domain_or_ip_target = domain
+            dcv_check_requests.append(dcv_check_request)
+        check_responses = asyncio.get_event_loop().run_until_complete(
+            lambda_handler.call_remote_perspective_batch(
+                RemotePerspective(code="us-west-1", rir="arin"), CheckType.DCV, dcv_check_requests
+            )
+        )
+        assert mock_client.invoke.call_count == 1
+        assert [response.details.found_at for response in check_responses] == ["a.example.com", "b.example.com"]
+
+    def call_remote_perspective_batch__should_accept_raw_check_response_list(self, set_env_variables, mocker):
+        async def respond_with_raw_check_response_list(*args, **kwargs):
+            check_requests = json.loads(kwargs["Payload"])["check_requests"]
+            check_responses = [
+                DcvCheckResponse(
+                    check_passed=True,
+                    details=DcvDnsCheckResponseDetails(
+                        validation_method=DcvValidationMethod.ACME_DNS_01,
+                        found_at=check_request["domain_or_ip_target"],
+                    ),
+                ).model_dump(mode="json")
+                for check_request in check_requests
+            ]
+            return TestMpicCoordinatorLambda.create_aioboto3_response(json.dumps(check_responses).encode("utf-8"))
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_with_raw_check_response_list
+        )
+        dcv_check_requests = []
+        for domain in ["a.example.com", "b.example.com"]:
+            dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+            dcv_check_request.domain_or_ip_target = domain
+            dcv_check_requests.append(dcv_check_request)
+        check_responses = asyncio.get_event_loop().run_until_complete(
+            lambda_handler.call_remote_perspective_batch(
+                RemotePerspective(code="us-west-1", rir="arin"), CheckType.DCV, dcv_check_requests
+            )
+        )
+        assert [response.details.found_at for response in check_responses] == ["a.example.com", "b.example.com"]
+
+    def call_remote_perspective_batch__should_raise_exception_given_response_count_mismatch(
+        self, set_env_variables, mocker
+    ):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check_batch
+        )
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def respond_to_first_check_request_only(*args, **kwargs):
+            first_check_request = json.loads(kwargs["Payload"])["check_requests"][0]
+            return await self.create_successful_aioboto3_response_for_dcv_check_batch(
+                Payload=json.dumps({"check_requests": [first_check_request]})
+            )
+
+        mock_client.invoke.side_effect = respond_to_first_check_request_only
+        with pytest.raises(LambdaExecutionException):
+            asyncio.get_event_loop().run_until_complete(
+                lambda_handler.call_remote_perspective_batch(
+                    RemotePerspective(code="us-west-1", rir="arin"),
+                    CheckType.DCV,
+                    [dcv_check_request, dcv_check_request],
+                )
+            )
+
+    def call_remote_perspective__should_coalesce_concurrent_calls_to_same_perspective_given_batch_window(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_batch_window_ms", "50")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check_or_batch
+        )
+        domains = ["a.example.com", "b.example.com", "c.example.com"]
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        other_perspective = RemotePerspective(code="eu-west-2", rir="ripe ncc")
+
+        async def call_perspectives_concurrently():
+            calls = []
+            for domain in domains:
+                dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+                dcv_check_request.domain_or_ip_target = domain
+                calls.append(lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request))
+            calls.append(
+                lambda_handler.call_remote_perspective(
+                    other_perspective, CheckType.DCV, ValidCheckCreator.create_valid_dns_check_request()
+                )
+            )
+            return await asyncio.gather(*calls)
+
+        check_responses = asyncio.get_event_loop().run_until_complete(call_perspectives_concurrently())
+        assert [response.details.found_at for response in check_responses[:3]] == domains
+        assert mock_client.invoke.call_count == 2  # one batch for us-west-1, one single call for eu-west-2
+        coalescer = lambda_handler.perspective_call_coalescer
+        assert coalescer.batches_sent == 2
+        assert coalescer.calls_sent == 4
+        assert coalescer.max_batch_size_sent == 3
+
+    # fmt: off
+    @pytest.mark.parametrize("stats_format", ["log", "emf"])
+    # fmt: on
+    def emit_perspective_call_statistics_if_due__should_include_call_batch_sizes_and_added_latency(
+        self, stats_format, set_env_variables, monkeypatch, mocker, capsys
+    ):
+        monkeypatch.setenv("perspective_call_batch_window_ms", "20")
+        monkeypatch.setenv("perspective_stats_emit_interval_seconds", "60")
+        monkeypatch.setenv("perspective_stats_format", stats_format)
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check_or_batch
+        )
+        mock_log_info = mocker.patch.object(lambda_handler.logger, "info")
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_concurrently():
+            calls = [
+                lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request) for _ in "ab"
+            ]
+            return await asyncio.gather(*calls)
+
+        asyncio.get_event_loop().run_until_complete(call_perspective_concurrently())
+        mocker.patch("time.monotonic", return_value=time.monotonic() + 61)
+        lambda_handler.emit_perspective_call_statistics_if_due()
+        if stats_format == "emf":
+            emf_documents = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+            call_batching_metrics = next(document for document in emf_documents if "call_batches_sent" in document)
+            assert (call_batching_metrics["call_batches_sent"], call_batching_metrics["call_max_batch_size"]) == (1, 2)
+            assert call_batching_metrics["call_mean_added_latency_ms"] >= 15
+        else:
+            call_batching_summary = json.loads(mock_log_info.call_args.args[0])["perspective_call_batching"]
+            assert (call_batching_summary["batches_sent"], call_batching_summary["calls_sent"]) == (1, 2)
+            assert call_batching_summary["mean_added_latency_ms"] >= 15
+        assert lambda_handler.perspective_call_coalescer.pop_statistics() is None  # reset once emitted
+
+    def call_remote_perspective__should_send_batch_early_given_batch_reaches_max_size(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_batch_window_ms", "10000")  # would time out the test if waited for
+        monkeypatch.setenv("perspective_call_batch_max_size", "2")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check_or_batch
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_concurrently():
+            calls = [
+                lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request) for _ in range(2)
+            ]
+            return await asyncio.wait_for(asyncio.gather(*calls), timeout=5)
+
+        check_responses = asyncio.get_event_loop().run_until_complete(call_perspective_concurrently())
+        assert len(check_responses) == 2
+        assert mock_client.invoke.call_count == 1
+
+    def call_remote_perspective__should_raise_exception_for_each_coalesced_call_given_failed_batch(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_batch_window_ms", "20")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_error_aioboto3_response
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_concurrently():
+            calls = [
+                lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request) for _ in range(3)
+            ]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.get_event_loop().run_until_complete(call_perspective_concurrently())
+        assert all(isinstance(result, LambdaExecutionException) for result in results)
+        assert mock_client.invoke.call_count == 1
+
+    # fmt: off
+    @pytest.mark.parametrize("max_hedges_per_request, expected_invoke_count", [
+        (1, 2),  # slow call is hedged
+        (0, 1),  # hedge budget exhausted
+    ])
+    # fmt: on
+    def call_remote_perspective__should_hedge_slow_call_given_hedge_percentile_and_remaining_hedge_budget(
+        self, max_hedges_per_request, expected_invoke_count, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_hedge_percentile", "90")
+        monkeypatch.setenv("perspective_call_hedge_max_per_request", str(max_hedges_per_request))
+        invoke_count = 0
+
+        async def respond_slowly_to_first_call_only(*args, **kwargs):
+            nonlocal invoke_count
+            invoke_count += 1
+            if invoke_count == 1:
+                await asyncio.sleep(0.5)
+            return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_slowly_to_first_call_only
+        )
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            lambda_handler.perspective_call_statistics.record("us-west-1", CheckType.DCV, 0.01)
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_with_hedge_budget():
+            lambda_handler._hedge_budget.set(PerspectiveCallHedgeBudget(max_hedges_per_request))
+            return await lambda_handler.call_remote_perspective(
+                RemotePerspective(code="us-west-1", rir="arin"), CheckType.DCV, dcv_check_request
+            )
+
+        start_time = time.perf_counter()
+        check_response = asyncio.get_event_loop().run_until_complete(call_perspective_with_hedge_budget())
+        elapsed_seconds = time.perf_counter() - start_time
+        assert check_response.details.found_at == dcv_check_request.domain_or_ip_target
+        assert mock_client.invoke.call_count == expected_invoke_count
+        assert (elapsed_seconds < 0.4) == (expected_invoke_count == 2)  # hedged call answers before the slow one
+
+    def call_remote_perspective__should_use_original_call_response_given_hedged_call_fails(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_hedge_percentile", "90")
+        invoke_count = 0
+
+        async def fail_on_hedged_call(*args, **kwargs):
+            nonlocal invoke_count
+            invoke_count += 1
+            if invoke_count == 2:
+                return await self.create_error_aioboto3_response(*args, **kwargs)
+            await asyncio.sleep(0.1)
+            return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, fail_on_hedged_call)
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            lambda_handler.perspective_call_statistics.record("us-west-1", CheckType.DCV, 0.01)
+
+        async def call_perspective_with_hedge_budget():
+            lambda_handler._hedge_budget.set(PerspectiveCallHedgeBudget(1))
+            return await lambda_handler.call_remote_perspective(
+                RemotePerspective(code="us-west-1", rir="arin"),
+                CheckType.DCV,
+                ValidCheckCreator.create_valid_dns_check_request(),
+            )
+
+        check_response = asyncio.get_event_loop().run_until_complete(call_perspective_with_hedge_budget())
+        assert check_response.check_passed is True
+        assert mock_client.invoke.call_count == 2
+
+    def coordinate_mpic__should_serialize_check_request_once_for_all_perspectives_and_attempts(
+        self, set_env_variables, mocker
+    ):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_error_aioboto3_response  # every attempt fails, so all attempts are made
+        )
+        model_dump_json_spy = mocker.spy(DcvCheckRequest, "model_dump_json")
+        mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request()
+        mpic_request.orchestration_parameters.max_attempts = 3
+
+        mpic_response = asyncio.get_event_loop().run_until_complete(lambda_handler.coordinate_mpic(mpic_request))
+        assert mpic_response.actual_orchestration_parameters.attempt_count == 3
+        assert mock_client.invoke.call_count == 6 * 3
+        assert model_dump_json_spy.call_count == 1
+        payloads = {call.kwargs["Payload"] for call in mock_client.invoke.call_args_list}
+        assert payloads == {model_dump_json_spy.spy_return}
+
+    def check_request_payload_cache__should_serialize_again_given_different_check_request(self):
+        payload_cache = CheckRequestPayloadCache()
+        check_request = ValidCheckCreator.create_valid_dns_check_request()
+        other_check_request = check_request.model_copy(update={"domain_or_ip_target": "other.example.com"})
+        assert payload_cache.get_payload(check_request) == check_request.model_dump_json()
+        assert payload_cache.get_payload(check_request.model_copy()) == check_request.model_dump_json()
+        assert payload_cache.get_payload(other_check_request) == other_check_request.model_dump_json()
+        assert (payload_cache.hits, payload_cache.misses) == (1, 2)
+
+    def call_remote_perspective__should_keep_hedge_deadline_stable_given_hedges_keep_winning(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_call_hedge_percentile", "90")
+        monkeypatch.setenv("perspective_latency_window_size", "10")
+        invoke_count = 0
+
+        async def respond_slowly_to_original_calls(*args, **kwargs):
+            nonlocal invoke_count
+            invoke_count += 1
+            await asyncio.sleep(0.2 if invoke_count % 2 == 1 else 0.001)  # every hedge answers before its original
+            return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_slowly_to_original_calls
+        )
+        call_statistics = lambda_handler.perspective_call_statistics
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            call_statistics.record("us-west-1", CheckType.DCV, 0.02)
+        initial_deadline = call_statistics.get_percentile("us-west-1", CheckType.DCV, 90)
+
+        async def call_perspective_with_hedge_budget():
+            lambda_handler._hedge_budget.set(PerspectiveCallHedgeBudget(1))
+            return await lambda_handler.call_remote_perspective(
+                RemotePerspective(code="us-west-1", rir="arin"),
+                CheckType.DCV,
+                ValidCheckCreator.create_valid_dns_check_request(),
+            )
+
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):  # enough rounds to replace the whole window
+            asyncio.get_event_loop().run_until_complete(call_perspective_with_hedge_budget())
+        assert mock_client.invoke.call_count == 2 * PerspectiveCallStatistics.MIN_SAMPLES  # every round hedged
+        # the cancelled originals keep the tail in the window, rather than only the fast hedges being recorded
+        assert call_statistics.get_percentile("us-west-1", CheckType.DCV, 90) >= initial_deadline
+
+    def perspective_call_statistics__should_report_percentile_of_most_recent_successful_call_latencies(self):
+        call_statistics = PerspectiveCallStatistics(window_size=20)
+        assert call_statistics.get_percentile("us-west-1", CheckType.CAA, 50) is None  # no samples yet
+        for latency in range(1, 31):  # the first 10 latencies fall out of the window
+            call_statistics.record("us-west-1", CheckType.CAA, latency)
+        assert call_statistics.get_percentile("us-west-1", CheckType.CAA, 50) == 20
+        assert call_statistics.get_percentile("us-west-1", CheckType.CAA, 95) == 29
+        assert call_statistics.get_percentile("us-west-1", CheckType.DCV, 50) is None  # tracked separately
+
+    def perspective_call_statistics__should_summarize_latencies_error_rate_and_timeouts_per_perspective(self):
+        call_statistics = PerspectiveCallStatistics(window_size=100)
+        for latency in range(1, 19):
+            call_statistics.record("us-west-1", CheckType.DCV, latency / 1000)
+        call_statistics.record("us-west-1", CheckType.DCV, 0.5, PerspectiveCallOutcome.ERROR)
+        call_statistics.record("us-west-1", CheckType.DCV, 3.0, PerspectiveCallOutcome.TIMEOUT)
+        call_statistics.record("eu-west-2", CheckType.CAA, 0.2)
+        summaries = call_statistics.summarize()
+        assert summaries[0] == {
+            "perspective": "us-west-1",
+            "check_type": "dcv",
+            "calls": 20,
+            "error_rate": 0.1,
+            "timeouts": 1,
+            "cancelled": 0,
+            "latency_p50_ms": 9.0,
+            "latency_p90_ms": 17.0,
+            "latency_p99_ms": 18.0,
+        }
+        assert summaries[1]["latency_p50_ms"] is None  # too few samples for percentiles
+
+    def perspective_call_statistics__should_count_cancelled_calls_apart_from_errors_and_in_latency_tail(self):
+        call_statistics = PerspectiveCallStatistics(window_size=100)
+        for latency in range(1, 10):
+            call_statistics.record("us-west-1", CheckType.DCV, latency / 1000)
+        call_statistics.record("us-west-1", CheckType.DCV, 0.5, PerspectiveCallOutcome.ERROR)
+        call_statistics.record("us-west-1", CheckType.DCV, 0.4, PerspectiveCallOutcome.CANCELLED)
+        summary = call_statistics.summarize()[0]
+        assert summary["calls"] == 11
+        assert summary["cancelled"] == 1
+        assert summary["error_rate"] == 0.1  # over the 10 completed calls
+        assert summary["latency_p99_ms"] == 400.0  # the cancelled call ran for at least that long
+
+    def call_remote_perspective__should_record_latency_and_outcome_of_each_call(self, set_env_variables, mocker):
+        invoke_responses = [
+            self.create_successful_aioboto3_response_for_dcv_check,
+            self.create_error_aioboto3_response,
+            botocore.exceptions.ReadTimeoutError(endpoint_url="https://lambda.us-west-1.amazonaws.com"),
+        ]
+
+        async def respond_with_success_then_error_then_timeout(*args, **kwargs):
+            invoke_response = invoke_responses.pop(0)
+            if isinstance(invoke_response, Exception):
+                raise invoke_response
+            return await invoke_response(*args, **kwargs)
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_with_success_then_error_then_timeout
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+
+        async def call_perspective_three_times():
+            for _ in range(3):
+                try:
+                    await lambda_handler.call_remote_perspective(
+                        perspective, CheckType.DCV, ValidCheckCreator.create_valid_dns_check_request()
+                    )
+                except Exception:
+                    pass
+
+        asyncio.get_event_loop().run_until_complete(call_perspective_three_times())
+        summary = lambda_handler.perspective_call_statistics.summarize()[0]
+        assert (summary["calls"], summary["error_rate"], summary["timeouts"]) == (3, 0.6667, 1)
+
+    def perspective_call_statistics__should_score_health_of_perspectives_with_enough_recent_calls(self, mocker):
+        call_statistics = PerspectiveCallStatistics(window_size=100)
+        for _ in range(8):
+            call_statistics.record("us-east-1", CheckType.CAA, 0.1)
+            call_statistics.record("us-west-1", CheckType.CAA, 0.1)
+        for _ in range(2):
+            call_statistics.record("us-east-1", CheckType.CAA, 0.1)
+            call_statistics.record("us-west-1", CheckType.CAA, 1.0, PerspectiveCallOutcome.ERROR)
+        call_statistics.record("eu-west-2", CheckType.CAA, 0.1)  # too few calls to score
+        for _ in range(10):
+            call_statistics.record("ap-south-2", CheckType.CAA, 5.0, PerspectiveCallOutcome.TIMEOUT)
+            call_statistics.record("us-east-1", CheckType.DCV, 2.0)
+        assert call_statistics.get_health_scores(CheckType.CAA, max_age_seconds=60) == {
+            "us-east-1": 0.1,
+            "us-west-1": pytest.approx(0.125),  # errors inflate the expected latency to a successful response
+            "ap-south-2": math.inf,
+        }
+        mocker.patch("time.monotonic", return_value=time.monotonic() + 61)
+        assert call_statistics.get_health_scores(CheckType.CAA, max_age_seconds=60) == {}  # stale statistics
+
+    # fmt: off
+    @pytest.mark.parametrize("domain_or_ip_target", ["example.com", "example.org", "test.example.net"])
+    # fmt: on
+    def shuffle_and_group_perspectives__should_put_healthiest_perspectives_of_each_rir_in_first_cohort(
+        self, domain_or_ip_target, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_selection_policy", "health")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        assert isinstance(lambda_handler.mpic_coordinator, HealthAwareMpicCoordinator)
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            for perspective_code in ["us-east-1", "eu-west-2", "ap-northeast-1"]:
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.CAA, 0.9)
+            for perspective_code in ["us-west-1", "eu-central-2", "ap-south-2"]:
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.CAA, 0.1)
+        mpic_coordinator = lambda_handler.mpic_coordinator
+
+        check_type_token = MpicCoordinatorLambdaHandler._coordinated_check_type.set(CheckType.CAA)
+        try:
+            cohorts = mpic_coordinator.shuffle_and_group_perspectives(
+                mpic_coordinator.target_perspectives, 3, domain_or_ip_target
+            )
+            cohorts_again = mpic_coordinator.shuffle_and_group_perspectives(
+                mpic_coordinator.target_perspectives, 3, domain_or_ip_target
+            )
+        finally:
+            MpicCoordinatorLambdaHandler._coordinated_check_type.reset(check_type_token)
+        assert {perspective.code for perspective in cohorts[0]} == {"us-west-1", "eu-central-2", "ap-south-2"}
+        assert cohorts == cohorts_again  # deterministic given the same health snapshot
+
+    def shuffle_and_group_perspectives__should_rank_unscored_perspectives_at_median_health_score(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_selection_policy", "health")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        health_scores = {
+            "us-east-1": 0.1,
+            "eu-west-2": 0.9,
+            "eu-central-2": 0.5,
+            "ap-northeast-1": 0.3,
+            "ap-south-2": 0.9,
+        }
+        mocker.patch.object(lambda_handler.mpic_coordinator, "get_health_scores_function", return_value=health_scores)
+        mpic_coordinator = lambda_handler.mpic_coordinator
+        cohorts = mpic_coordinator.shuffle_and_group_perspectives(
+            mpic_coordinator.target_perspectives, 3, "example.com"
+        )
+        # us-west-1 (not scored) ranks at the median score of 0.5, behind us-east-1 in its RIR
+        assert {perspective.code for perspective in cohorts[0]} == {"us-east-1", "eu-central-2", "ap-northeast-1"}
+
+    def coordinate_mpic__should_call_healthiest_perspectives_for_check_type_of_request(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_selection_policy", "health")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check
+        )
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            for perspective_code in ["us-east-1", "eu-west-2", "ap-northeast-1"]:
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.DCV, 0.1)
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.CAA, 0.9)
+            for perspective_code in ["us-west-1", "eu-central-2", "ap-south-2"]:
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.DCV, 0.9)
+                lambda_handler.perspective_call_statistics.record(perspective_code, CheckType.CAA, 0.1)
+        mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request()
+        mpic_request.orchestration_parameters.perspective_count = 3
+        mpic_request.orchestration_parameters.quorum_count = 2
+
+        mpic_response = asyncio.get_event_loop().run_until_complete(lambda_handler.coordinate_mpic(mpic_request))
+        assert mpic_response.is_valid is True
+        perspective_codes = {perspective.perspective_code for perspective in mpic_response.perspectives}
+        assert perspective_codes == {"us-east-1", "eu-west-2", "ap-northeast-1"}
+
+    def shuffle_and_group_perspectives__should_use_seeded_shuffle_given_no_health_statistics(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        default_cohorts = lambda_handler.mpic_coordinator.shuffle_and_group_perspectives(
+            lambda_handler.target_perspectives, 3, "example.com"
+        )
+        monkeypatch.setenv("perspective_selection_policy", "health")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        health_aware_cohorts = lambda_handler.mpic_coordinator.shuffle_and_group_perspectives(
+            lambda_handler.target_perspectives, 3, "example.com"
+        )
+        assert health_aware_cohorts == default_cohorts
+
+    # fmt: off
+    @pytest.mark.parametrize("stats_format", ["log", "emf"])
+    # fmt: on
+    def process_invocation__should_emit_perspective_call_statistics_given_emit_interval_elapsed(
+        self, stats_format, set_env_variables, monkeypatch, mocker, capsys
+    ):
+        monkeypatch.setenv("perspective_stats_emit_interval_seconds", "60")
+        monkeypatch.setenv("perspective_stats_format", stats_format)
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        mocker.patch.object(
+            lambda_handler.mpic_coordinator,
+            "coordinate_mpic",
+            return_value=TestMpicCoordinatorLambda.create_caa_mpic_response(),
+        )
+        mock_log_info = mocker.patch.object(lambda_handler.logger, "info")
+        for _ in range(PerspectiveCallStatistics.MIN_SAMPLES):
+            lambda_handler.perspective_call_statistics.record("us-west-1", CheckType.CAA, 0.25)
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        lambda_handler.process_invocation(mpic_request)  # interval has not elapsed yet
+        mocker.patch("time.monotonic", return_value=time.monotonic() + 61)
+        lambda_handler.process_invocation(mpic_request)
+        if stats_format == "emf":
+            emf_documents = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+            emf_document = emf_documents[0]
+            assert emf_document["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [["perspective", "check_type"]]
+            assert (emf_document["perspective"], emf_document["latency_p50_ms"]) == ("us-west-1", 250.0)
+            client_health_documents = [document for document in emf_documents if "client_open" in document]
+            assert len(client_health_documents) == 6
+            assert all(document["client_open"] == 1 for document in client_health_documents)
+            mock_log_info.assert_not_called()
+        else:
+            mock_log_info.assert_called_once()
+            log_line = json.loads(mock_log_info.call_args.args[0])
+            assert log_line["perspective_call_statistics"][0]["calls"] == 10
+            assert len(log_line["lambda_client_health"]) == 6
+            assert all(client["open"] for client in log_line["lambda_client_health"])
+
+    def call_remote_perspective__should_fail_fast_given_circuit_breaker_opened_by_consecutive_failures(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("perspective_circuit_breaker_failure_threshold", "2")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_error_aioboto3_response
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_three_times():
+            results = []
+            for _ in range(3):
+                try:
+                    results.append(
+                        await lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request)
+                    )
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        results = asyncio.get_event_loop().run_until_complete(call_perspective_three_times())
+        assert [type(result) for result in results] == [
+            LambdaExecutionException,
+            LambdaExecutionException,
+            PerspectiveCircuitOpenException,
+        ]
+        assert mock_client.invoke.call_count == 2
+        circuit_breaker = lambda_handler.perspective_circuit_breaker
+        assert circuit_breaker.get_state("us-west-1", CheckType.DCV) == CircuitBreakerState.OPEN
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == CircuitBreakerState.CLOSED
+        assert circuit_breaker.rejected_calls == 1
+
+    # fmt: off
+    @pytest.mark.parametrize("probe_succeeds, expected_state", [
+        (True, CircuitBreakerState.CLOSED),
+        (False, CircuitBreakerState.OPEN),
+    ])
+    # fmt: on
+    def perspective_circuit_breaker__should_let_single_probe_call_through_given_half_open(
+        self, probe_succeeds, expected_state, mocker
+    ):
+        mock_monotonic = mocker.patch("time.monotonic", return_value=1000.0)
+        circuit_breaker = PerspectiveCircuitBreaker(failure_threshold=1, open_seconds=30)
+        failed_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_failure("us-west-1", CheckType.CAA, failed_call)
+        with pytest.raises(PerspectiveCircuitOpenException):
+            circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        mock_monotonic.return_value = 1030.0
+        probe_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == CircuitBreakerState.HALF_OPEN
+        with pytest.raises(PerspectiveCircuitOpenException):
+            circuit_breaker.before_call("us-west-1", CheckType.CAA)  # only one probe at a time
+        if probe_succeeds:
+            circuit_breaker.record_success("us-west-1", CheckType.CAA, probe_call)
+        else:
+            circuit_breaker.record_failure("us-west-1", CheckType.CAA, probe_call)
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == expected_state
+        assert circuit_breaker.state_change_counts[CircuitBreakerState.HALF_OPEN] == 1
+
+    def perspective_circuit_breaker__should_allow_new_probe_given_probe_call_cancelled(self, mocker):
+        mock_monotonic = mocker.patch("time.monotonic", return_value=1000.0)
+        circuit_breaker = PerspectiveCircuitBreaker(failure_threshold=1, open_seconds=30)
+        failed_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_failure("us-west-1", CheckType.CAA, failed_call)
+        mock_monotonic.return_value = 1030.0
+        probe_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_cancellation("us-west-1", CheckType.CAA, probe_call)
+        circuit_breaker.before_call("us-west-1", CheckType.CAA)  # does not raise
+
+    def perspective_circuit_breaker__should_stay_open_given_late_success_of_call_made_before_opening(self, mocker):
+        mocker.patch("time.monotonic", return_value=1000.0)
+        circuit_breaker = PerspectiveCircuitBreaker(failure_threshold=1, open_seconds=30)
+        slow_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        failed_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_failure("us-west-1", CheckType.CAA, failed_call)  # opens the breaker
+        circuit_breaker.record_success("us-west-1", CheckType.CAA, slow_call)
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == CircuitBreakerState.OPEN
+        with pytest.raises(PerspectiveCircuitOpenException):
+            circuit_breaker.before_call("us-west-1", CheckType.CAA)
+
+    # fmt: off
+    @pytest.mark.parametrize("probe_succeeds, expected_state", [
+        (True, CircuitBreakerState.CLOSED),
+        (False, CircuitBreakerState.OPEN),
+    ])
+    # fmt: on
+    def perspective_circuit_breaker__should_leave_probe_to_decide_given_failure_of_older_call_while_half_open(
+        self, probe_succeeds, expected_state, mocker
+    ):
+        mock_monotonic = mocker.patch("time.monotonic", return_value=1000.0)
+        circuit_breaker = PerspectiveCircuitBreaker(failure_threshold=1, open_seconds=30)
+        slow_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        failed_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_failure("us-west-1", CheckType.CAA, failed_call)  # opens the breaker
+        mock_monotonic.return_value = 1030.0
+        probe_call = circuit_breaker.before_call("us-west-1", CheckType.CAA)
+        circuit_breaker.record_failure("us-west-1", CheckType.CAA, slow_call)
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == CircuitBreakerState.HALF_OPEN
+        with pytest.raises(PerspectiveCircuitOpenException):
+            circuit_breaker.before_call("us-west-1", CheckType.CAA)  # the probe slot is still taken
+        if probe_succeeds:
+            circuit_breaker.record_success("us-west-1", CheckType.CAA, probe_call)
+        else:
+            circuit_breaker.record_failure("us-west-1", CheckType.CAA, probe_call)
+        assert circuit_breaker.get_state("us-west-1", CheckType.CAA) == expected_state
+
+    # fmt: off
+    @pytest.mark.parametrize("client_init_mode, expected_client_count", [
+        ("serial", 6),
+        ("concurrent", 6),
+        ("lazy", 0),
+    ])
+    # fmt: on
+    def constructor__should_create_lambda_clients_according_to_client_init_mode(
+        self, client_init_mode, expected_client_count, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("lambda_client_init_mode", client_init_mode)
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        client_registry = lambda_handler.lambda_client_registry
+        assert len(client_registry._clients) == expected_client_count
+        assert sorted(client_registry.client_init_seconds.keys()) == sorted(client_registry._clients.keys())
+
+    def constructor__should_create_lambda_clients_serially_given_no_client_init_mode(self, set_env_variables, mocker):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        assert lambda_handler.lambda_client_init_mode == "serial"
+        assert len(lambda_handler.lambda_client_registry._clients) == 6
+
+    def call_remote_perspective__should_create_single_client_on_concurrent_first_use_given_lazy_client_init(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("lambda_client_init_mode", "lazy")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, self.create_successful_aioboto3_response_for_dcv_check
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_concurrently():
+            calls = [
+                lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request) for _ in range(3)
+            ]
+            return await asyncio.gather(*calls)
+
+        check_responses = asyncio.get_event_loop().run_until_complete(call_perspective_concurrently())
+        assert len(check_responses) == 3
+        assert list(lambda_handler.lambda_client_registry._clients.keys()) == ["us-west-1"]
+        aioboto3_session = lambda_handler.lambda_client_registry._session
+        aioboto3_session.client.assert_called_once_with("lambda", "us-west-1", config=ANY)
+
+    def call_remote_perspective__should_reinitialize_clients_and_retry_once_given_expired_credentials(
+        self, set_env_variables, mocker
+    ):
+        expired_credentials_error = botocore.exceptions.ClientError(
+            {"Error": {"Code": "ExpiredTokenException"}}, "Invoke"
+        )
+        invoke_attempts = []
+
+        async def invoke_with_expired_credentials_first(*args, **kwargs):
+            invoke_attempts.append(kwargs)
+            if len(invoke_attempts) == 1:
+                raise expired_credentials_error
+            return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, invoke_with_expired_credentials_first
+        )
+        client_registry = lambda_handler.lambda_client_registry
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+        check_response = asyncio.get_event_loop().run_until_complete(
+            lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request)
+        )
+        assert check_response.check_passed is True
+        assert mock_client.invoke.await_count == 2
+        # every client created with the expired credentials is closed; only the retried one is recreated
+        assert mock_client.__aexit__.await_count == 6
+        assert list(client_registry._clients.keys()) == ["us-west-1"]
+        assert all(client_registry.reinitialization_counts[code] == 1 for code in client_registry.connection_statistics)
+        assert aioboto3.Session.call_count == 2  # a new session picks up refreshed credentials
+
+    def call_remote_perspective__should_reinitialize_client_without_retry_given_connection_error(
+        self, set_env_variables, mocker
+    ):
+        connection_error = botocore.exceptions.EndpointConnectionError(endpoint_url="https://lambda.us-west-1")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, connection_error)
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+        with pytest.raises(botocore.exceptions.EndpointConnectionError):
+            asyncio.get_event_loop().run_until_complete(
+                lambda_handler.invoke_remote_perspective(
+                    perspective, CheckType.DCV, dcv_check_request.model_dump_json()
+                )
+            )
+        client_registry = lambda_handler.lambda_client_registry
+        assert mock_client.invoke.await_count == 1
+        assert "us-west-1" not in client_registry._clients
+        assert len(client_registry._clients) == 5  # clients of the other perspectives are kept
+        assert {"perspective": "us-west-1", "open": False, "age_seconds": None, "reinitializations": 1} in (
+            client_registry.get_health()
+        )
+
+    def call_remote_perspective__should_close_invalidated_client_only_after_its_in_flight_calls_finish(
+        self, set_env_variables, mocker
+    ):
+        connection_error = botocore.exceptions.EndpointConnectionError(endpoint_url="https://lambda.us-west-1")
+        client_close_counts_seen_by_slow_call = []
+
+        async def respond_slowly_to_first_call_and_fail_second(*args, **kwargs):
+            if mock_client.invoke.await_count == 1:
+                await asyncio.sleep(0.05)  # the second call fails and invalidates the client in the meantime
+                client_close_counts_seen_by_slow_call.append(mock_client.__aexit__.await_count)
+                return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+            raise connection_error
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(
+            mocker, respond_slowly_to_first_call_and_fail_second
+        )
+        perspective = RemotePerspective(code="us-west-1", rir="arin")
+        dcv_check_request = ValidCheckCreator.create_valid_dns_check_request()
+
+        async def call_perspective_concurrently():
+            calls = [
+                lambda_handler.call_remote_perspective(perspective, CheckType.DCV, dcv_check_request) for _ in range(2)
+            ]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        slow_call_result, failed_call_result = asyncio.get_event_loop().run_until_complete(
+            call_perspective_concurrently()
+        )
+        assert slow_call_result.check_passed is True  # not aborted by the other call's connection error
+        assert failed_call_result is connection_error
+        assert client_close_counts_seen_by_slow_call == [0]
+        assert mock_client.__aexit__.await_count == 1  # closed once the slow call was done
+        assert "us-west-1" not in lambda_handler.lambda_client_registry._clients
+
+    def shutdown__should_close_all_lambda_clients(self, set_env_variables, mocker):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        lambda_handler.shutdown()
+        assert mock_client.__aexit__.await_count == 6
+        assert lambda_handler.lambda_client_registry._clients == {}
+        assert lambda_handler.event_loop_runner.loop.is_closed() is True
+        with pytest.raises(RuntimeError):
+            asyncio.new_event_loop().run_until_complete(lambda_handler.get_client("us-west-1"))
+
+    def constructor__should_create_lambda_client_config_from_connection_settings(self, set_env_variables, monkeypatch):
+        monkeypatch.setenv("lambda_client_max_pool_connections", "50")
+        monkeypatch.setenv("lambda_client_connect_timeout_seconds", "2")
+        monkeypatch.setenv("lambda_client_read_timeout_seconds", "20")
+        monkeypatch.setenv("lambda_client_retry_mode", "standard")
+        monkeypatch.setenv("lambda_client_max_attempts", "2")
+        monkeypatch.setenv("lambda_client_tcp_keepalive", "true")
+        monkeypatch.setenv("lambda_client_keepalive_timeout_seconds", "60")
+        monkeypatch.setenv("lambda_client_init_mode", "lazy")
+        lambda_handler = MpicCoordinatorLambdaHandler()
+        client_config = lambda_handler.create_lambda_client_config(LambdaClientConnectionStatistics())
+        assert client_config.max_pool_connections == 50
+        assert (client_config.connect_timeout, client_config.read_timeout) == (2.0, 20.0)
+        assert client_config.retries == {"mode": "standard", "total_max_attempts": 2}
+        assert client_config.tcp_keepalive is True
+        assert client_config.connector_args == {"keepalive_timeout": 60.0}
+
+    def instrumented_aiohttp_session__should_count_connections_and_apply_socket_options_to_new_connections(
+        self, mocker
+    ):
+        mock_socket = mocker.Mock()
+        mock_protocol = mocker.Mock()
+        mock_protocol.transport.get_extra_info.return_value = mock_socket
+        mocker.patch("aiohttp.TCPConnector._create_connection", AsyncMock(return_value=mock_protocol))
+        mocker.patch("aiobotocore.httpsession.AIOHTTPSession.send", AsyncMock())
+        connection_statistics = LambdaClientConnectionStatistics()
+        socket_options = [(6, 1, 1), (1, 9, 1)]  # e.g. TCP_NODELAY and SO_KEEPALIVE
+
+        async def send_over_new_connection_then_reuse_it():
+            session = InstrumentedAioHttpSession(
+                socket_options=socket_options, connection_statistics=connection_statistics
+            )
+            connector = session._create_connector(None)
+            await connector._create_connection(None, [], None)
+            await session.send(None)
+            await session.send(None)
+            await connector.close()
+
+        asyncio.get_event_loop().run_until_complete(send_over_new_connection_then_reuse_it())
+        assert [call.args for call in mock_socket.setsockopt.call_args_list] == socket_options
+        assert (connection_statistics.requests_sent, connection_statistics.connections_opened) == (2, 1)
+        assert connection_statistics.get_reuse_rate() == 0.5
+
     def lambda_handler__should_return_400_error_and_details_given_invalid_request_body(self):
         request = ValidMpicRequestCreator.create_valid_dcv_mpic_request()
         # noinspection PyTypeChecker
@@ -187,6 +1103,97 @@ class TestMpicCoordinatorLambda:
         result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
         assert result == expected_response
 
+    # fmt: off
+    @pytest.mark.parametrize("bypass_header, fresh_lookups_expected", [
+        ({}, 0),
+        ({"X-Bypass-CAA-Lookup-Cache": "true"}, 6),
+        ({"x-bypass-caa-lookup-cache": "TRUE"}, 6),
+        ({"X-Bypass-CAA-Lookup-Cache": "false"}, 0),
+    ])
+    # fmt: on
+    def lambda_handler__should_have_caa_checkers_bypass_lookup_cache_given_bypass_header(
+        self, bypass_header, fresh_lookups_expected, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("default_caa_domains", "ca1.com")
+        monkeypatch.setenv("caa_lookup_cache_max_entries", "10")
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives
+        records = [MockDnsObjectCreator.create_caa_record(0, "issue", "ca1.com")]
+        caa_rrset = MockDnsObjectCreator.create_rrset(dns.rdatatype.CAA, *records)
+        caa_rrset.ttl = 300  # cacheable
+        mock_find = mocker.patch(
+            "open_mpic_core.MpicCaaChecker.find_caa_records_and_domain",
+            return_value=(caa_rrset, dns.name.from_text(mpic_request.domain_or_ip_target)),
+        )
+        caa_checker_handler = MpicCaaCheckerLambdaHandler()  # stands in for the CAA checker of every perspective
+        mocker.patch.object(mpic_caa_checker_lambda_function, "_handler", caa_checker_handler)
+        checker_lock = threading.Lock()
+
+        def invoke_caa_checker(payload: str, client_context: str):
+            context = SimpleNamespace(
+                client_context=SimpleNamespace(custom=json.loads(base64.b64decode(client_context))["custom"])
+            )
+            with checker_lock:  # the checker runs its own event loop, one invocation at a time
+                return mpic_caa_checker_lambda_function.lambda_handler(json.loads(payload), context)
+
+        async def invoke_caa_checker_in_thread(*args, **kwargs):
+            result = await asyncio.to_thread(invoke_caa_checker, kwargs["Payload"], kwargs["ClientContext"])
+            return TestMpicCoordinatorLambda.create_aioboto3_response(json.dumps(result).encode("utf-8"))
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, invoke_caa_checker_in_thread)
+        mocker.patch.object(mpic_coordinator_lambda_function, "_handler", lambda_handler)
+        api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
+        api_request.body = mpic_request.model_dump_json()
+        # noinspection PyTypeChecker
+        first_result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)  # fills the cache
+        lookups_before = mock_find.call_count
+        api_request.headers.update(bypass_header)
+        # noinspection PyTypeChecker
+        second_result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
+        assert json.loads(first_result["body"])["is_valid"] is True
+        assert json.loads(second_result["body"])["is_valid"] is True
+        assert mock_find.call_count - lookups_before == fresh_lookups_expected
+
+    def lambda_handler__should_ping_every_perspective_function_given_warmup_event(self, set_env_variables, mocker):
+        ping_payloads = []
+
+        async def answer_ping(*args, **kwargs):
+            ping_payloads.append(json.loads(kwargs["Payload"]))
+            is_first_ping = len(ping_payloads) == 1
+            return self.create_aioboto3_response(json.dumps({"pong": True, "cold_start": is_first_ping}).encode())
+
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, answer_ping)
+        mocker.patch.object(mpic_coordinator_lambda_function, "_handler", lambda_handler)
+        mock_coordinate_mpic = mocker.patch.object(lambda_handler.mpic_coordinator, "coordinate_mpic")
+        result = mpic_coordinator_lambda_function.lambda_handler({"warmup": True, "concurrency": 2}, None)
+        assert result["statusCode"] == 200
+        warmup_results = json.loads(result["body"])["results"]
+        assert len(warmup_results) == 12  # 6 perspectives, 2 check types
+        assert all(warmup_result["pings"] == 2 and warmup_result["errors"] == 0 for warmup_result in warmup_results)
+        assert sum(warmup_result["cold_starts"] for warmup_result in warmup_results) == 1
+        assert mock_client.invoke.await_count == 24
+        lambda_client_health = json.loads(result["body"])["lambda_clients"]
+        assert len(lambda_client_health) == 6
+        assert all(client["open"] and client["reinitializations"] == 0 for client in lambda_client_health)
+        assert all(ping_payload == {"ping": True, "hold_ms": 100} for ping_payload in ping_payloads)
+        mock_coordinate_mpic.assert_not_called()
+
+    def start_invocation__should_log_init_phase_breakdown_on_cold_start_only(self, set_env_variables, mocker):
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        mock_log_info = mocker.patch.object(lambda_handler.logger, "info")
+        lambda_handler.start_invocation()
+        lambda_handler.start_invocation()
+        cold_start_fields, warm_start_fields = [json.loads(call.args[0]) for call in mock_log_info.call_args_list]
+        assert cold_start_fields["cold_start"] is True
+        assert list(cold_start_fields["init_phases_ms"].keys()) == [
+            "import",
+            "perspectives_config",
+            "load_aws_region_config",
+            "coordinator",
+            "type_adapters",
+            "client_init",
+        ]
+        assert warm_start_fields == {"cold_start": False, "invocation_count": 2}
+
     def lambda_handler__should_set_log_level_for_coordinator(self, set_env_variables, setup_logging, mocker):
         mpic_request = ValidMpicRequestCreator.create_valid_mpic_request(CheckType.CAA)
         api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
@@ -209,6 +1216,158 @@ class TestMpicCoordinatorLambda:
         log_contents = setup_logging.getvalue()
         assert all(text in log_contents for text in ["MpicCoordinator", "TRACE"])  # Verify the log level was set
 
+    def lambda_handler__should_coordinate_each_request_of_batch_and_return_results_in_order(
+        self, set_env_variables, mocker
+    ):
+        domains = ["a.example.com", "b.example.com", "c.example.com"]
+        mpic_requests = []
+        for domain in domains:
+            mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+            mpic_request.domain_or_ip_target = domain
+            mpic_requests.append(mpic_request)
+        api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
+        api_request.path = "/mpic/batch"
+        api_request.body = MpicBatchRequest(mpic_requests=mpic_requests).model_dump_json()
+
+        async def echo_domain_in_response(mpic_request):
+            mpic_response = TestMpicCoordinatorLambda.create_caa_mpic_response()
+            mpic_response.domain_or_ip_target = mpic_request.domain_or_ip_target
+            return mpic_response
+
+        mocker.patch(
+            "open_mpic_core.mpic_coordinator.mpic_coordinator.MpicCoordinator.coordinate_mpic",
+            side_effect=echo_domain_in_response,
+        )
+        # noinspection PyTypeChecker
+        result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
+        assert result["statusCode"] == 200
+        batch_results = json.loads(result["body"])["results"]
+        assert [item["index"] for item in batch_results] == [0, 1, 2]
+        assert [item["mpic_response"]["domain_or_ip_target"] for item in batch_results] == domains
+        assert all(item["error"] is None for item in batch_results)
+
+    # fmt: off
+    @pytest.mark.parametrize("mpic_response_details, records_seen_expected", [
+        ("full", True),
+        ("compact", False),
+    ])
+    # fmt: on
+    def process_invocation__should_leave_out_verbose_perspective_details_given_compact_response_details(
+        self, mpic_response_details, records_seen_expected, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("mpic_response_details", mpic_response_details)
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        mpic_response = TestMpicCoordinatorLambda.create_caa_mpic_response()
+        mpic_response.perspectives = [
+            PerspectiveResponse(
+                perspective_code="us-west-1",
+                check_response=CaaCheckResponse(
+                    check_passed=True,
+                    details=CaaCheckResponseDetails(
+                        caa_record_present=True, found_at="example.com", records_seen=['0 issue "ca1.com"']
+                    ),
+                ),
+            )
+        ]
+        mocker.patch.object(lambda_handler.mpic_coordinator, "coordinate_mpic", return_value=mpic_response)
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        result = lambda_handler.process_invocation(mpic_request)
+        batch_result = lambda_handler.process_batch_invocation(MpicBatchRequest(mpic_requests=[mpic_request]))
+        single_details = json.loads(result["body"])["perspectives"][0]["check_response"]["details"]
+        batch_mpic_response = json.loads(batch_result["body"])["results"][0]["mpic_response"]
+        batch_details = batch_mpic_response["perspectives"][0]["check_response"]["details"]
+        for details in [single_details, batch_details]:
+            assert details["found_at"] == "example.com"
+            assert ("records_seen" in details) is records_seen_expected
+
+    def lambda_handler__should_return_per_item_error_given_logically_invalid_request_in_batch(
+        self, set_env_variables, mocker
+    ):
+        valid_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        invalid_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        invalid_request.orchestration_parameters.perspective_count = 1
+        api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
+        api_request.path = "/mpic/batch"
+        api_request.body = MpicBatchRequest(mpic_requests=[valid_request, invalid_request]).model_dump_json()
+        mocker.patch(
+            "open_mpic_core.MpicCoordinator.call_checkers_and_collect_responses",
+            return_value=TestMpicCoordinatorLambda.create_caa_perspective_responses(),
+        )
+        # noinspection PyTypeChecker
+        result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
+        assert result["statusCode"] == 200
+        valid_result, invalid_result = json.loads(result["body"])["results"]
+        assert valid_result["mpic_response"]["is_valid"] is True
+        assert invalid_result["mpic_response"] is None
+        assert invalid_result["error"]["validation_issues"][0]["issue_type"] == "invalid-perspective-count"
+
+    def lambda_handler__should_return_400_error_given_empty_batch(self, set_env_variables):
+        api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
+        api_request.path = "/mpic/batch"
+        api_request.body = json.dumps({"mpic_requests": []})
+        # noinspection PyTypeChecker
+        result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
+        assert result["statusCode"] == 400
+        assert json.loads(result["body"])["validation_issues"][0]["type"] == "too_short"
+
+    def lambda_handler__should_return_per_item_validation_issues_given_malformed_request_in_batch(
+        self, set_env_variables, mocker
+    ):
+        valid_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        malformed_request = valid_request.model_dump(mode="json")
+        del malformed_request["domain_or_ip_target"]
+        api_request = TestMpicCoordinatorLambda.create_api_gateway_request()
+        api_request.path = "/mpic/batch"
+        api_request.body = json.dumps({"mpic_requests": [malformed_request, valid_request.model_dump(mode="json")]})
+        mocker.patch(
+            "open_mpic_core.MpicCoordinator.call_checkers_and_collect_responses",
+            return_value=TestMpicCoordinatorLambda.create_caa_perspective_responses(),
+        )
+        # noinspection PyTypeChecker
+        result = mpic_coordinator_lambda_function.lambda_handler(api_request, None)
+        assert result["statusCode"] == 200
+        malformed_result, valid_result = json.loads(result["body"])["results"]
+        assert malformed_result["error"]["error"] == "request-validation-failed"
+        assert "domain_or_ip_target" in malformed_result["error"]["validation_issues"][0]["loc"]
+        assert valid_result["mpic_response"]["is_valid"] is True
+
+    def process_batch_invocation__should_return_400_error_given_batch_larger_than_max_size(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("batch_max_size", "2")
+        lambda_handler, mock_client = self.mock_lambda_handler_for_lambda_invoke(mocker, None)
+        mock_coordinate_mpic = mocker.patch.object(lambda_handler.mpic_coordinator, "coordinate_mpic")
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request().model_dump(mode="json")
+        result = lambda_handler.process_batch_invocation(MpicBatchRequest(mpic_requests=[mpic_request] * 3))
+        assert result["statusCode"] == 400
+        assert json.loads(result["body"])["validation_issues"][0]["issue_type"] == BATCH_TOO_LARGE_ISSUE_TYPE
+        mock_coordinate_mpic.assert_not_called()
+
+    def coordinate_mpic_batch__should_not_exceed_configured_max_concurrency(
+        self, set_env_variables, monkeypatch, mocker
+    ):
+        monkeypatch.setenv("batch_max_concurrency", "2")
+        mpic_coordinator_lambda_handler = MpicCoordinatorLambdaHandler()
+        in_flight, max_in_flight = 0, 0
+
+        async def track_concurrency(mpic_request):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return TestMpicCoordinatorLambda.create_caa_mpic_response()
+
+        mocker.patch.object(
+            mpic_coordinator_lambda_handler.mpic_coordinator, "coordinate_mpic", side_effect=track_concurrency
+        )
+        mpic_requests = [ValidMpicRequestCreator.create_valid_caa_mpic_request() for _ in range(5)]
+        batch_results = asyncio.get_event_loop().run_until_complete(
+            mpic_coordinator_lambda_handler.coordinate_mpic_batch(mpic_requests)
+        )
+        assert len(batch_results) == 5
+        assert max_in_flight == 2
+
     def load_aws_region_config__should_return_dict_of_aws_regions_with_proximity_info_by_region_code(self):
         mpic_coordinator_lambda_handler = MpicCoordinatorLambdaHandler()
         loaded_aws_regions = mpic_coordinator_lambda_handler.load_aws_region_config()
@@ -218,6 +1377,59 @@ class TestMpicCoordinatorLambda:
         assert "us-east-2" in loaded_aws_regions["us-east-1"].too_close_codes
         assert "us-east-1" in loaded_aws_regions["us-east-2"].too_close_codes
 
+    def load_aws_region_config__should_load_compiled_region_config_given_compiled_from_current_yaml(
+        self, tmp_path, mocker
+    ):
+        region_config_bytes = resources.files("resources").joinpath("aws_region_config.yaml").read_bytes()
+        (tmp_path / "aws_region_config.yaml").write_bytes(region_config_bytes)
+        all_possible_perspectives = TestMpicCoordinatorLambda.get_perspectives_by_code_dict_from_file()
+        deployed_perspectives = [all_possible_perspectives["us-east-1"], all_possible_perspectives["us-east-2"]]
+        compiled_config = CompiledAwsRegionConfig(
+            source_sha256=hashlib.sha256(region_config_bytes).hexdigest(), aws_available_regions=deployed_perspectives
+        )
+        (tmp_path / COMPILED_AWS_REGION_CONFIG_FILE_NAME).write_text(compiled_config.model_dump_json())
+        mocker.patch.object(mpic_coordinator_lambda_function.resources, "files", return_value=tmp_path)
+        loaded_aws_regions = MpicCoordinatorLambdaHandler.load_aws_region_config(["us-east-1", "us-east-2"])
+        assert loaded_aws_regions == {perspective.code: perspective for perspective in deployed_perspectives}
+
+    def load_aws_region_config__should_fall_back_to_yaml_given_compiled_from_other_yaml(
+        self, tmp_path, setup_logging, mocker
+    ):
+        region_config_bytes = resources.files("resources").joinpath("aws_region_config.yaml").read_bytes()
+        (tmp_path / "aws_region_config.yaml").write_bytes(region_config_bytes)
+        all_possible_perspectives = TestMpicCoordinatorLambda.get_perspectives_by_code_dict_from_file()
+        stale_perspectives = [all_possible_perspectives["us-east-1"]]
+        compiled_config = CompiledAwsRegionConfig(source_sha256="0" * 64, aws_available_regions=stale_perspectives)
+        (tmp_path / COMPILED_AWS_REGION_CONFIG_FILE_NAME).write_text(compiled_config.model_dump_json())
+        mocker.patch.object(mpic_coordinator_lambda_function.resources, "files", return_value=tmp_path)
+        loaded_aws_regions = MpicCoordinatorLambdaHandler.load_aws_region_config()
+        assert loaded_aws_regions == all_possible_perspectives
+        assert "was not compiled from the current aws_region_config.yaml" in setup_logging.getvalue()
+
+    def load_aws_region_config__should_fall_back_to_yaml_given_compiled_without_deployed_perspective(
+        self, tmp_path, setup_logging, mocker
+    ):
+        region_config_bytes = resources.files("resources").joinpath("aws_region_config.yaml").read_bytes()
+        (tmp_path / "aws_region_config.yaml").write_bytes(region_config_bytes)
+        all_possible_perspectives = TestMpicCoordinatorLambda.get_perspectives_by_code_dict_from_file()
+        compiled_config = CompiledAwsRegionConfig(
+            source_sha256=hashlib.sha256(region_config_bytes).hexdigest(),
+            aws_available_regions=[all_possible_perspectives["us-east-1"]],
+        )
+        (tmp_path / COMPILED_AWS_REGION_CONFIG_FILE_NAME).write_text(compiled_config.model_dump_json())
+        mocker.patch.object(mpic_coordinator_lambda_function.resources, "files", return_value=tmp_path)
+        loaded_aws_regions = MpicCoordinatorLambdaHandler.load_aws_region_config(["us-east-1", "us-west-1"])
+        assert loaded_aws_regions == all_possible_perspectives
+        assert "lacks perspectives ['us-west-1']" in setup_logging.getvalue()
+
+    def convert_codes_to_remote_perspectives__should_raise_error_given_code_missing_from_region_config(self):
+        all_possible_perspectives = TestMpicCoordinatorLambda.get_perspectives_by_code_dict_from_file()
+        compiled_perspectives = {"us-east-1": all_possible_perspectives["us-east-1"]}
+        with pytest.raises(ValueError, match="us-west-1"):
+            MpicCoordinatorLambdaHandler.convert_codes_to_remote_perspectives(
+                ["us-east-1", "us-west-1"], compiled_perspectives
+            )
+
     def constructor__should_initialize_mpic_coordinator_and_set_target_perspectives(self, set_env_variables):
         mpic_coordinator_lambda_handler = MpicCoordinatorLambdaHandler()
         all_possible_perspectives = TestMpicCoordinatorLambda.get_perspectives_by_code_dict_from_file()
@@ -263,6 +1475,42 @@ class TestMpicCoordinatorLambda:
 
         return {"Payload": MockStreamingBody()}
 
+    # noinspection PyUnusedLocal
+    async def create_successful_aioboto3_response_for_dcv_check_batch(self, *args, **kwargs):
+        check_requests = json.loads(kwargs["Payload"])["check_requests"]
+        expected_response_body = [
+            DcvCheckResponse(
+                check_passed=True,
+                details=DcvDnsCheckResponseDetails(
+                    validation_method=DcvValidationMethod.ACME_DNS_01, found_at=check_request["domain_or_ip_target"]
+                ),
+            ).model_dump(mode="json")
+            for check_request in check_requests
+        ]
+        expected_response = {"statusCode": 200, "body": json.dumps(expected_response_body)}
+        json_bytes = json.dumps(expected_response).encode("utf-8")
+
+        class MockStreamingBody:
+            # noinspection PyMethodMayBeStatic
+            async def read(self):
+                return json_bytes
+
+        return {"Payload": MockStreamingBody()}
+
+    async def create_successful_aioboto3_response_for_dcv_check_or_batch(self, *args, **kwargs):
+        if "check_requests" in json.loads(kwargs["Payload"]):
+            return await self.create_successful_aioboto3_response_for_dcv_check_batch(*args, **kwargs)
+        return await self.create_successful_aioboto3_response_for_dcv_check(*args, **kwargs)
+
+    @staticmethod
+    def create_aioboto3_response(json_bytes: bytes):
+        class MockStreamingBody:
+            # noinspection PyMethodMayBeStatic
+            async def read(self):
+                return json_bytes
+
+        return {"Payload": MockStreamingBody()}
+
     # noinspection PyUnusedLocal
     async def create_error_aioboto3_response(self, *args, **kwargs):
         expected_response = {"errorMessage": "some message"}
@@ -289,6 +1537,18 @@ class TestMpicCoordinatorLambda:
             caa_check_parameters=caa_request.caa_check_parameters,
         )
 
+    @staticmethod
+    def create_caa_perspective_responses() -> list[PerspectiveResponse]:
+        return [
+            PerspectiveResponse(
+                perspective_code=code,
+                check_response=CaaCheckResponse(
+                    check_passed=True, details=CaaCheckResponseDetails(caa_record_present=False)
+                ),
+            )
+            for code in ["us-east-1", "us-west-1", "eu-west-2", "eu-central-2", "ap-northeast-1", "ap-south-2"]
+        ]
+
     # noinspection PyUnusedLocal
     @staticmethod
     def create_caa_perspective_response(*args, **kwargs) -> CaaCheckResponse: